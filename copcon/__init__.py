@@ -3,4 +3,5 @@
 Copcon is a CLI tool that copies a project's directory structure and file contents to the clipboard.
 """
 
+from .api import ContextResult, build_context
 from .cli import app as copcon_app
\ No newline at end of file
@@ -0,0 +1,325 @@
+"""Python API for Copcon.
+
+This module lets other programs build a context report without going through the CLI.
+`build_context` applies the same filters as the command line and returns a
+`ContextResult`, which does no work until it is asked for something: the tree is generated
+on first access, files are walked and read lazily, and the report can be streamed into any
+file object without being built as a single string.
+"""
+
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, TextIO, Tuple, Union
+import tiktoken
+
+from copcon.core.archive import ArchiveSource, MemberSource, is_archive
+from copcon.core.autodiscover import discover_copconignore, discover_copcontarget
+from copcon.core.file_classifier import FileClassifier
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_record import FileRecord
+from copcon.core.file_tree import FileTreeGenerator
+from copcon.core.focus import focus_source
+from copcon.core.grep import ContentGrep, grep_source
+from copcon.core.generated import GeneratedFileDetector
+from copcon.core.git_ref import GitRefSource
+from copcon.core.guards import ResourceGuard
+from copcon.core.minifier import ContentMinifier
+from copcon.core.notebook import NotebookConverter
+from copcon.core.processor import ContentProcessor
+from copcon.core.report import DIALECTS, ReportFormatter
+from copcon.core.report_tokens import ReportTokenCounter
+from copcon.core.skeleton import SkeletonExtractor
+from copcon.core.token_stats import TokenStats
+
+
+class ContextResult:
+    """The lazily evaluated context of a project.
+
+    Nothing is walked or read when the result is created. Each accessor does only the work
+    it needs, and the tree and token stats are computed once and then kept.
+
+    A result built from a git ref or an archive holds it open until `close` is called, so
+    it should be used as a context manager.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        tree_generator: FileTreeGenerator,
+        reader: FileContentReader,
+        processor_options: dict,
+        encoder: Optional[Any] = None,
+        project_name: Optional[str] = None,
+        dialect: str = "standard",
+        source: Optional[MemberSource] = None,
+    ):
+        """
+        Initialize the ContextResult. Use `build_context` rather than calling this directly.
+
+        Args:
+            directory (Path): The project directory.
+            tree_generator (FileTreeGenerator): Generates the directory tree.
+            reader (FileContentReader): Walks and reads the included files.
+            processor_options (dict): Keyword arguments for the ContentProcessor.
+            encoder (Any, optional): A tokenizer exposing `encode(text)`. Defaults to the
+                `cl100k_base` tiktoken encoding, loaded on first use.
+            project_name (str, optional): The name shown above the tree. Defaults to the
+                directory name.
+            dialect (str): The report layout, one of `copcon.core.report.DIALECTS`.
+            source (MemberSource, optional): The source standing in for the directory, such
+                as a git ref or an archive, closed by `close`.
+        """
+        self.directory = directory
+        self.source = source
+        self.tree_generator = tree_generator
+        self.reader = reader
+        self.processor_options = processor_options
+        self._encoder = encoder
+        self.project_name = project_name or directory.name
+        self.dialect = dialect
+        self._tree: Optional[str] = None
+        self._processed: Optional[List[FileRecord]] = None
+        self._framing_tokens: Optional[int] = None
+
+    def close(self):
+        """Release the source, e.g. the `git cat-file` process reading a ref."""
+        if self.source is not None:
+            self.source.close()
+
+    def __enter__(self) -> "ContextResult":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def encoder(self) -> Any:
+        """The tokenizer used to count tokens."""
+        if self._encoder is None:
+            self._encoder = tiktoken.get_encoding("cl100k_base")
+        return self._encoder
+
+    @property
+    def tree(self) -> str:
+        """The directory tree, generated on first access."""
+        if self._tree is None:
+            self._tree = self.tree_generator.generate()
+        return self._tree
+
+    def iter_records(self) -> Iterator[FileRecord]:
+        """Walk the included files without reading them.
+
+        Yields:
+            FileRecord: One record per included file; content is loaded on first access.
+        """
+        return self.reader.iter_records()
+
+    def iter_contents(self) -> Iterator[Tuple[str, str]]:
+        """Read, transform and tokenize the included files one batch at a time.
+
+        Once fully consumed, the token counts are available from `token_stats`.
+
+        Yields:
+            Tuple[str, str]: `(relative_path, content)` pairs, in walk order.
+
+        Raises:
+            FileReadError: If any file could not be read, after all other files were yielded.
+        """
+        records = list(self.iter_records())
+        processor = ContentProcessor(self.encoder, **self.processor_options)
+        yield from processor.process(records)
+        self._processed = records
+
+    @property
+    def token_stats(self) -> TokenStats:
+        """Token counts per file, by extension and by directory.
+
+        Processes all files unless `iter_contents` or `write_to` has already done so. Once
+        the report has been produced, the tree, file headers and separators are included as
+        `report framing`, so the total is the exact token count of the report.
+        """
+        if self._processed is None:
+            for _ in self.iter_contents():
+                pass
+        stats = TokenStats.from_records(self._processed)
+        if self._framing_tokens is not None:
+            stats.add_source("report framing", self._framing_tokens)
+        return stats
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Produce the report piece by piece, in the same format as the CLI."""
+        counter = ReportTokenCounter(self.encoder)
+        # Files are read while the report is produced, so paths are not shortened to a common prefix
+        yield from ReportFormatter(
+            self.project_name, self.tree, self.iter_contents(), dialect=self.dialect, token_counter=counter
+        ).iter_chunks()
+        self._framing_tokens = counter.tokens
+
+    def write_to(self, fileobj: TextIO):
+        """Stream the report into a text file object.
+
+        Args:
+            fileobj (TextIO): Any object with a `write(str)` method, such as an open file or
+                `io.StringIO`.
+        """
+        for chunk in self.iter_chunks():
+            fileobj.write(chunk)
+
+
+def build_context(
+    directory: Union[str, Path],
+    depth: int = -1,
+    exclude_hidden: bool = True,
+    copconignore: Optional[Union[str, Path]] = None,
+    follow_symlinks: bool = False,
+    walk_workers: int = 0,
+    ref: Optional[str] = None,
+    focus: Optional[List[str]] = None,
+    focus_depth: int = -1,
+    grep: Optional[List[str]] = None,
+    grep_all: bool = False,
+    collapse_threshold: Optional[int] = None,
+    text_ext: Optional[List[str]] = None,
+    binary_ext: Optional[List[str]] = None,
+    notebook_outputs: int = 0,
+    raw_notebooks: bool = False,
+    keep_generated: bool = False,
+    minify: Optional[List[str]] = None,
+    skeleton: bool = False,
+    skeleton_glob: Optional[List[str]] = None,
+    max_files: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    timeout: Optional[float] = None,
+    dialect: str = "standard",
+    encoder: Optional[Any] = None,
+) -> ContextResult:
+    """Build the context of a project, the way the `copcon` command does.
+
+    `.copconignore` and `.copcontarget` files are discovered as on the command line. The
+    keyword arguments mirror the CLI options of the same name.
+
+    Example:
+        >>> import copcon
+        >>> context = copcon.build_context("path/to/project", minify=["py"])
+        >>> with open("report.txt", "w", encoding="utf-8") as f:
+        ...     context.write_to(f)
+        >>> context.token_stats.total
+
+    Args:
+        directory (str | Path): The project directory, or a zip or tar archive to read
+            without extracting it.
+        depth (int): The maximum depth of the directory tree (-1 for unlimited).
+        exclude_hidden (bool): Whether to exclude hidden files and directories.
+        copconignore (str | Path, optional): Path to a `.copconignore` file. Discovered in the
+            project directory if not given.
+        follow_symlinks (bool): Whether to follow symbolic links.
+        walk_workers (int): Threads listing directories ahead of the walk, for filesystems
+            with high latency (0 for none).
+        ref (str, optional): A git commit, tag or branch whose files are reported instead of
+            the working tree, without checking it out.
+        focus (List[str], optional): Only include these Python modules and the project
+            modules they import. Unlike the rest of the context, the import graph is resolved
+            when this function is called.
+        focus_depth (int): How many import hops `focus` follows (-1 for unlimited).
+        grep (List[str], optional): Only include files whose content matches one of these
+            regular expressions. Like `focus`, the files are scanned when this function is
+            called.
+        grep_all (bool): Whether files have to match all `grep` patterns rather than any.
+        collapse_threshold (int, optional): Summarize directories with more entries than this.
+        text_ext (List[str], optional): Extra extensions to treat as text.
+        binary_ext (List[str], optional): Extra extensions to treat as binary.
+        notebook_outputs (int): Lines of text output to keep per notebook cell.
+        raw_notebooks (bool): Whether to include notebooks as raw JSON instead of their cells.
+        keep_generated (bool): Whether to include minified, generated, lock and base64-heavy
+            files instead of a placeholder.
+        minify (List[str], optional): Extensions to minify, or `["all"]`.
+        skeleton (bool): Whether to reduce Python files to their skeleton.
+        skeleton_glob (List[str], optional): Only reduce Python files matching these patterns.
+        max_files (int, optional): Maximum number of files to include.
+        max_bytes (int, optional): Maximum total size of included files.
+        timeout (float, optional): Maximum seconds to spend, counted from this call.
+        dialect (str): `standard`, or `compact` for an indented tree and a single short
+            delimiter line per file.
+        encoder (Any, optional): A tokenizer exposing `encode(text)`. Defaults to tiktoken's
+            `cl100k_base` encoding.
+
+    Returns:
+        ContextResult: The lazily evaluated context.
+
+    Raises:
+        ValueError: If `minify` names an unsupported extension, `dialect` is unknown or a
+            `grep` pattern is invalid.
+        subprocess.CalledProcessError: If `ref` is given but cannot be listed.
+        KeyError: If a `focus` path is not an included Python file of the project.
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Unknown dialect {dialect!r}; expected one of: {', '.join(DIALECTS)}")
+    directory = Path(directory)
+    if copconignore is None:
+        copconignore = discover_copconignore(directory)
+    file_filter = FileFilter(
+        user_ignore_path=Path(copconignore) if copconignore else None,
+        user_target_path=discover_copcontarget(directory),
+    )
+    guard = ResourceGuard(max_files=max_files, max_bytes=max_bytes, timeout=timeout)
+    classifier = FileClassifier(text_extensions=text_ext, binary_extensions=binary_ext)
+    # Options are validated before a git ref or archive is opened
+    content_grep = ContentGrep(grep, grep_all, classifier) if grep else None
+    processor_options = {
+        "skeleton_extractor": SkeletonExtractor(skeleton_glob or None) if (skeleton or skeleton_glob) else None,
+        "minifier": ContentMinifier(minify) if minify else None,
+        "guard": guard,
+    }
+    if ref:
+        source = GitRefSource(directory, ref)
+    elif is_archive(directory):
+        source = ArchiveSource(directory)
+    else:
+        source = None
+    project_name = source.root_name if source else None
+    try:
+        if focus:
+            source = focus_source(
+                FileContentReader(directory, file_filter, exclude_hidden, follow_symlinks=follow_symlinks, source=source),
+                focus,
+                focus_depth,
+                project_name,
+            )
+        if content_grep:
+            source = grep_source(
+                FileContentReader(
+                    directory, file_filter, exclude_hidden, guard=guard, follow_symlinks=follow_symlinks, source=source
+                ),
+                content_grep,
+                root_name=project_name,
+            )
+        tree_generator = FileTreeGenerator(
+            directory,
+            depth,
+            file_filter,
+            collapse_threshold,
+            guard,
+            follow_symlinks=follow_symlinks,
+            source=source,
+            walk_workers=walk_workers,
+            style="indent" if dialect == "compact" else "box",
+        )
+        reader = FileContentReader(
+            directory,
+            file_filter,
+            exclude_hidden,
+            classifier,
+            guard,
+            follow_symlinks=follow_symlinks,
+            notebook_converter=None if raw_notebooks else NotebookConverter(notebook_outputs),
+            generated_detector=None if keep_generated else GeneratedFileDetector(),
+            source=source,
+            walk_workers=walk_workers,
+        )
+        return ContextResult(
+            directory, tree_generator, reader, processor_options, encoder, project_name, dialect, source
+        )
+    except BaseException:
+        if source is not None:
+            source.close()
+        raise
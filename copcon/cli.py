@@ -1,14 +1,33 @@
+import subprocess
 import typer
 from pathlib import Path
-import subprocess
+from typing import Dict, Iterator, List, Optional, Tuple
 import tiktoken
 
+from copcon.core.archive import ArchiveSource, is_archive
 from copcon.core.file_tree import FileTreeGenerator
 from copcon.core.file_filter import FileFilter
 from copcon.core.file_reader import FileContentReader
-from copcon.core.report import ReportFormatter
+from copcon.core.file_classifier import FileClassifier
+from copcon.core.focus import focus_source
+from copcon.core.grep import ContentGrep, grep_source
+from copcon.core.report import DIALECTS, ReportFormatter, common_directory, framing_tokens
+from copcon.core.report_tokens import ReportTokenCounter
 from copcon.core.clipboard import ClipboardManager
+from copcon.core.change_tracker import ChangeTracker, format_tree_delta
+from copcon.core.dry_run import TokenCountCache, estimate_tokens, format_plan, included_directories
 from copcon.core.autodiscover import discover_copconignore, discover_copcontarget
+from copcon.core.notebook import NOTEBOOK_VERSION, NotebookConverter
+from copcon.core.minifier import MINIFIER_VERSION, ContentMinifier
+from copcon.core.processor import ContentProcessor
+from copcon.core.pipeline import ReportPipeline
+from copcon.core.git_diff import GitDiff
+from copcon.core.git_ref import GitRefSource
+from copcon.core.generated import GeneratedFileDetector
+from copcon.core.guards import EXIT_CODE_TRUNCATED, ResourceGuard
+from copcon.core.skeleton import SKELETON_VERSION, SkeletonExtractor
+from copcon.core.snapshot import ReportSnapshot
+from copcon.core.token_stats import TokenStats
 from copcon.messages import get_success_message
 from copcon.exceptions import ClipboardError, FileReadError
 from copcon.utils.logger import logger
@@ -19,10 +38,139 @@ app = typer.Typer()
 def main(
     directory: Path = typer.Argument(...),
     depth: int = typer.Option(-1),
+    collapse_threshold: int = typer.Option(
+        None,
+        "--collapse-threshold",
+        help="Summarize directories with more entries than this as a single tree line "
+             "(file count, size and estimated tokens) instead of listing them.",
+    ),
     exclude_hidden: bool = typer.Option(True),
+    follow_symlinks: bool = typer.Option(
+        False,
+        "--follow-symlinks",
+        help="Follow symbolic links to files and directories. Link cycles are skipped and "
+             "each physical file is included once. By default symbolic links to files are "
+             "included and symbolic links to directories are skipped.",
+    ),
+    walk_workers: int = typer.Option(
+        0,
+        "--walk-workers",
+        help="List directories with this many threads ahead of the walk. Speeds up network "
+             "and overlay filesystems; the output is unchanged.",
+    ),
     copconignore: Path = typer.Option(None),
+    text_ext: List[str] = typer.Option(
+        None, "--text-ext", help="Treat files with this extension as text without sniffing. Can be used multiple times."
+    ),
+    binary_ext: List[str] = typer.Option(
+        None, "--binary-ext", help="Treat files with this extension as binary without reading them. Can be used multiple times."
+    ),
+    notebook_outputs: int = typer.Option(
+        0,
+        "--notebook-outputs",
+        help="Keep up to this many lines of text output per notebook cell. Images are always dropped.",
+    ),
+    raw_notebooks: bool = typer.Option(
+        False, "--raw-notebooks", help="Include .ipynb files as raw JSON instead of their cells."
+    ),
+    keep_generated: bool = typer.Option(
+        False,
+        "--keep-generated",
+        help="Include minified, generated, lock and base64-heavy files instead of a placeholder.",
+    ),
     output_file: Path = typer.Option(None),
-    git_diff: bool = typer.Option(False, "-g", "--git-diff", help="Include git diff in the context report")
+    git_diff: bool = typer.Option(False, "-g", "--git-diff", help="Include git diff in the context report"),
+    diff_context: int = typer.Option(
+        None, "--diff-context", help="Lines of context around each change in the git diff."
+    ),
+    diff_renames: bool = typer.Option(
+        True, "--diff-renames/--no-diff-renames", help="Detect renamed files in the git diff."
+    ),
+    ref: str = typer.Option(
+        None,
+        "--ref",
+        help="Report the files of this git commit, tag or branch instead of the working tree, "
+             "without checking it out.",
+    ),
+    focus: List[str] = typer.Option(
+        None,
+        "--focus",
+        help="Only include this Python module and the project modules it imports, transitively. "
+             "Can be used multiple times.",
+    ),
+    focus_depth: int = typer.Option(
+        -1, "--focus-depth", help="How many import hops --focus follows (-1 for unlimited)."
+    ),
+    grep: List[str] = typer.Option(
+        None,
+        "--grep",
+        help="Only include files whose content matches this regular expression. Can be used "
+             "multiple times; files matching any of the patterns are included.",
+    ),
+    grep_all: bool = typer.Option(
+        False, "--grep-all", help="Only include files whose content matches every --grep pattern."
+    ),
+    minify: List[str] = typer.Option(
+        None,
+        "--minify",
+        help="Strip comments, docstrings and blank lines from files with this extension "
+             "(e.g. --minify py --minify js). Use 'all' for every supported language.",
+    ),
+    skeleton: bool = typer.Option(
+        False, "--skeleton", help="Reduce all Python files to imports, signatures and docstring first lines."
+    ),
+    skeleton_glob: List[str] = typer.Option(
+        None,
+        "--skeleton-glob",
+        help="Reduce only Python files matching this gitignore-style pattern to their skeleton. "
+             "Can be used multiple times.",
+    ),
+    max_files: int = typer.Option(None, "--max-files", help="Stop after including this many files."),
+    max_bytes: int = typer.Option(None, "--max-bytes", help="Stop once included files exceed this many bytes in total."),
+    timeout: float = typer.Option(None, "--timeout", help="Stop after this many seconds."),
+    snapshot: bool = typer.Option(
+        False,
+        "--snapshot",
+        help="Reuse the previous report if nothing changed, and the processed content of "
+             "unchanged files otherwise.",
+    ),
+    since_last: bool = typer.Option(
+        False,
+        "--since-last",
+        help="Only include files added or modified since the last run with --since-last, "
+             "plus a list of deleted files.",
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        "--pipeline",
+        help="Walk, read, tokenize and write concurrently, connected by bounded queues.",
+    ),
+    dialect: str = typer.Option(
+        "standard",
+        "--dialect",
+        help="Report layout: 'standard', or 'compact' for an indented tree and a single short "
+             "delimiter line per file, which spends fewer tokens on framing.",
+    ),
+    no_path_prefix: bool = typer.Option(
+        False,
+        "--no-path-prefix",
+        help="With --dialect compact, write full file paths instead of paths relative to the "
+             "directory all files share.",
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help="List the files that would be included with their sizes and estimated tokens, "
+             "without reading them or producing a report.",
+    ),
+    attribution: bool = typer.Option(
+        False, "--attribution", help="Show the most expensive files and a per-directory token rollup."
+    ),
+    top_files: int = typer.Option(5, "--top-files", help="Number of files listed in the token attribution."),
+    stats_depth: int = typer.Option(1, "--stats-depth", help="Directory depth of the per-directory token rollup."),
+    stats_json: Path = typer.Option(
+        None, "--stats-json", help="Write per-file, per-directory and per-extension token stats to this JSON file."
+    ),
 ):
     """
     Copcon CLI entry point.
@@ -32,10 +180,82 @@ def main(
       - Otherwise, we try discover_copconignore(directory) to see if there's a .copconignore.
       - If none is found, we only apply internal .copconignore patterns.
       - Additionally, if a .copcontarget is discovered, it's applied before .copconignore.
-      - If the --git-diff flag is provided, the output of 'git diff HEAD' will be appended
-        to the context report and its token count added to the token spend report.
+      - If the --git-diff flag is provided, the output of 'git diff HEAD' for files that pass
+        the filters is streamed into the context report, and its token count is attributed
+        per file in the token spend report. --diff-context and --no-diff-renames tune it.
+      - If the directory argument is a zip or tar archive (optionally gzip, bzip2 or xz
+        compressed), its members are reported directly from the archive without extraction.
+      - If --ref is provided, the files of that git ref are listed with git ls-tree and read
+        through a single git cat-file process; the working tree is not touched.
+      - If --focus is provided, only the given Python modules and the project modules they
+        import (up to --focus-depth hops) are included. Parsed imports are cached by content.
+      - If --grep is provided, only files whose content matches one of the patterns (all
+        of them with --grep-all) are included, in the tree and in the report. Files are
+        scanned by a thread pool, each scan stops at the first match, and large files are
+        memory-mapped.
+      - Symbolic links to directories are skipped unless --follow-symlinks is provided, in
+        which case link cycles are detected and each physical file is included only once.
+        Symbolic links to files are always included.
+      - If --walk-workers is provided, directories are listed concurrently by a thread pool
+        ahead of the tree and file walks, which hides per-call latency on network mounts.
+      - Jupyter notebooks are reduced to their cell sources, plus up to --notebook-outputs
+        lines of text output per cell, unless --raw-notebooks is provided.
+      - Minified bundles, generated code, lock files and files dominated by base64 data
+        are replaced by a placeholder and listed in the summary, unless --keep-generated
+        is provided.
+      - If --collapse-threshold is provided, directories with more entries than the threshold
+        are summarized in the tree instead of being listed entry by entry.
+      - If --skeleton or --skeleton-glob is provided, the selected Python files are reduced
+        to their API surface (imports, signatures, decorators and docstring first lines).
+      - If --minify is provided, files with the given extensions are minified between
+        reading and formatting, and the token savings are reported.
+      - If --max-files, --max-bytes or --timeout is exceeded, the walk and reads stop early,
+        a partial report marked as truncated is produced and the exit code is 3.
+      - If --snapshot is provided, a snapshot of the run is stored. The next run with the
+        same options reuses the whole report when no file or directory changed, and
+        otherwise only reads and tokenizes the files that changed.
+      - If --since-last is provided, the state of every file is recorded after the run.
+        The next run with --since-last reports only added and modified files and a list of
+        deleted ones instead of the full tree, without reading unchanged files.
+      - If --pipeline is provided, walking, reading, tokenizing and writing overlap instead
+        of running one after another.
+      - If --dialect compact is provided, the tree is indented without connectors, each file
+        is introduced by a single `==> path <==` line, paths are written relative to the
+        directory all files share (unless --no-path-prefix is provided), and the framing
+        tokens saved are shown in the summary.
+      - If --dry-run is provided, only the filtered walk runs: the included files are listed
+        with their sizes and token counts estimated from sizes (or from the last run for
+        unchanged files), and no file is read.
+      - If --attribution is provided, the top files and a per-directory rollup of token
+        spend are shown; --stats-json exports the same data for external tooling.
     """
 
+    guard = ResourceGuard(max_files=max_files, max_bytes=max_bytes, timeout=timeout)
+
+    minifier = None
+    if minify:
+        try:
+            minifier = ContentMinifier(minify)
+        except ValueError as ve:
+            raise typer.BadParameter(str(ve), param_hint="--minify")
+
+    if dialect not in DIALECTS:
+        raise typer.BadParameter(f"Expected one of: {', '.join(DIALECTS)}", param_hint="--dialect")
+
+    content_grep = None
+    if grep:
+        try:
+            content_grep = ContentGrep(
+                grep, grep_all, FileClassifier(text_extensions=text_ext, binary_extensions=binary_ext)
+            )
+        except ValueError as ve:
+            raise typer.BadParameter(str(ve), param_hint="--grep")
+
+    if ref and git_diff:
+        raise typer.BadParameter(
+            "--git-diff shows working tree changes and cannot be combined with --ref", param_hint="--ref"
+        )
+
     # Keep track of the actual .copconignore path we end up using
     used_copconignore_path: Path | None = None
 
@@ -51,6 +271,8 @@ def main(
     # Assign final used path
     used_copconignore_path = copconignore
 
+    # A git ref or an archive stands in for the directory; nothing is checked out or extracted
+    source = None
     try:
         # Build a FileFilter with target support
         file_filter = FileFilter(
@@ -58,75 +280,330 @@ def main(
             user_target_path=discovered_target
         )
 
-        # Generate directory tree
-        tree_generator = FileTreeGenerator(directory, depth, file_filter)
-        directory_tree = tree_generator.generate()
+        def echo_summary(
+            directory_count: int,
+            file_count: int,
+            token_stats: TokenStats,
+            minification_tokens: Optional[Tuple[int, int]],
+            generated_files: Optional[Dict[str, str]] = None,
+            dialect_framing: Optional[Tuple[int, int]] = None,
+        ):
+            if stats_json:
+                token_stats.write_json(stats_json, top_n=top_files, depth=stats_depth)
 
-        # Read file contents
-        reader = FileContentReader(directory, file_filter, exclude_hidden)
-        file_contents = reader.read_all()
+            # Display success message with updated token spend report
+            success_msg = get_success_message(
+                directory_count=directory_count,
+                file_count=file_count,
+                total_tokens=token_stats.total,
+                extension_token_map=token_stats.by_extension(),
+                output_file=str(output_file) if output_file else None,
+                copconignore_path=str(used_copconignore_path) if used_copconignore_path else None,
+                copcontarget_path=str(discovered_target) if discovered_target else None,
+                minification_tokens=minification_tokens,
+                top_files=token_stats.top_files(top_files) if attribution else None,
+                directory_token_map=token_stats.by_directory(stats_depth) if attribution else None,
+                truncation_reason=guard.reason,
+                generated_files=generated_files,
+                dry_run=dry_run,
+                framing_tokens=dialect_framing,
+                contents_searched=bool(grep),
+            )
+            typer.echo(success_msg)
 
-        # Format the textual report from file structure and contents
-        formatter = ReportFormatter(directory.name, directory_tree, file_contents)
-        report = formatter.format()
+        if ref:
+            try:
+                source = GitRefSource(directory, ref)
+            except subprocess.CalledProcessError as e:
+                logger.error(f"Cannot list git ref {ref}: {e.stderr.decode().strip()}")
+                raise typer.Exit(code=1)
+        elif is_archive(directory):
+            source = ArchiveSource(directory)
+        project_name = source.root_name if source else directory.name
 
-        # If git_diff flag is enabled, run git diff and append its output
-        git_diff_output = ""
-        if git_diff:
+        if focus:
             try:
-                result = subprocess.run(
-                    ["git", "diff", "HEAD"],
-                    cwd=directory,
-                    capture_output=True,
-                    text=True,
-                    check=True
+                source = focus_source(
+                    FileContentReader(
+                        directory, file_filter, exclude_hidden, follow_symlinks=follow_symlinks, source=source
+                    ),
+                    focus,
+                    focus_depth,
+                    project_name,
                 )
-                git_diff_output = result.stdout.strip()
-            except Exception as e:
-                git_diff_output = f"[Git diff could not be generated: {e}]"
-            report += "\n\nGit Diff:\n" + git_diff_output
+            except KeyError as e:
+                logger.error(f"--focus {e.args[0]} is not an included Python file of {directory}")
+                raise typer.Exit(code=1)
+
+        if content_grep:
+            source = grep_source(
+                FileContentReader(
+                    directory,
+                    file_filter,
+                    exclude_hidden,
+                    guard=guard,
+                    follow_symlinks=follow_symlinks,
+                    source=source,
+                    walk_workers=walk_workers,
+                ),
+                content_grep,
+                root_name=project_name,
+            )
+
+        # Options that change file contents; token counts are only comparable between runs with
+        # the same ones, and filter files can select parts of files
+        content_options = {
+            "versions": [MINIFIER_VERSION, SKELETON_VERSION, NOTEBOOK_VERSION],
+            "filters": [
+                (str(path.resolve()), path.stat().st_mtime)
+                for path in (copconignore, discovered_target) if path and path.exists()
+            ],
+            "notebooks": None if raw_notebooks else notebook_outputs,
+            "keep_generated": keep_generated,
+            "text_ext": text_ext,
+            "binary_ext": binary_ext,
+            "minify": minify,
+            "skeleton": skeleton,
+            "skeleton_glob": skeleton_glob,
+        }
+
+        if dry_run:
+            # Only metadata from the walk is used; nothing is read, tokenized or copied
+            classifier = FileClassifier(text_extensions=text_ext, binary_extensions=binary_ext)
+            records = list(FileContentReader(
+                directory,
+                file_filter,
+                exclude_hidden,
+                classifier,
+                guard,
+                follow_symlinks=follow_symlinks,
+                source=source,
+                walk_workers=walk_workers,
+            ).iter_records())
+            file_tokens = estimate_tokens(records, classifier, TokenCountCache(directory, options=content_options))
+            if records:
+                typer.echo(format_plan(records, file_tokens) + "\n")
+            echo_summary(len(included_directories(records)) + 1, len(records), TokenStats(file_tokens), None)
+            if guard.tripped:
+                raise typer.Exit(code=EXIT_CODE_TRUNCATED)
+            return
+
+        change_tracker = ChangeTracker(directory) if since_last else None
+        incremental = change_tracker is not None and change_tracker.previous is not None
+
+        report_snapshot = None
+        # An incremental report depends on the previous run, so it is never snapshotted
+        if snapshot and source:
+            logger.warning("--snapshot is not supported with --ref, --focus, --grep or archives; producing a full report")
+        elif snapshot and not since_last:
+            report_snapshot = ReportSnapshot(
+                directory,
+                options={
+                    **content_options,
+                    "depth": depth,
+                    "collapse_threshold": collapse_threshold,
+                    "exclude_hidden": exclude_hidden,
+                    "follow_symlinks": follow_symlinks,
+                    "max_files": max_files,
+                    "max_bytes": max_bytes,
+                    "git_diff": [git_diff, diff_context, diff_renames],
+                    # The pipeline writes the compact dialect without eliding a common prefix
+                    "dialect": [dialect, no_path_prefix, pipeline],
+                },
+                exclude_hidden=exclude_hidden,
+                follow_symlinks=follow_symlinks,
+                file_filter=file_filter,
+            )
+            # A git diff depends on the repository state, so only files are reused with it
+            previous = None if git_diff else report_snapshot.unchanged_report()
+            if previous is not None:
+                logger.info("Nothing changed since the last snapshot; reusing its report")
+                if output_file:
+                    output_file.write_text(previous["report"], encoding="utf-8")
+                    logger.info(f"Output written to {output_file}")
+                else:
+                    ClipboardManager().copy(previous["report"])
+                minification_tokens = previous["minification_tokens"]
+                echo_summary(
+                    previous["directory_count"],
+                    previous["file_count"],
+                    TokenStats(previous["file_tokens"], previous["extra_sources"]),
+                    tuple(minification_tokens) if minification_tokens else None,
+                )
+                return
 
-        # Count tokens & build extension token distribution
-        total_tokens = 0
-        extension_token_map = {}
+        # Generate directory tree; an incremental report lists the changed paths instead
+        if not incremental:
+            tree_generator = FileTreeGenerator(
+                directory,
+                depth,
+                file_filter,
+                collapse_threshold,
+                guard,
+                follow_symlinks=follow_symlinks,
+                source=source,
+                walk_workers=walk_workers,
+                style="indent" if dialect == "compact" else "box",
+            )
+            directory_tree = tree_generator.generate()
+            directory_count, file_count = tree_generator.directory_count, tree_generator.file_count
+
+        # Enumerate files; contents are loaded lazily while the report is produced
+        classifier = FileClassifier(text_extensions=text_ext, binary_extensions=binary_ext)
+        reader = FileContentReader(
+            directory,
+            file_filter,
+            exclude_hidden,
+            classifier,
+            guard,
+            follow_symlinks=follow_symlinks,
+            notebook_converter=None if raw_notebooks else NotebookConverter(notebook_outputs),
+            generated_detector=None if keep_generated else GeneratedFileDetector(),
+            source=source,
+            walk_workers=walk_workers,
+            passthrough=output_file is not None,
+        )
         encoder = tiktoken.get_encoding("cl100k_base")
+        processor = ContentProcessor(
+            encoder,
+            skeleton_extractor=SkeletonExtractor(skeleton_glob or None) if (skeleton or skeleton_glob) else None,
+            minifier=minifier,
+            guard=guard,
+            snapshot=report_snapshot,
+        )
+        walk = reader.iter_records()
+        if incremental:
+            # Only files whose size or mtime changed are read to detect changes
+            all_records = list(walk)
+            change_set = change_tracker.changes(all_records)
+            directory_tree = format_tree_delta(change_set)
+            walk = change_set.changed
+            directory_count = len({Path(record.relative_path).parent for record in walk})
+            file_count = len(walk)
+
+        if pipeline:
+            # The walk runs concurrently with reading, tokenizing and writing
+            report_pipeline = ReportPipeline(processor)
+            contents = report_pipeline.iter_contents(walk)
+            records = report_pipeline.records
+        else:
+            records = list(walk)
+            contents = processor.process(records)
 
-        for rel_path, content in file_contents.items():
-            tokens_for_file = len(encoder.encode(content))
-            total_tokens += tokens_for_file
+        # Format the textual report from file structure and contents; the framing is counted
+        # on the way so the total is exact without encoding the report again
+        report_tokens = ReportTokenCounter(encoder)
+        formatter = ReportFormatter(
+            project_name,
+            directory_tree,
+            contents,
+            tree_heading="Changes Since Last Copy" if incremental else "Directory Structure",
+            dialect=dialect,
+            # Only known up front when the walk completes before the report is written
+            path_prefix=(
+                "" if pipeline or no_path_prefix
+                else common_directory(record.relative_path for record in records)
+            ),
+            token_counter=report_tokens,
+        )
 
-            file_name = Path(rel_path).name
-            if "." in file_name:
-                idx = file_name.rindex(".")
-                extension = f"*{file_name[idx:]}"  # use wildcard to indicate all such files
-            else:
-                extension = "(no extension)"
+        # Token counts of the git diff, keyed by file; filled while the diff is streamed
+        diff_tokens: Dict[str, int] = {}
 
-            extension_token_map[extension] = extension_token_map.get(extension, 0) + tokens_for_file
+        def git_diff_chunks() -> Iterator[str]:
+            heading = "\n\nGit Diff:\n"
+            report_tokens.add(heading)
+            yield heading
+            separator = ""
+            try:
+                for file_diff in GitDiff(
+                    directory, file_filter, exclude_hidden, diff_context, diff_renames
+                ).iter_file_diffs():
+                    text = file_diff.text.rstrip("\n")
+                    diff_tokens[file_diff.path] = diff_tokens.get(file_diff.path, 0) + len(encoder.encode(text))
+                    report_tokens.add(separator)
+                    report_tokens.add(text, counted=True)
+                    yield separator + text
+                    separator = "\n"
+            except Exception as e:
+                note = f"[Git diff could not be generated: {e}]"
+                diff_tokens[""] = len(encoder.encode(note))
+                report_tokens.add(separator)
+                report_tokens.add(note, counted=True)
+                yield separator + note
 
-        # If git diff output is present, count its tokens and add to the token map
-        if git_diff:
-            tokens_for_git_diff = len(encoder.encode(git_diff_output))
-            total_tokens += tokens_for_git_diff
-            extension_token_map["git diff"] = tokens_for_git_diff
+        def report_trailer() -> Iterator[str]:
+            # Evaluated after the contents are emitted, when any truncation is known
+            if git_diff:
+                yield from git_diff_chunks()
+            if guard.tripped:
+                marker = f"\n\n[Report truncated: {guard.reason}]"
+                report_tokens.add(marker)
+                yield marker
 
-        # Write or copy the textual report
+        # Write or copy the textual report; file contents are streamed, not held in memory
         if output_file:
-            formatter.write_to_file(report, output_file)
+            formatter.stream_to_file(output_file, trailer=report_trailer)
         else:
+            report = formatter.format() + "".join(report_trailer())
             ClipboardManager().copy(report)
 
-        # Display success message with updated token spend report
-        success_msg = get_success_message(
-            directory_count=tree_generator.directory_count,
-            file_count=tree_generator.file_count,
-            total_tokens=total_tokens,
-            extension_token_map=extension_token_map,
-            output_file=str(output_file) if output_file else None,
-            copconignore_path=str(used_copconignore_path) if used_copconignore_path else None,
-            copcontarget_path=str(discovered_target) if discovered_target else None,
+        # Aggregate per-file token counts & build extension token distribution
+        token_stats = TokenStats.from_records(records)
+
+        # Attribute git diff tokens per file
+        for path, tokens in diff_tokens.items():
+            token_stats.add_source(f"git diff: {path}" if path else "git diff", tokens)
+        if git_diff and not diff_tokens:
+            token_stats.add_source("git diff", 0)
+
+        # The tree, file headers and separators, so the total is the exact size of the report
+        token_stats.add_source("report framing", report_tokens.tokens)
+
+        # Measure the framing the compact dialect saved over the standard layout
+        dialect_framing = None
+        if dialect == "compact":
+            paths = [record.relative_path for record in records if record.token_count is not None]
+            standard = ReportFormatter(
+                project_name,
+                directory_tree if incremental else tree_generator.render("box"),
+                {},
+                tree_heading=formatter.tree_heading,
+            )
+            dialect_framing = (
+                framing_tokens(standard, paths, encoder),
+                framing_tokens(formatter, paths, encoder),
+            )
+
+        # Remembered so a later --dry-run can estimate unchanged files exactly
+        TokenCountCache(directory, options=content_options).save(records)
+
+        # A truncated report is incomplete, so it is never stored for reuse
+        if report_snapshot and not guard.tripped:
+            report_snapshot.save(
+                output_file.read_text(encoding="utf-8") if output_file else report,
+                token_stats,
+                directory_count,
+                file_count,
+                processor.minification_tokens,
+            )
+            logger.info(f"Reused {report_snapshot.reused_count} unchanged files from the last snapshot")
+
+        # A truncated run has not seen every file, so it would record false deletions
+        if change_tracker and not guard.tripped:
+            change_tracker.save(all_records if incremental else records)
+
+        echo_summary(
+            directory_count,
+            file_count,
+            token_stats,
+            processor.minification_tokens,
+            reader.generated_files,
+            dialect_framing,
         )
-        typer.echo(success_msg)
+
+        if guard.tripped:
+            raise typer.Exit(code=EXIT_CODE_TRUNCATED)
 
     except FileReadError as fre:
         logger.error(f"File read error: {fre}")
@@ -134,9 +611,15 @@ def main(
     except ClipboardError as ce:
         logger.error(f"Clipboard error: {ce}")
         raise typer.Exit(code=1)
+    except typer.Exit:
+        raise
     except Exception as e:
         logger.exception("An unexpected error occurred.")
         raise typer.Exit(code=1)
+    finally:
+        # Stops a `git cat-file` process and closes an archive, also on errors and early exits
+        if source:
+            source.close()
 
 if __name__ == "__main__":
     app()
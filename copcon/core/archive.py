@@ -0,0 +1,211 @@
+"""Archive Sources for Copcon.
+
+This module lets a zip or tar archive (optionally gzip, bzip2 or xz compressed) stand in
+for a project directory. Members are enumerated from the archive's index, the directory
+structure is derived from member paths, and member contents are read straight from the
+archive when a file is loaded, so nothing is extracted to disk.
+
+`MemberSource` holds the index shared by all such sources, so other containers (such as a
+git commit) can stand in for a directory the same way.
+"""
+
+import tarfile
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+from copcon.core.walker import TreeEntry
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+ROOT = PurePosixPath(".")
+
+
+def is_archive(path: Path) -> bool:
+    """Whether a path is an archive file that can be reported on directly."""
+    return path.name.lower().endswith(ARCHIVE_SUFFIXES) and path.is_file()
+
+
+def _archive_stem(name: str) -> str:
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class ArchiveMember(NamedTuple):
+    """A regular file inside an archive.
+
+    Attributes:
+        path (str): The member path relative to the project root, with `/` separators.
+        size (int): The uncompressed size in bytes.
+        mtime (float): The modification time recorded in the archive.
+    """
+
+    path: str
+    size: int
+    mtime: float
+
+
+class MemberSource(ABC):
+    """A read-only view of a set of files, indexed by relative path, as a project directory.
+
+    Subclasses index their files with `_index` and implement `read` and `close`.
+
+    Attributes:
+        root_name (str): The name shown for the project root.
+        members (List[ArchiveMember]): The regular files, in the source's natural order.
+    """
+
+    root_name: str
+
+    def _index(self, entries: Iterable[Tuple[List[str], int, float, Any]]):
+        """Build the member list and directory structure.
+
+        Args:
+            entries (Iterable[Tuple[List[str], int, float, Any]]): Path parts, size,
+                modification time and a source-specific handle for `read`, per file.
+        """
+        self._handles: Dict[str, Any] = {}
+        self.members: List[ArchiveMember] = []
+        children: Dict[PurePosixPath, Dict[str, TreeEntry]] = {ROOT: {}}
+        for parts, size, mtime, handle in entries:
+            relative_path = "/".join(parts)
+            if relative_path in self._handles:
+                # A later duplicate overrides an earlier one, as when extracting.
+                self.members = [member for member in self.members if member.path != relative_path]
+            self._handles[relative_path] = handle
+            self.members.append(ArchiveMember(relative_path, size, mtime))
+            parent = ROOT
+            for depth, part in enumerate(parts):
+                path = parent / part
+                is_dir = depth < len(parts) - 1
+                children[parent].setdefault(part, TreeEntry(part, path, is_dir))
+                if is_dir:
+                    children.setdefault(path, {})
+                parent = path
+        self._sizes = {member.path: member.size for member in self.members}
+        self._children = {
+            directory: sorted(entries.values(), key=lambda e: (not e.is_dir, e.name.lower()))
+            for directory, entries in children.items()
+        }
+
+    def iter_files(self) -> Iterator[ArchiveMember]:
+        """Yield every regular file in the source's order, which is the cheapest order to read in."""
+        return iter(self.members)
+
+    def scan_directory(self, directory: PurePosixPath) -> List[TreeEntry]:
+        """List a directory in tree order, like `walker.scan_directory`.
+
+        Args:
+            directory (PurePosixPath): The directory, relative to the root (`.`).
+
+        Returns:
+            List[TreeEntry]: The sorted entries, with paths relative to the root.
+
+        Raises:
+            OSError: If the directory does not exist.
+        """
+        try:
+            return self._children[directory]
+        except KeyError:
+            raise FileNotFoundError(f"No directory {directory} in {self.root_name}")
+
+    def size(self, relative_path: Union[str, PurePosixPath]) -> int:
+        """The uncompressed size of a member."""
+        return self._sizes[PurePosixPath(relative_path).as_posix()]
+
+    @abstractmethod
+    def read(self, relative_path: str) -> bytes:
+        """Read a member's content.
+
+        Args:
+            relative_path (str): The member path relative to the project root.
+
+        Returns:
+            bytes: The content.
+
+        Raises:
+            OSError: If the member cannot be read.
+        """
+
+    def close(self):
+        """Release the underlying resources."""
+
+
+class ArchiveSource(MemberSource):
+    """A read-only view of an archive as a project directory.
+
+    If every member lies below one top-level directory, as in most source tarballs, that
+    directory is treated as the project root.
+    """
+
+    def __init__(self, archive_path: Path):
+        """
+        Open the archive and index its members.
+
+        Args:
+            archive_path (Path): The zip or tar archive.
+
+        Raises:
+            zipfile.BadZipFile, tarfile.TarError: If the archive cannot be read.
+        """
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        entries = []
+        if archive_path.name.lower().endswith(".zip"):
+            self._zip = zipfile.ZipFile(archive_path)
+            self._tar = None
+            for info in self._zip.infolist():
+                if not info.is_dir():
+                    entries.append((info.filename, info.file_size, time.mktime(info.date_time + (0, 0, -1)), info))
+        else:
+            self._zip = None
+            self._tar = tarfile.open(archive_path, "r:*")
+            for info in self._tar.getmembers():
+                if info.isfile():
+                    entries.append((info.name, info.size, float(info.mtime), info))
+
+        paths = []
+        for name, size, mtime, info in entries:
+            parts = [part for part in PurePosixPath(name.lstrip("/")).parts if part != "."]
+            # Skip unsafe or empty member names
+            if not parts or ".." in parts:
+                continue
+            paths.append((parts, size, mtime, info))
+
+        top_levels = {parts[0] for parts, *_ in paths}
+        if len(top_levels) == 1 and all(len(parts) > 1 for parts, *_ in paths):
+            self.root_name = top_levels.pop()
+            paths = [(parts[1:], size, mtime, info) for parts, size, mtime, info in paths]
+        else:
+            self.root_name = _archive_stem(archive_path.name)
+        self._index(paths)
+
+    def read(self, relative_path: str) -> bytes:
+        """Read a member's content from the archive.
+
+        Args:
+            relative_path (str): The member path relative to the project root.
+
+        Returns:
+            bytes: The uncompressed content.
+
+        Raises:
+            OSError: If the member cannot be read.
+        """
+        info = self._handles[relative_path]
+        # Archive file objects share a single position, so reads are serialized.
+        with self._lock:
+            if self._zip is not None:
+                return self._zip.read(info)
+            member = self._tar.extractfile(info)
+            if member is None:
+                raise OSError(f"Cannot read {relative_path} from {self.archive_path}")
+            return member.read()
+
+    def close(self):
+        """Close the underlying archive."""
+        (self._zip or self._tar).close()
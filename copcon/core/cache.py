@@ -0,0 +1,111 @@
+"""Content-Addressed Caching for Copcon.
+
+This module provides a small on-disk cache keyed by content hash. It is used to avoid
+recomputing artifacts derived from file contents (such as minified output) for files
+that have not changed between runs.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Union
+from copcon.utils.logger import logger
+
+
+def content_hash(data: Union[bytes, str]) -> str:
+    """Compute a stable hash of file content.
+
+    Args:
+        data (bytes | str): The content to hash. Strings are encoded as UTF-8.
+
+    Returns:
+        str: A hexadecimal digest identifying the content.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="surrogatepass")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def default_cache_dir() -> Path:
+    """Determine the root directory used for Copcon's caches.
+
+    The `COPCON_CACHE_DIR` environment variable takes precedence, followed by
+    `XDG_CACHE_HOME`, falling back to `~/.cache/copcon`.
+
+    Returns:
+        Path: The cache root directory.
+    """
+    override = os.environ.get("COPCON_CACHE_DIR")
+    if override:
+        return Path(override)
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache) / "copcon"
+    return Path.home() / ".cache" / "copcon"
+
+
+class ContentCache:
+    """A namespaced, on-disk key/value store for derived text artifacts.
+
+    Cache failures are never fatal: a read error behaves like a cache miss and a
+    write error is logged and ignored.
+    """
+
+    def __init__(self, namespace: str, cache_dir: Optional[Path] = None):
+        """
+        Initialize the ContentCache.
+
+        Args:
+            namespace (str): Subdirectory separating artifacts of different kinds.
+            cache_dir (Path, optional): Cache root. Defaults to `default_cache_dir()`.
+        """
+        self.directory = (cache_dir or default_cache_dir()) / namespace
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[str]:
+        """Retrieve a cached value.
+
+        Args:
+            key (str): The cache key, typically a content hash.
+
+        Returns:
+            Optional[str]: The cached value, or None on a miss.
+        """
+        try:
+            return self._path_for(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Cache read failed for {key}: {e}")
+            return None
+
+    def set(self, key: str, value: str):
+        """Store a value in the cache.
+
+        Args:
+            key (str): The cache key, typically a content hash.
+            value (str): The value to store.
+        """
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(value, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Cache write failed for {key}: {e}")
+
+    def delete(self, key: str):
+        """Remove a value from the cache, if it is there.
+
+        Args:
+            key (str): The cache key.
+        """
+        try:
+            self._path_for(key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.debug(f"Cache delete failed for {key}: {e}")
@@ -0,0 +1,132 @@
+"""Change Tracking for Copcon.
+
+This module supports incremental reports. After each run the size, modification time and
+content hash of every included file are stored per project. The next run compares the
+current files against that state: files whose size and modification time are unchanged
+are skipped without being read, files whose metadata changed are read and compared by
+content hash, and files that disappeared are reported as deleted.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from copcon.core.cache import ContentCache, content_hash
+from copcon.core.file_record import FileRecord
+from copcon.exceptions import FileReadError
+from copcon.utils.logger import logger
+
+
+class ChangeSet(NamedTuple):
+    """The files that changed since the previous run.
+
+    Attributes:
+        added (List[FileRecord]): Files that did not exist in the previous run.
+        modified (List[FileRecord]): Files whose content changed.
+        deleted (List[str]): Relative paths of files that no longer exist.
+    """
+
+    added: List[FileRecord]
+    modified: List[FileRecord]
+    deleted: List[str]
+
+    @property
+    def changed(self) -> List[FileRecord]:
+        """Added and modified files, in path order."""
+        return sorted(self.added + self.modified, key=lambda record: record.relative_path)
+
+
+def format_tree_delta(change_set: ChangeSet) -> str:
+    """Render a change set as a compact list of added, modified and deleted paths.
+
+    Args:
+        change_set (ChangeSet): The changes to render.
+
+    Returns:
+        str: One line per changed path, prefixed with `+`, `~` or `-`.
+    """
+    lines = [(record.relative_path, "+") for record in change_set.added]
+    lines += [(record.relative_path, "~") for record in change_set.modified]
+    lines += [(path, "-") for path in change_set.deleted]
+    if not lines:
+        return "(no changes)"
+    return "\n".join(f"{marker} {path}" for path, marker in sorted(lines))
+
+
+class ChangeTracker:
+    """Stores the file state of a project between runs and computes what changed."""
+
+    def __init__(self, directory: Path, cache_dir: Optional[Path] = None):
+        """
+        Initialize the ChangeTracker and load the previous state of the project, if any.
+
+        Args:
+            directory (Path): The project directory.
+            cache_dir (Path, optional): Cache root. Defaults to Copcon's cache directory.
+
+        Attributes:
+            previous (Optional[Dict[str, list]]): `[size, mtime, content_hash]` per relative
+                path from the previous run, or None if the project has not been tracked yet.
+        """
+        self.key = content_hash(str(directory.resolve()))
+        self._cache = ContentCache("since-last", cache_dir)
+        self.previous: Optional[Dict[str, list]] = None
+        stored = self._cache.get(self.key)
+        if stored is not None:
+            try:
+                self.previous = json.loads(stored)
+            except ValueError:
+                logger.debug(f"Ignoring unreadable change state {self.key}")
+
+    def changes(self, records: Iterable[FileRecord]) -> ChangeSet:
+        """Compare the current files against the previous run.
+
+        Only files whose size or modification time changed are read. Their content is left
+        loaded for the report; unchanged content is released again.
+
+        Args:
+            records (Iterable[FileRecord]): The current files.
+
+        Returns:
+            ChangeSet: The added, modified and deleted files.
+        """
+        previous = self.previous or {}
+        added: List[FileRecord] = []
+        modified: List[FileRecord] = []
+        seen = set()
+        for record in records:
+            seen.add(record.relative_path)
+            entry = previous.get(record.relative_path)
+            if entry is None:
+                added.append(record)
+                continue
+            size, mtime, stored_hash = entry
+            if record.size == size and record.mtime == mtime:
+                record.content_hash = stored_hash
+                continue
+            try:
+                record.content
+            except FileReadError:
+                # Reported when the report is produced
+                modified.append(record)
+                continue
+            if record.content_hash == stored_hash:
+                record.release()
+            else:
+                modified.append(record)
+        deleted = sorted(path for path in previous if path not in seen)
+        return ChangeSet(added, modified, deleted)
+
+    def save(self, records: Iterable[FileRecord]):
+        """Store the state of the current files for the next run.
+
+        Args:
+            records (Iterable[FileRecord]): The current files. Files whose content hash is
+                unknown (e.g. because they could not be read) are left out, so they count
+                as added next time.
+        """
+        state = {
+            record.relative_path: [record.size, record.mtime, record.content_hash]
+            for record in records
+            if record.content_hash is not None
+        }
+        self._cache.set(self.key, json.dumps(state))
@@ -0,0 +1,141 @@
+"""Dry-Run Planning for Copcon.
+
+This module shows what a run would include and roughly what it would cost without reading
+any file. Only the filtered walk runs, using the metadata it collects anyway. Token counts
+come from the last full run with the same content options where a file's size and
+modification time are unchanged, and are otherwise estimated from the file size.
+"""
+
+import json
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, List, Optional
+from copcon.core.cache import ContentCache, content_hash
+from copcon.core.file_classifier import FileClassifier
+from copcon.core.file_record import FileRecord
+from copcon.core.file_tree import BYTES_PER_TOKEN, format_count, format_size
+from copcon.utils.logger import logger
+
+
+class TokenCountCache:
+    """Per-project token counts from previous runs, keyed by file size and modification time.
+
+    Counts are kept separately for each set of options that changes file contents, such as
+    minification, so an estimate is never taken from differently processed files.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        cache_dir: Optional[Path] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize the TokenCountCache and load the stored counts of the project, if any.
+
+        Args:
+            directory (Path): The project directory.
+            cache_dir (Path, optional): Cache root. Defaults to Copcon's cache directory.
+            options (Dict[str, Any], optional): JSON-serializable options that affect file
+                contents.
+        """
+        self.key = content_hash(json.dumps(
+            {"directory": str(directory.resolve()), "options": options or {}},
+            sort_keys=True,
+            default=str,
+        ))
+        self._cache = ContentCache("token-counts", cache_dir)
+        self.counts: Dict[str, list] = {}
+        stored = self._cache.get(self.key)
+        if stored is not None:
+            try:
+                self.counts = json.loads(stored)
+            except ValueError:
+                logger.debug(f"Ignoring unreadable token counts {self.key}")
+
+    def get(self, record: FileRecord) -> Optional[int]:
+        """The stored token count of an unchanged file, or None."""
+        entry = self.counts.get(record.relative_path)
+        if entry is None or entry[0] != record.size or entry[1] != record.mtime:
+            return None
+        return entry[2]
+
+    def save(self, records: Iterable[FileRecord]):
+        """Store the token counts of processed files, keeping those of other files.
+
+        Args:
+            records (Iterable[FileRecord]): Processed records. Records without a token count
+                are left out.
+        """
+        for record in records:
+            if record.token_count is not None:
+                self.counts[record.relative_path] = [record.size, record.mtime, record.token_count]
+        self._cache.set(self.key, json.dumps(self.counts))
+
+
+def estimate_tokens(
+    records: Iterable[FileRecord],
+    classifier: FileClassifier,
+    token_counts: Optional[TokenCountCache] = None,
+) -> Dict[str, int]:
+    """Estimate the token count of each file without reading it.
+
+    Args:
+        records (Iterable[FileRecord]): The files of the walk.
+        classifier (FileClassifier): Recognizes binary files by name; those are reported
+            as a short placeholder.
+        token_counts (TokenCountCache, optional): Counts from previous runs, used for files
+            that have not changed.
+
+    Returns:
+        Dict[str, int]: Token counts keyed by relative path.
+    """
+    estimates = {}
+    for record in records:
+        cached = token_counts.get(record) if token_counts else None
+        if cached is not None:
+            estimates[record.relative_path] = cached
+        elif classifier.classify_name(record.relative_path):
+            estimates[record.relative_path] = len(f"[Binary file] Size: {record.size} bytes") // BYTES_PER_TOKEN
+        else:
+            estimates[record.relative_path] = record.size // BYTES_PER_TOKEN
+    return estimates
+
+
+def included_directories(records: Iterable[FileRecord]) -> List[str]:
+    """The directories holding at least one included file, excluding the project root."""
+    directories = set()
+    for record in records:
+        for parent in PurePosixPath(Path(record.relative_path).as_posix()).parents:
+            if parent != PurePosixPath("."):
+                directories.add(parent.as_posix())
+    return sorted(directories)
+
+
+def format_plan(records: List[FileRecord], file_tokens: Dict[str, int]) -> str:
+    """List the included directories and files with their sizes and token counts.
+
+    Directories are listed before their contents, with the totals of everything below them.
+
+    Args:
+        records (List[FileRecord]): The files of the walk.
+        file_tokens (Dict[str, int]): Token counts keyed by relative path.
+
+    Returns:
+        str: One line per directory and file.
+    """
+    directory_totals: Dict[str, List[int]] = {}
+    rows = []
+    for record in records:
+        path = PurePosixPath(Path(record.relative_path).as_posix())
+        tokens = file_tokens.get(record.relative_path, 0)
+        for parent in path.parents:
+            if parent != PurePosixPath("."):
+                totals = directory_totals.setdefault(parent.as_posix(), [0, 0])
+                totals[0] += record.size
+                totals[1] += tokens
+        rows.append((path.as_posix(), record.size, tokens))
+    rows.extend((f"{directory}/", size, tokens) for directory, (size, tokens) in directory_totals.items())
+    return "\n".join(
+        f"{format_size(size):>9}  {'~' + format_count(tokens):>8} tokens  {path}"
+        for path, size, tokens in sorted(rows, key=lambda row: PurePosixPath(row[0]).parts)
+    )
@@ -0,0 +1,160 @@
+"""File Classification for Copcon.
+
+This module decides whether a file is text or binary. Well-known extensions are classified
+from the file name alone, without any I/O. Only files with unknown extensions fall back to
+sniffing their first bytes, which also recognizes UTF-16/UTF-32 text by its byte order mark
+or its NUL-byte pattern instead of mistaking it for binary data.
+"""
+
+import codecs
+from pathlib import PurePath
+from typing import Iterable, NamedTuple, Optional
+
+# Number of leading bytes inspected when sniffing file content.
+SNIFF_SIZE = 8192
+
+TEXT_EXTENSIONS = {
+    ".py", ".pyi", ".pyx", ".pxd", ".ipynb", ".txt", ".md", ".markdown", ".rst", ".adoc",
+    ".json", ".jsonl", ".yaml", ".yml", ".toml", ".ini", ".cfg", ".conf", ".env", ".properties",
+    ".csv", ".tsv", ".xml", ".svg", ".html", ".htm", ".css", ".scss", ".sass", ".less",
+    ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".vue", ".svelte", ".c", ".h", ".cc",
+    ".cpp", ".cxx", ".hpp", ".hh", ".cs", ".java", ".kt", ".kts", ".scala", ".go", ".rs",
+    ".swift", ".m", ".mm", ".rb", ".php", ".pl", ".pm", ".lua", ".r", ".jl", ".dart",
+    ".ex", ".exs", ".erl", ".hs", ".ml", ".clj", ".sql", ".graphql", ".proto", ".sh",
+    ".bash", ".zsh", ".fish", ".ps1", ".bat", ".cmd", ".tex", ".bib", ".gradle", ".tf",
+    ".lock", ".gitignore", ".dockerignore", ".editorconfig",
+}
+
+TEXT_FILENAMES = {
+    "makefile", "dockerfile", "license", "readme", "changelog", "authors", "contributing",
+    "gemfile", "rakefile", "procfile", "vagrantfile", "jenkinsfile",
+}
+
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".icns", ".webp", ".tif", ".tiff",
+    ".psd", ".heic", ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar",
+    ".tar", ".jar", ".war", ".whl", ".egg", ".exe", ".dll", ".so", ".dylib", ".o", ".a",
+    ".lib", ".obj", ".class", ".pyc", ".pyo", ".pyd", ".wasm", ".mp3", ".mp4", ".m4a",
+    ".wav", ".flac", ".ogg", ".avi", ".mov", ".mkv", ".webm", ".ttf", ".otf", ".woff",
+    ".woff2", ".eot", ".sqlite", ".sqlite3", ".db", ".npy", ".npz", ".pkl", ".pickle",
+    ".parquet", ".feather", ".h5", ".hdf5", ".onnx", ".pt", ".pth", ".ckpt",
+    ".safetensors", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt", ".ods",
+}
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class Classification(NamedTuple):
+    """The result of classifying a file.
+
+    Attributes:
+        is_binary (bool): Whether the file should be treated as binary.
+        encoding (Optional[str]): The text encoding to decode with, if known.
+    """
+
+    is_binary: bool
+    encoding: Optional[str] = None
+
+
+def _normalize_extension(ext: str) -> str:
+    ext = ext.strip().lower()
+    return ext if ext.startswith(".") else f".{ext}"
+
+
+def detect_text_encoding(head: bytes) -> Optional[str]:
+    """Detect the encoding of text from its first bytes.
+
+    Recognizes UTF-8/16/32 byte order marks, and BOM-less UTF-16 whose ASCII characters
+    leave a NUL byte in every other position.
+
+    Args:
+        head (bytes): The first bytes of the file.
+
+    Returns:
+        Optional[str]: The detected encoding, or None if the bytes carry no such signal.
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    sample = head[:len(head) - (len(head) % 2)]
+    if len(sample) < 4 or b"\0" not in sample:
+        return None
+    pairs = len(sample) // 2
+    even_nuls = sample[0::2].count(0)
+    odd_nuls = sample[1::2].count(0)
+    if odd_nuls >= pairs * 0.3 and even_nuls <= pairs * 0.02:
+        encoding = "utf-16-le"
+    elif even_nuls >= pairs * 0.3 and odd_nuls <= pairs * 0.02:
+        encoding = "utf-16-be"
+    else:
+        return None
+    try:
+        sample.decode(encoding)
+    except UnicodeDecodeError:
+        return None
+    return encoding
+
+
+class FileClassifier:
+    """Classifies files as text or binary, using the extension table before any I/O.
+
+    The built-in tables can be extended with additional text or binary extensions.
+    """
+
+    def __init__(
+        self,
+        text_extensions: Optional[Iterable[str]] = None,
+        binary_extensions: Optional[Iterable[str]] = None,
+    ):
+        """
+        Initialize the FileClassifier.
+
+        Args:
+            text_extensions (Iterable[str], optional): Extra extensions to treat as text.
+            binary_extensions (Iterable[str], optional): Extra extensions to treat as binary.
+                User-supplied extensions override the built-in tables.
+        """
+        extra_text = {_normalize_extension(ext) for ext in text_extensions or ()}
+        extra_binary = {_normalize_extension(ext) for ext in binary_extensions or ()}
+        self.text_extensions = (TEXT_EXTENSIONS - extra_binary) | extra_text
+        self.binary_extensions = (BINARY_EXTENSIONS - extra_text) | extra_binary
+
+    def classify_name(self, path: str) -> Optional[bool]:
+        """Classify a file from its name alone.
+
+        Args:
+            path (str): The file path or name.
+
+        Returns:
+            Optional[bool]: True for binary, False for text, or None if the extension is unknown.
+        """
+        name = PurePath(path).name.lower()
+        suffix = PurePath(name).suffix or (name if name.startswith(".") else "")
+        if suffix in self.binary_extensions:
+            return True
+        if suffix in self.text_extensions or name in TEXT_FILENAMES:
+            return False
+        return None
+
+    def sniff(self, head: bytes) -> Classification:
+        """Classify a file from its first bytes.
+
+        Args:
+            head (bytes): Up to `SNIFF_SIZE` leading bytes of the file.
+
+        Returns:
+            Classification: Whether the content is binary, and its encoding if it is text.
+        """
+        encoding = detect_text_encoding(head)
+        if encoding is not None:
+            return Classification(False, encoding)
+        if b"\0" in head:
+            return Classification(True)
+        return Classification(False, "utf-8")
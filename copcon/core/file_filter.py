@@ -2,12 +2,13 @@
 
 This module provides functionality to filter files and directories based on ignore patterns
 specified in `.copconignore` files. It also supports a `.copcontarget` file to target 
-specific directories and files.
+specific directories and files, or selected lines and symbols of a file.
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 import pathspec
+from copcon.core.selection import Selector, parse_target_entry, selection_key
 from copcon.exceptions import FileReadError
 from copcon.utils.logger import logger
 import importlib.resources as pkg_resources
@@ -54,10 +55,26 @@ class FileFilter:
 
         # Load target patterns if a .copcontarget file is provided
         self.target_spec = None
+        # Line ranges and symbols selected per file, from entries like `src/app.py:10-20`
+        self.selections: Dict[str, List[Selector]] = {}
         if user_target_path and user_target_path.exists():
             try:
                 with user_target_path.open() as f:
-                    target_patterns = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+                    target_entries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+                target_patterns = []
+                whole_files = set()
+                for entry in target_entries:
+                    pattern, selector = parse_target_entry(entry)
+                    if selector is None:
+                        target_patterns.append(pattern)
+                        whole_files.add(selection_key(pattern))
+                    else:
+                        # A selection names one file relative to the project root, wherever that is
+                        target_patterns.append("**/" + selection_key(pattern))
+                        self.selections.setdefault(selection_key(pattern), []).append(selector)
+                # A file that is also targeted as a whole is included in full
+                for path in whole_files:
+                    self.selections.pop(path, None)
                 if target_patterns:
                     self.target_spec = pathspec.PathSpec.from_lines("gitwildmatch", target_patterns)
                     logger.debug(f"Loaded target patterns from {user_target_path}")
@@ -96,8 +113,19 @@ class FileFilter:
         Returns:
             bool: True if the path should be ignored, False otherwise.
         """
-        path_str = str(path.relative_to(path.anchor))
-        if path.is_dir():
+        return self.should_ignore_path(str(path.relative_to(path.anchor)), path.is_dir())
+
+    def should_ignore_path(self, path_str: str, is_dir: bool) -> bool:
+        """Determine whether a path given as a string should be ignored, without touching the disk.
+
+        Args:
+            path_str (str): The path to check, e.g. the path of an archive member.
+            is_dir (bool): Whether the path is a directory.
+
+        Returns:
+            bool: True if the path should be ignored, False otherwise.
+        """
+        if is_dir:
             path_str += "/"
 
         # Apply .copcontarget: if target_spec exists and path does not match, ignore it.
@@ -4,59 +4,233 @@ This module provides functionality to read the contents of files in the project
 handling both text and binary files appropriately.
 """
 
-from pathlib import Path
-from typing import Dict, List
+import io
+import os
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from copcon.core.archive import MemberSource
+from copcon.core.file_classifier import SNIFF_SIZE, FileClassifier, detect_text_encoding
 from copcon.core.file_filter import FileFilter
+from copcon.core.file_record import FileRecord
+from copcon.core.generated import GeneratedFileDetector
+from copcon.core.guards import ResourceGuard
+from copcon.core.notebook import NotebookConverter
+from copcon.core.passthrough import source_text
+from copcon.core.selection import apply_selection, last_selected_line, selection_key
+from copcon.core.walker import ParallelScanner, VisitedSet, walk_files
 from copcon.exceptions import FileReadError
 from copcon.utils.logger import logger
 
+# Size of the reads used when only the first lines of a file are needed.
+READ_CHUNK_SIZE = 64 * 1024
+
+
 class FileContentReader:
-    def __init__(self, base_directory: Path, file_filter: FileFilter, exclude_hidden: bool):
+    def __init__(
+        self,
+        base_directory: Path,
+        file_filter: FileFilter,
+        exclude_hidden: bool,
+        classifier: Optional[FileClassifier] = None,
+        guard: Optional[ResourceGuard] = None,
+        follow_symlinks: bool = False,
+        notebook_converter: Optional[NotebookConverter] = None,
+        generated_detector: Optional[GeneratedFileDetector] = None,
+        source: Optional[MemberSource] = None,
+        walk_workers: int = 0,
+        passthrough: bool = False,
+    ):
         self.base_directory = base_directory
         self.file_filter = file_filter
         self.exclude_hidden = exclude_hidden
+        self.classifier = classifier or FileClassifier()
+        self.guard = guard
+        self.follow_symlinks = follow_symlinks
+        self.notebook_converter = notebook_converter
+        self.generated_detector = generated_detector
+        self.source = source
+        # Threads listing directories ahead of the walk; 0 walks on the calling thread only
+        self.walk_workers = walk_workers
+        # Load untransformed UTF-8 files as SourceText, so they can be copied into an output file
+        self.passthrough = passthrough and source is None
+        # Files replaced by a placeholder because they were detected as generated, with the reason
+        self.generated_files: Dict[str, str] = {}
+
+    def iter_records(self) -> Iterator[FileRecord]:
+        """Yield a record for every included file without reading any content.
+
+        Content is loaded when a record's `content` is first accessed. If a resource guard
+        is set, iteration stops as soon as it is tripped. When symbolic links are followed,
+        a file reachable through several paths is yielded only once, under the first path.
+
+        Yields:
+            FileRecord: One record per included file.
+        """
+        if self.source is not None:
+            yield from self._iter_source_records()
+            return
+        # Everything below a hidden directory is hidden, so such directories are not walked.
+        prune = self._is_hidden if self.exclude_hidden else None
+        scanner = None
+        if self.walk_workers:
+            scanner = ParallelScanner(self.follow_symlinks, self.walk_workers, prune, stat_files=True)
+            scanner.start(self.base_directory)
+        try:
+            walk = walk_files(self.base_directory, self.follow_symlinks, prune, scanner)
+            yield from self._iter_walk_records(walk)
+        finally:
+            if scanner is not None:
+                scanner.close()
+
+    def _iter_walk_records(self, walk: Iterator[Tuple[Path, os.stat_result]]) -> Iterator[FileRecord]:
+        loader = self._load_record
+        file_count = 0
+        byte_count = 0
+        visited = VisitedSet() if self.follow_symlinks else None
+        for file_path, file_stat in walk:
+            if self.guard and not self.guard.check_time():
+                return
+            if self.exclude_hidden and self._is_hidden(file_path):
+                continue
+            # The walk only yields files, so the filter needs no stat to tell
+            if self.file_filter.should_ignore_path(str(file_path.relative_to(file_path.anchor)), False):
+                continue
+            if visited is not None and not visited.first_visit(file_stat):
+                continue
+            if self.guard and not self.guard.check(file_count + 1, byte_count + file_stat.st_size):
+                return
+            file_count += 1
+            byte_count += file_stat.st_size
+            relative_path = str(file_path.relative_to(self.base_directory))
+            yield FileRecord(
+                relative_path,
+                file_stat.st_size,
+                file_stat.st_mtime,
+                loader,
+                is_binary=self.classifier.classify_name(relative_path),
+            )
+
+    def _iter_source_records(self) -> Iterator[FileRecord]:
+        # The source's order is kept, e.g. so compressed tar members are read sequentially.
+        file_count = 0
+        byte_count = 0
+        for member in self.source.iter_files():
+            if self.guard and not self.guard.check_time():
+                return
+            if self.exclude_hidden and self._is_hidden(PurePosixPath(member.path)):
+                continue
+            if self.file_filter.should_ignore_path(member.path, False):
+                continue
+            if self.guard and not self.guard.check(file_count + 1, byte_count + member.size):
+                return
+            file_count += 1
+            byte_count += member.size
+            yield FileRecord(
+                member.path,
+                member.size,
+                member.mtime,
+                self._load_record,
+                is_binary=self.classifier.classify_name(member.path),
+            )
 
     def read_all(self) -> Dict[str, str]:
         file_contents = {}
         errors: List[FileReadError] = []
-        for file_path in self.base_directory.rglob("*"):
-            if file_path.is_file():
-                if self.exclude_hidden and self._is_hidden(file_path):
-                    continue
-                if self.file_filter.should_ignore(file_path):
-                    continue
-                try:
-                    content = self._read_file(file_path)
-                    relative_path = str(file_path.relative_to(self.base_directory))
-                    file_contents[relative_path] = content
-                except FileReadError as e:
-                    logger.warning(f"Skipping file {file_path}: {e}")
-                    errors.append(e)
+        for record in self.iter_records():
+            try:
+                file_contents[record.relative_path] = record.content
+            except FileReadError as e:
+                logger.warning(f"Skipping file {record.relative_path}: {e}")
+                errors.append(e)
+            finally:
+                record.release()
         if errors:
             raise FileReadError(f"Encountered errors while reading files: {[str(e) for e in errors]}")
         return file_contents
 
-    def _is_hidden(self, path: Path) -> bool:
+    def _is_hidden(self, path: PurePosixPath) -> bool:
         return any(part.startswith(".") for part in path.parts)
 
-    def _read_file(self, file_path: Path) -> str:
+    def _load_record(self, record: FileRecord) -> str:
+        file_path = self.base_directory / record.relative_path
+        # Known extensions are classified without touching the file.
+        known_binary = self.classifier.classify_name(record.relative_path)
+        if known_binary:
+            record.is_binary = True
+            return self._binary_placeholder(record)
+        if self.notebook_converter and file_path.suffix.lower() == ".ipynb":
+            try:
+                if self.source is not None:
+                    text = self.notebook_converter.convert_buffer(
+                        self.source.read(record.relative_path), record.relative_path
+                    )
+                else:
+                    text = self.notebook_converter.convert(file_path)
+            except OSError as e:
+                logger.error(f"Error reading file {file_path}: {e}")
+                raise FileReadError(f"Error reading file {file_path}: {e}")
+            if text is not None:
+                record.is_binary = False
+                return text
         try:
-            if self._is_binary(file_path):
-                size = file_path.stat().st_size
-                return f"[Binary file] Size: {size} bytes"
-            else:
-                return file_path.read_text(encoding="utf-8", errors="replace")
+            with self._open(record) as f:
+                head = f.read(SNIFF_SIZE)
+                if known_binary is None:
+                    classification = self.classifier.sniff(head)
+                    if classification.is_binary:
+                        record.is_binary = True
+                        return self._binary_placeholder(record)
+                    encoding = classification.encoding
+                else:
+                    encoding = detect_text_encoding(head) or "utf-8"
+                selectors = self.file_filter.selections.get(selection_key(record.relative_path))
+                if self.generated_detector and not selectors:
+                    reason = self.generated_detector.detect(
+                        record.relative_path, head.decode(encoding, errors="replace")
+                    )
+                    if reason:
+                        self.generated_files[record.relative_path] = reason
+                        record.is_binary = False
+                        return f"[Generated file: {reason}] Size: {record.size} bytes"
+                last_line = last_selected_line(selectors) if selectors else None
+                if last_line is not None and not encoding.lower().startswith(("utf-16", "utf-32")):
+                    data = self._read_lines(f, head, last_line)
+                else:
+                    data = head + f.read()
+                    if self.passthrough and encoding == "utf-8" and not selectors:
+                        passthrough_text = source_text(data, file_path, os.fstat(f.fileno()))
+                        if passthrough_text is not None:
+                            record.is_binary = False
+                            return passthrough_text
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
             raise FileReadError(f"Error reading file {file_path}: {e}")
+        record.is_binary = False
+        # Match text-mode reading: decode leniently and normalize newlines.
+        text = data.decode(encoding, errors="replace")
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if selectors:
+            return apply_selection(text, selectors)
+        return text
 
-    def _is_binary(self, file_path: Path) -> bool:
-        try:
-            with file_path.open('rb') as f:
-                chunk = f.read(1024)
-                if b'\0' in chunk:
-                    return True
-            return False
-        except Exception as e:
-            logger.error(f"Error detecting binary for file {file_path}: {e}")
-            raise FileReadError(f"Error detecting binary for file {file_path}: {e}")
+    def _read_lines(self, f: BinaryIO, head: bytes, line_count: int) -> bytes:
+        # Stops reading once the selected lines are in; in ASCII-compatible encodings every
+        # b"\n" byte ends a line.
+        chunks = [head]
+        newlines = head.count(b"\n")
+        while newlines < line_count:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+        return b"".join(chunks)
+
+    def _open(self, record: FileRecord):
+        if self.source is not None:
+            # Members are read from their source into memory, never to disk.
+            return io.BytesIO(self.source.read(record.relative_path))
+        return (self.base_directory / record.relative_path).open('rb')
+
+    def _binary_placeholder(self, record: FileRecord) -> str:
+        return f"[Binary file] Size: {record.size} bytes"
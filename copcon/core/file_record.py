@@ -0,0 +1,91 @@
+"""File Records for Copcon.
+
+This module defines the compact per-file record used to carry file metadata through a
+Copcon run. File content is loaded on demand and can be released once it has been emitted
+and counted, so memory use scales with the number of files rather than their total size.
+"""
+
+from typing import Callable, Optional
+from copcon.core.cache import content_hash
+
+
+class FileRecord:
+    """Metadata for a single file plus a handle for loading its content lazily.
+
+    Attributes:
+        relative_path (str): The file path relative to the project root.
+        size (int): The file size in bytes.
+        mtime (float): The file modification time.
+        content_hash (Optional[str]): Hash of the loaded content, set on first load.
+        token_count (Optional[int]): Number of tokens in the emitted content, once counted.
+        is_binary (Optional[bool]): Whether the file is binary, once known.
+    """
+
+    __slots__ = (
+        "relative_path",
+        "size",
+        "mtime",
+        "content_hash",
+        "token_count",
+        "is_binary",
+        "_loader",
+        "_content",
+    )
+
+    def __init__(
+        self,
+        relative_path: str,
+        size: int,
+        mtime: float,
+        loader: Callable[["FileRecord"], str],
+        is_binary: Optional[bool] = None,
+    ):
+        """
+        Initialize the FileRecord.
+
+        Args:
+            relative_path (str): The file path relative to the project root.
+            size (int): The file size in bytes.
+            mtime (float): The file modification time.
+            loader (Callable[[FileRecord], str]): Loads the record's content. Usually a method
+                shared by all records of the same reader.
+            is_binary (bool, optional): Whether the file is binary, if already known.
+        """
+        self.relative_path = relative_path
+        self.size = size
+        self.mtime = mtime
+        self.content_hash: Optional[str] = None
+        self.token_count: Optional[int] = None
+        self.is_binary = is_binary
+        self._loader = loader
+        self._content: Optional[str] = None
+
+    @property
+    def content(self) -> str:
+        """The file content, loaded on first access.
+
+        Raises:
+            FileReadError: If the content cannot be loaded.
+        """
+        if self._content is None:
+            self._content = self._loader(self)
+            # Passthrough text carries the hash of the file's bytes, saving an encode
+            self.content_hash = getattr(self._content, "digest", None) or content_hash(self._content)
+        return self._content
+
+    @content.setter
+    def content(self, value: str):
+        """Replace the loaded content, e.g. with a transformed version."""
+        self._content = value
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the content is currently held in memory."""
+        return self._content is not None
+
+    def release(self):
+        """Drop the loaded content. It is reloaded if accessed again."""
+        self._content = None
+
+    def __repr__(self) -> str:
+        return f"FileRecord({self.relative_path!r}, size={self.size}, loaded={self.is_loaded})"
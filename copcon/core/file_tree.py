@@ -4,15 +4,47 @@ This module provides functionality to generate a visual representation of the pr
 directory structure.
 """
 
-from pathlib import Path
-from typing import Optional
+from pathlib import Path, PurePath, PurePosixPath
+from typing import List, Optional, Tuple
+from copcon.core.archive import MemberSource
 from copcon.core.file_filter import FileFilter
+from copcon.core.guards import ResourceGuard
+from copcon.core.walker import ParallelScanner, TreeEntry, VisitedSet, scan_directory
+
+# Rough average used to estimate token counts from file sizes.
+BYTES_PER_TOKEN = 4
+
+TREE_STYLES = ("box", "indent")
+INDENT = "  "
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count for humans, e.g. `48 MB`."""
+    value = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            break
+        value /= 1024
+    if unit == "B":
+        return f"{num_bytes} B"
+    return f"{value:.1f} {unit}" if value < 10 else f"{value:.0f} {unit}"
+
+
+def format_count(count: int) -> str:
+    """Format a large count compactly, e.g. `3.1M`."""
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M"
+    if count >= 1_000:
+        return f"{count / 1_000:.1f}K"
+    return str(count)
+
 
 class FileTreeGenerator:
     """Generates a tree-like directory structure for a given directory.
 
     Traverses the directory up to a specified depth and applies file filters to exclude
-    certain files and directories.
+    certain files and directories. Traversal is iterative, so deeply nested trees cannot
+    exceed the recursion limit.
     """
 
     def __init__(
@@ -20,6 +52,12 @@ class FileTreeGenerator:
         directory: Path,
         depth: int,
         file_filter: FileFilter,
+        collapse_threshold: Optional[int] = None,
+        guard: Optional[ResourceGuard] = None,
+        follow_symlinks: bool = False,
+        source: Optional[MemberSource] = None,
+        walk_workers: int = 0,
+        style: str = "box",
     ):
         """
         Initialize the FileTreeGenerator.
@@ -28,6 +66,20 @@ class FileTreeGenerator:
             directory (Path): The root directory to generate the tree from.
             depth (int): The maximum depth to traverse (-1 for unlimited).
             file_filter (FileFilter): The file filter to determine which files and directories to include.
+            collapse_threshold (int, optional): Directories with more visible entries than this
+                are rendered as a single summary line instead of being listed.
+            guard (ResourceGuard, optional): Stops the traversal early when a file limit or the
+                deadline is hit, ending the tree with a truncation marker.
+            follow_symlinks (bool): Whether to list symbolic links to directories as their
+                targets. If False, they are skipped; symbolic links to files are always listed.
+                If True, a directory reached more than once (e.g. through a link cycle) is
+                listed but not descended into again, and a file reached more than once is
+                marked as already listed and counted once, as the reader includes it once.
+            source (MemberSource, optional): List the members of this source, such as an
+                archive or a git commit, instead of the files in `directory`.
+            walk_workers (int): Number of threads listing directories ahead of the traversal,
+                for filesystems with high latency. With 0, directories are listed one by one.
+            style (str): How the tree is rendered, one of `TREE_STYLES`; see `render`.
 
         Attributes:
             directory_count (int): The total number of directories processed.
@@ -36,60 +88,192 @@ class FileTreeGenerator:
         self.directory = directory
         self.depth = depth
         self.file_filter = file_filter
+        self.collapse_threshold = collapse_threshold
+        self.guard = guard
+        self.follow_symlinks = follow_symlinks
+        self.source = source
+        self.walk_workers = walk_workers
+        self.style = style
+        self._rows: List[Tuple[Tuple[bool, ...], Optional[bool], str]] = []
+        self._scanner: Optional[ParallelScanner] = None
+        self._visited: Optional[VisitedSet] = None
         self.directory_count = 0  # Initialize directory count
         self.file_count = 0       # Initialize file count
 
-    def generate(self, current_dir: Optional[Path] = None, current_depth: int = 0, prefix: str = "") -> str:
-        """Generate the directory tree as a string.
+    def _visible_entries(self, directory: PurePath) -> List[TreeEntry]:
+        # Directories are always shown (ignored ones are marked); files only if not ignored.
+        if self.source is not None:
+            entries = self.source.scan_directory(directory)
+        elif self._scanner is not None:
+            entries = self._scanner.scan(directory)
+        else:
+            entries = scan_directory(directory, self.follow_symlinks)
+        return [entry for entry in entries if entry.is_dir or not self._is_ignored(entry)]
 
-        Args:
-            current_dir (Path, optional): The current directory being traversed.
-            current_depth (int): The current depth in the directory tree.
-            prefix (str): The prefix string for the current level of the tree.
+    def _is_ignored(self, entry: TreeEntry) -> bool:
+        if self.source is not None:
+            # Members are matched on their path inside the source.
+            return self.file_filter.should_ignore_path(entry.path.as_posix(), entry.is_dir)
+        # Matched like `FileFilter.should_ignore`, with the listed entry type instead of a stat
+        return self.file_filter.should_ignore_path(str(entry.path.relative_to(entry.path.anchor)), entry.is_dir)
+
+    def _first_visit(self, directory: PurePath) -> bool:
+        return self._visited is None or self._visited.first_visit_path(directory)
+
+    def _file_size(self, entry: TreeEntry) -> int:
+        if self.source is not None:
+            return self.source.size(entry.path)
+        return entry.path.stat().st_size
+
+    def _summarize(self, entries: List[TreeEntry]) -> Tuple[int, int, int]:
+        """Count the directories, files and bytes below a collapsed directory."""
+        directories = files = total_bytes = 0
+        pending = [entries]
+        while pending:
+            for entry in pending.pop():
+                if entry.is_dir:
+                    directories += 1
+                    if self._is_ignored(entry) or not self._first_visit(entry.path):
+                        continue
+                    try:
+                        pending.append(self._visible_entries(entry.path))
+                    except OSError:
+                        continue
+                elif self._first_visit(entry.path):
+                    files += 1
+                    try:
+                        total_bytes += self._file_size(entry)
+                    except OSError:
+                        pass
+        return directories, files, total_bytes
+
+    def _collapses(self, entries: List[TreeEntry]) -> bool:
+        return self.collapse_threshold is not None and len(entries) > self.collapse_threshold
+
+    def _collapsed_line(self, name: str, entries: List[TreeEntry]) -> str:
+        """Count the contents of a collapsed directory and describe them on one line."""
+        directories, files, total_bytes = self._summarize(entries)
+        self.directory_count += directories
+        self.file_count += files
+        return (
+            f"{name}/ ({files:,} files, {format_size(total_bytes)}, "
+            f"~{format_count(total_bytes // BYTES_PER_TOKEN)} tokens)"
+        )
+
+    def _prune(self, directory: Path) -> bool:
+        # Mirrors the traversal: ignored directories and those past the depth limit are not listed.
+        if self.file_filter.should_ignore_path(str(directory.relative_to(directory.anchor)), True):
+            return True
+        return self.depth != -1 and len(directory.relative_to(self.directory).parts) > self.depth
+
+    def generate(self) -> str:
+        """Generate the directory tree as a string.
 
         Returns:
             str: The generated directory tree as a string.
         """
+        if self.walk_workers and self.source is None:
+            self._scanner = ParallelScanner(self.follow_symlinks, self.walk_workers, self._prune)
+            self._scanner.start(self.directory)
+        try:
+            return self._generate()
+        finally:
+            if self._scanner is not None:
+                self._scanner.close()
+                self._scanner = None
 
-        if current_dir is None:
-            current_dir = self.directory
-            self.directory_count = 1  # Count the root directory
-
-        if self.depth != -1 and current_depth > self.depth:
-            return ""
+    def _generate(self) -> str:
+        self.directory_count = 1  # Count the root directory
+        self.file_count = 0
+        self._visited = VisitedSet() if self.follow_symlinks and self.source is None else None
+        self._first_visit(self.directory)
 
-        output = []
+        self._rows = rows = []
+        root = PurePosixPath(".") if self.source is not None else self.directory
         try:
-            contents = sorted(current_dir.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-        except Exception as e:
-            output.append(f"{prefix}Error accessing {current_dir}: {e}")
-            return "\n".join(output)
-
-        # Build list of items to show:
-        visible_items = []
-        for path in contents:
-            if path.is_dir():
-                visible_items.append(path)
-            elif path.is_file():
-                if not self.file_filter.should_ignore(path):
-                    visible_items.append(path)
-
-        for i, path in enumerate(visible_items):
-            is_last = i == len(visible_items) - 1
-            connector = "└── " if is_last else "├── "
-            if path.is_dir():
-                # Always count directories
-                self.directory_count += 1
-                if self.file_filter.should_ignore(path):
-                    # Mark the directory as ignored and do not descend
-                    output.append(f"{prefix}{connector}{path.name}/ (contents not displayed)")
-                else:
-                    output.append(f"{prefix}{connector}{path.name}/")
-                    extension = "    " if is_last else "│   "
-                    subtree = self.generate(path, current_depth + 1, prefix + extension)
-                    if subtree:
-                        output.append(subtree)
-            else:
-                self.file_count += 1  # Count file
-                output.append(f"{prefix}{connector}{path.name}")
-        return "\n".join(output)
+            root_entries = self._visible_entries(root)
+        except OSError as e:
+            return f"Error accessing {self.directory}: {e}"
+
+        if self._collapses(root_entries):
+            rows.append(((), None, self._collapsed_line(".", root_entries)))
+            return self.render()
+
+        # Each frame holds a directory's entries, the next index to render, the `is_last`
+        # flags of its ancestors and its depth.
+        stack: List[list] = [[root_entries, 0, (), 0]]
+        while stack:
+            frame = stack[-1]
+            entries, index, prefix, current_depth = frame
+            if index >= len(entries):
+                stack.pop()
+                continue
+            frame[1] = index + 1
+            entry = entries[index]
+            is_last = index == len(entries) - 1
+
+            if not entry.is_dir:
+                # A file reached again through a link is included once by the reader, too
+                if not self._first_visit(entry.path):
+                    rows.append((prefix, is_last, f"{entry.name} (already listed)"))
+                    continue
+                if self.guard and not self.guard.check(self.file_count + 1):
+                    rows.append((prefix, None, f"... (truncated: {self.guard.reason})"))
+                    break
+                self.file_count += 1
+                rows.append((prefix, is_last, entry.name))
+                continue
+
+            # Always count directories
+            self.directory_count += 1
+            if self._is_ignored(entry):
+                # Mark the directory as ignored and do not descend
+                rows.append((prefix, is_last, f"{entry.name}/ (contents not displayed)"))
+                continue
+            if not self._first_visit(entry.path):
+                rows.append((prefix, is_last, f"{entry.name}/ (already listed)"))
+                continue
+            if self.depth != -1 and current_depth + 1 > self.depth:
+                rows.append((prefix, is_last, f"{entry.name}/"))
+                continue
+
+            child_prefix = prefix + (is_last,)
+            if self.guard and not self.guard.check_time():
+                rows.append((prefix, is_last, f"{entry.name}/"))
+                rows.append((child_prefix, None, f"... (truncated: {self.guard.reason})"))
+                break
+            try:
+                children = self._visible_entries(entry.path)
+            except OSError as e:
+                rows.append((prefix, is_last, f"{entry.name}/"))
+                rows.append((child_prefix, None, f"Error accessing {entry.path}: {e}"))
+                continue
+
+            if self._collapses(children):
+                rows.append((prefix, is_last, self._collapsed_line(entry.name, children)))
+                continue
+
+            rows.append((prefix, is_last, f"{entry.name}/"))
+            stack.append([children, 0, child_prefix, current_depth + 1])
+        return self.render()
+
+    def render(self, style: Optional[str] = None) -> str:
+        """Render the last generated tree.
+
+        Args:
+            style (str, optional): `box` draws connectors (`├── `, `│   `) in front of each
+                entry; `indent` only indents entries by their depth, which costs fewer tokens.
+                Defaults to the generator's style.
+
+        Returns:
+            str: The directory tree as a string.
+        """
+        lines = []
+        for ancestors, is_last, text in self._rows:
+            if (style or self.style) == "indent":
+                lines.append(INDENT * len(ancestors) + text)
+                continue
+            prefix = "".join("    " if last else "│   " for last in ancestors)
+            connector = "" if is_last is None else ("└── " if is_last else "├── ")
+            lines.append(prefix + connector + text)
+        return "\n".join(lines)
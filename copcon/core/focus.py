@@ -0,0 +1,279 @@
+"""Import-Graph Focus for Copcon.
+
+This module narrows a report down to the Python code a module actually depends on. Imports
+are parsed with `ast` and resolved against the project's own modules, and the transitive
+closure of the focus modules is collected breadth-first, so only files on the way are
+read. The imports of each file are cached by content hash, so repeated focus queries on a
+large codebase do not parse unchanged files again.
+"""
+
+import ast
+import json
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from copcon.core.archive import MemberSource
+from copcon.core.cache import ContentCache
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_record import FileRecord
+from copcon.exceptions import FileReadError
+from copcon.utils.logger import logger
+
+# Bump when the cached import format changes.
+IMPORTS_VERSION = "1"
+
+# An import as written: the relative level, the module and the imported names.
+RawImport = Tuple[int, str, List[str]]
+
+
+def parse_imports(source: str) -> List[RawImport]:
+    """List the imports of a Python module, including those inside functions.
+
+    Args:
+        source (str): The module's source code.
+
+    Returns:
+        List[RawImport]: `(level, module, names)` per import statement; `names` is empty for
+        plain `import` statements.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed.
+    """
+    imports: List[RawImport] = []
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            imports.extend((0, alias.name, []) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.level, node.module or "", [alias.name for alias in node.names]))
+    return imports
+
+
+def module_names(paths: Iterable[str]) -> Dict[str, str]:
+    """Map the dotted module names of a project's Python files to their paths.
+
+    A file's package is found by walking up the directories that contain an `__init__.py`,
+    so both flat and `src/` layouts resolve the way Python would import them.
+
+    Args:
+        paths (Iterable[str]): Relative paths of the project's `.py` files.
+
+    Returns:
+        Dict[str, str]: Relative path per dotted module name.
+    """
+    paths = list(paths)
+    packages = {PurePath(path).parent for path in paths if PurePath(path).name == "__init__.py"}
+    modules = {}
+    for path in paths:
+        pure_path = PurePath(path)
+        parts = [] if pure_path.stem == "__init__" else [pure_path.stem]
+        directory = pure_path.parent
+        while directory in packages and directory != directory.parent:
+            parts.insert(0, directory.name)
+            directory = directory.parent
+        if parts:
+            modules.setdefault(".".join(parts), path)
+    return modules
+
+
+def resolve_import(raw_import: RawImport, module: str, is_package: bool) -> List[str]:
+    """Turn an import into the absolute module names it may load.
+
+    Args:
+        raw_import (RawImport): The import as parsed by `parse_imports`.
+        module (str): The dotted name of the importing module.
+        is_package (bool): Whether the importing module is a package's `__init__.py`.
+
+    Returns:
+        List[str]: Candidate module names, including parent packages, which are imported too.
+    """
+    level, name, names = raw_import
+    if level:
+        package = module.split(".") if is_package else module.split(".")[:-1]
+        if level > 1:
+            package = package[:-(level - 1)]
+        name = ".".join(package + ([name] if name else []))
+    if not name:
+        return []
+    parts = name.split(".")
+    candidates = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    # `from package import module` imports a submodule; other names simply do not resolve.
+    candidates.extend(f"{name}.{imported}" for imported in names if imported != "*")
+    return candidates
+
+
+class ImportGraph:
+    """Resolves the imports between a project's Python files, caching parsed imports."""
+
+    def __init__(self, records: Iterable[FileRecord], cache: Optional[ContentCache] = None):
+        """
+        Initialize the ImportGraph. No file is read until `closure` is called.
+
+        Args:
+            records (Iterable[FileRecord]): The project's files; only `.py` files are used.
+            cache (ContentCache, optional): Cache for parsed imports. Defaults to the
+                `imports` namespace of Copcon's cache directory.
+        """
+        self.records = {
+            record.relative_path: record for record in records if record.relative_path.endswith(".py")
+        }
+        self.modules = module_names(self.records)
+        self._names = {path: name for name, path in self.modules.items()}
+        self.cache = cache or ContentCache("imports")
+
+    def _imports(self, record: FileRecord) -> List[RawImport]:
+        content = record.content
+        key = f"{record.content_hash}{IMPORTS_VERSION}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return [tuple(raw_import) for raw_import in json.loads(cached)]
+        try:
+            imports = parse_imports(content)
+        except (SyntaxError, ValueError) as e:
+            logger.debug(f"Cannot parse imports of {record.relative_path}: {e}")
+            imports = []
+        self.cache.set(key, json.dumps(imports))
+        return imports
+
+    def dependencies(self, relative_path: str) -> List[str]:
+        """The project files a file imports directly.
+
+        Args:
+            relative_path (str): The importing file.
+
+        Returns:
+            List[str]: Relative paths of the imported project files, in import order.
+
+        Raises:
+            FileReadError: If the file cannot be read.
+        """
+        record = self.records[relative_path]
+        module = self._names.get(relative_path, PurePath(relative_path).stem)
+        is_package = relative_path.endswith("__init__.py")
+        dependencies: List[str] = []
+        for raw_import in self._imports(record):
+            for candidate in resolve_import(raw_import, module, is_package):
+                path = self.modules.get(candidate)
+                if path and path != relative_path and path not in dependencies:
+                    dependencies.append(path)
+        return dependencies
+
+    def closure(self, focus: Iterable[str], max_depth: int = -1) -> List[str]:
+        """Collect the focus files and everything they import, transitively.
+
+        Args:
+            focus (Iterable[str]): Relative paths of the focus files.
+            max_depth (int): How many import hops to follow (-1 for unlimited).
+
+        Returns:
+            List[str]: The focus files and their dependencies, in breadth-first order.
+
+        Raises:
+            KeyError: If a focus file is not one of the project's Python files.
+        """
+        ordered = []
+        for path in focus:
+            if path not in self.records:
+                raise KeyError(path)
+            if path not in ordered:
+                ordered.append(path)
+        seen: Set[str] = set(ordered)
+        frontier = list(ordered)
+        depth = 0
+        while frontier and (max_depth == -1 or depth < max_depth):
+            next_frontier = []
+            for path in frontier:
+                try:
+                    dependencies = self.dependencies(path)
+                except FileReadError as e:
+                    logger.warning(f"Not following imports of {path}: {e}")
+                    continue
+                finally:
+                    self.records[path].release()
+                for dependency in dependencies:
+                    if dependency not in seen:
+                        seen.add(dependency)
+                        ordered.append(dependency)
+                        next_frontier.append(dependency)
+            frontier = next_frontier
+            depth += 1
+        return ordered
+
+
+class FocusSource(MemberSource):
+    """A subset of a project's files, presented as the whole project."""
+
+    def __init__(
+        self,
+        directory: Path,
+        records: Iterable[FileRecord],
+        source: Optional[MemberSource] = None,
+        root_name: Optional[str] = None,
+    ):
+        """
+        Initialize the FocusSource.
+
+        Args:
+            directory (Path): The project directory.
+            records (Iterable[FileRecord]): The files to keep.
+            source (MemberSource, optional): The source the files come from, such as an
+                archive or git ref. Files are read from `directory` if not given.
+            root_name (str, optional): The name shown for the project root.
+        """
+        self.directory = directory
+        self.source = source
+        self.root_name = root_name or directory.name
+        self._index(
+            (list(PurePath(record.relative_path).parts), record.size, record.mtime, record.relative_path)
+            for record in records
+        )
+
+    def read(self, relative_path: str) -> bytes:
+        """Read a focused file from its underlying source."""
+        if self.source is not None:
+            return self.source.read(relative_path)
+        return (self.directory / relative_path).read_bytes()
+
+    def close(self):
+        """Close the underlying source."""
+        if self.source is not None:
+            self.source.close()
+
+
+def _relative_focus_path(directory: Path, path: str) -> str:
+    # Focus paths may be given relative to the working directory or to the project.
+    candidate = Path(path)
+    if candidate.exists():
+        try:
+            return candidate.resolve().relative_to(directory.resolve()).as_posix()
+        except ValueError:
+            pass
+    return PurePosixPath(path).as_posix()
+
+
+def focus_source(
+    reader: FileContentReader,
+    focus: Iterable[str],
+    max_depth: int = -1,
+    root_name: Optional[str] = None,
+) -> FocusSource:
+    """Restrict a project to the focus modules and the project code they import.
+
+    Args:
+        reader (FileContentReader): Walks the whole project; its filters apply.
+        focus (Iterable[str]): Paths of the focus files.
+        max_depth (int): How many import hops to follow (-1 for unlimited).
+        root_name (str, optional): The name shown for the project root.
+
+    Returns:
+        FocusSource: The focused files, in breadth-first import order.
+
+    Raises:
+        KeyError: If a focus path is not an included Python file of the project.
+    """
+    records = list(reader.iter_records())
+    graph = ImportGraph(records)
+    focused = graph.closure(
+        [_relative_focus_path(reader.base_directory, path) for path in focus], max_depth
+    )
+    logger.info(f"Focusing on {len(focused)} of {len(graph.records)} Python files")
+    by_path = {record.relative_path: record for record in records}
+    return FocusSource(reader.base_directory, [by_path[path] for path in focused], reader.source, root_name)
@@ -0,0 +1,86 @@
+"""Generated File Detection for Copcon.
+
+This module recognizes files that cost many tokens while telling a reader little: minified
+bundles, generated code, dependency lock files and files dominated by embedded base64 data
+such as inlined images. Detection only looks at the file name and the first bytes that are
+already read to classify the file, so it adds no I/O. Detected files are replaced by a
+short placeholder in the report.
+"""
+
+import re
+from pathlib import PurePath
+from typing import Optional
+
+LOCK_FILENAMES = {
+    "pnpm-lock.yaml", "gemfile.lock", "composer.lock", "pipfile.lock", "uv.lock", "go.sum",
+    "mix.lock", "flake.lock", "pubspec.lock", "podfile.lock", "packages.lock.json",
+    "npm-shrinkwrap.json", "poetry.lock", "package-lock.json", "yarn.lock", "cargo.lock",
+}
+
+MINIFIED_SUFFIXES = (".min.js", ".min.css", ".min.mjs", ".bundle.js", ".chunk.js")
+
+GENERATED_SUFFIXES = ("_pb2.py", "_pb2_grpc.py", ".pb.go", ".pb.cc", ".pb.h", ".g.dart", ".designer.cs")
+
+# Code and markup formats that are minified or inline base64 data when generated. Data
+# and prose files such as `.jsonl` or `.md` legitimately have long lines.
+HEURISTIC_EXTENSIONS = {
+    ".js", ".mjs", ".cjs", ".jsx", ".ts", ".tsx", ".css", ".scss", ".less", ".html", ".htm",
+    ".svg", ".xml", ".map",
+}
+
+# The conventional markers of generated code: `@generated`, Go's `Code generated ... DO NOT
+# EDIT.` and the protocol buffer compiler's header.
+_GENERATED_MARKER = re.compile(
+    r"@generated\b|Code generated .* DO NOT EDIT|Generated by the protocol buffer compiler\.\s+DO NOT EDIT"
+)
+# Lines that may precede or form the comment carrying a marker.
+_HEADER_COMMENT = re.compile(r"\s*(?:$|#|//|/\*|\*|--|<!--|;|%|<\?)")
+
+_BASE64_RUN = re.compile(r"[A-Za-z0-9+/]{200,}={0,2}")
+
+# Heuristics only apply once enough of the file has been seen.
+MIN_SAMPLE_SIZE = 1024
+# Number of leading lines searched for a generated-code marker.
+HEADER_LINES = 10
+# Mean line length above which the sample is considered minified.
+MINIFIED_MEAN_LINE_LENGTH = 300
+# Share of the sample covered by long base64 runs above which the file is a blob.
+BASE64_DENSITY = 0.5
+
+
+class GeneratedFileDetector:
+    """Decides whether a file is minified, generated, a lock file or mostly base64 data."""
+
+    def detect(self, relative_path: str, head: str) -> Optional[str]:
+        """Detect a generated file from its name and the first part of its content.
+
+        Args:
+            relative_path (str): The file path relative to the project root.
+            head (str): The decoded first bytes of the file.
+
+        Returns:
+            Optional[str]: A short reason such as `minified`, or None for regular files.
+        """
+        name = PurePath(relative_path).name.lower()
+        if name in LOCK_FILENAMES:
+            return "lock file"
+        if name.endswith(MINIFIED_SUFFIXES):
+            return "minified"
+        if name.endswith(GENERATED_SUFFIXES):
+            return "generated code"
+
+        for line in head.split("\n", HEADER_LINES)[:HEADER_LINES]:
+            if not _HEADER_COMMENT.match(line):
+                break
+            if _GENERATED_MARKER.search(line):
+                return "generated code"
+
+        if PurePath(name).suffix not in HEURISTIC_EXTENSIONS or len(head) < MIN_SAMPLE_SIZE:
+            return None
+        base64_chars = sum(match.end() - match.start() for match in _BASE64_RUN.finditer(head))
+        if base64_chars > len(head) * BASE64_DENSITY:
+            return "embedded base64 data"
+        lines = head.split("\n")
+        if len(lines) == 1 or len(head) / len(lines) > MINIFIED_MEAN_LINE_LENGTH:
+            return "minified"
+        return None
@@ -0,0 +1,179 @@
+"""Git Diff Collection for Copcon.
+
+This module collects the uncommitted changes of a project, restricted to the files that pass
+the project's FileFilter. The changed paths are listed first and filtered, the survivors
+are passed to `git diff` as a pathspec, and the diff is streamed from the subprocess one
+file at a time, so a large diff is never held in memory and can be attributed per file.
+"""
+
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from copcon.core.file_filter import FileFilter
+
+# Maximum number of changed paths passed to a single `git diff` invocation.
+PATHSPEC_BATCH_SIZE = 500
+
+
+class FileDiff(NamedTuple):
+    """The diff of a single file.
+
+    Attributes:
+        path (str): The file path relative to the project directory (the new path for renames).
+        text (str): The diff text, starting with its `diff --git` header.
+    """
+
+    path: str
+    text: str
+
+
+def parse_name_status(output: str) -> List[Tuple[str, ...]]:
+    """Parse the output of `git diff --name-status -z`.
+
+    Args:
+        output (str): The NUL-separated output.
+
+    Returns:
+        List[Tuple[str, ...]]: The paths of each change; renames and copies give
+            `(old_path, new_path)`, other changes a single path.
+    """
+    fields = output.split("\0")
+    changes = []
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i]
+        if status[0] in "RC":
+            changes.append((fields[i + 1], fields[i + 2]))
+            i += 3
+        else:
+            changes.append((fields[i + 1],))
+            i += 2
+    return changes
+
+
+def diff_path(text: str) -> str:
+    """Return the path a single-file diff applies to, preferring the new path."""
+    old_path = None
+    for line in text.split("\n"):
+        if line.startswith("+++ b/"):
+            return line[len("+++ b/"):].rstrip("\t")
+        if line.startswith("rename to "):
+            return line[len("rename to "):]
+        if line.startswith("--- a/"):
+            old_path = line[len("--- a/"):].rstrip("\t")
+        elif line.startswith("@@"):
+            break
+    if old_path is not None:
+        return old_path
+    header = text.split("\n", 1)[0]
+    return header.rpartition(" b/")[2]
+
+
+class GitDiff:
+    """Streams the filtered `git diff HEAD` of a project, one file at a time."""
+
+    def __init__(
+        self,
+        directory: Path,
+        file_filter: FileFilter,
+        exclude_hidden: bool,
+        context_lines: Optional[int] = None,
+        find_renames: bool = True,
+    ):
+        """
+        Initialize the GitDiff.
+
+        Args:
+            directory (Path): The project directory. Paths are reported relative to it, and
+                changes outside it are not included.
+            file_filter (FileFilter): Changed files it ignores are left out of the diff.
+            exclude_hidden (bool): Whether to leave out changes to hidden files.
+            context_lines (int, optional): Lines of context around each change. Defaults to
+                git's own setting.
+            find_renames (bool): Whether to detect renames instead of reporting them as a
+                deletion and an addition.
+        """
+        self.directory = directory
+        self.file_filter = file_filter
+        self.exclude_hidden = exclude_hidden
+        self.context_lines = context_lines
+        self.find_renames = find_renames
+
+    def _base_command(self) -> List[str]:
+        command = ["git", "-c", "core.quotePath=false", "diff", "HEAD", "--relative"]
+        command.append("-M" if self.find_renames else "--no-renames")
+        return command
+
+    def _is_included(self, relative_path: str) -> bool:
+        if self.exclude_hidden and any(part.startswith(".") for part in Path(relative_path).parts):
+            return False
+        return not self.file_filter.should_ignore(self.directory / relative_path)
+
+    def changed_paths(self) -> List[Tuple[str, ...]]:
+        """List the changes that pass the filter.
+
+        A rename is included if its new path passes the filter; both paths are kept so git
+        can pair them.
+
+        Returns:
+            List[Tuple[str, ...]]: The paths of each included change.
+
+        Raises:
+            subprocess.CalledProcessError: If git fails, e.g. outside a repository.
+        """
+        result = subprocess.run(
+            self._base_command() + ["--name-status", "-z"],
+            cwd=self.directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return [change for change in parse_name_status(result.stdout) if self._is_included(change[-1])]
+
+    def _stream(self, pathspec: List[str]) -> Iterator[str]:
+        """Yield the diff of the given paths, split at each file header."""
+        command = self._base_command()
+        if self.context_lines is not None:
+            command.append(f"-U{self.context_lines}")
+        command += ["--"] + [f":(literal){path}" for path in pathspec]
+        # stderr goes to a file: a pipe that is only read once stdout ends would stall git
+        # as soon as its warnings filled the pipe buffer
+        with tempfile.TemporaryFile() as stderr:
+            with subprocess.Popen(
+                command,
+                cwd=self.directory,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            ) as process:
+                lines: List[str] = []
+                for line in process.stdout:
+                    if line.startswith("diff --git ") and lines:
+                        yield "".join(lines)
+                        lines = []
+                    lines.append(line)
+                if lines:
+                    yield "".join(lines)
+            if process.returncode:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    process.returncode, command, stderr=stderr.read().decode("utf-8", errors="replace")
+                )
+
+    def iter_file_diffs(self) -> Iterator[FileDiff]:
+        """Yield the diff of each included file as it is produced by git.
+
+        Yields:
+            FileDiff: One diff per changed file.
+
+        Raises:
+            subprocess.CalledProcessError: If git fails.
+        """
+        changes = self.changed_paths()
+        for start in range(0, len(changes), PATHSPEC_BATCH_SIZE):
+            pathspec = [path for change in changes[start:start + PATHSPEC_BATCH_SIZE] for path in change]
+            for text in self._stream(pathspec):
+                yield FileDiff(diff_path(text), text)
@@ -0,0 +1,112 @@
+"""Git Ref Sources for Copcon.
+
+This module lets a commit, tag or branch of a git repository stand in for the project
+directory, without checking it out. The tree is listed with a single `git ls-tree`, and
+blob contents are streamed on demand through one long-lived `git cat-file --batch`
+process, so filtering, binary detection and tokenization run on the streamed blobs and
+the working tree is never touched.
+"""
+
+import subprocess
+import threading
+from pathlib import Path
+from typing import List, Tuple
+from copcon.core.archive import MemberSource
+
+# Modes of tree entries that are not regular files: symbolic links and submodules.
+_SKIPPED_MODES = ("120000", "160000")
+
+
+def parse_ls_tree(output: bytes) -> List[Tuple[str, str, int]]:
+    """Parse the output of `git ls-tree -r -l -z`.
+
+    Args:
+        output (bytes): The NUL-separated output.
+
+    Returns:
+        List[Tuple[str, str, int]]: `(path, object_id, size)` for every regular file blob.
+    """
+    files = []
+    for line in output.split(b"\0"):
+        if not line:
+            continue
+        info, _, path = line.partition(b"\t")
+        mode, object_type, object_id, size = info.decode().split()
+        if object_type != "blob" or mode in _SKIPPED_MODES:
+            continue
+        files.append((path.decode("utf-8", errors="surrogateescape"), object_id, int(size)))
+    return files
+
+
+class GitRefSource(MemberSource):
+    """The files of a git commit, read from the object database as a project directory."""
+
+    def __init__(self, directory: Path, ref: str):
+        """
+        List the files of a ref. Paths are relative to `directory`, which may be a
+        subdirectory of the repository.
+
+        Args:
+            directory (Path): A directory inside the git repository.
+            ref (str): Any commit-ish, e.g. a tag, branch or commit hash.
+
+        Raises:
+            subprocess.CalledProcessError: If the directory is not in a git repository or
+                the ref does not exist.
+        """
+        self.directory = directory
+        self.ref = ref
+        self.root_name = f"{directory.resolve().name}@{ref}"
+        commit_time = subprocess.run(
+            ["git", "show", "-s", "--format=%ct", f"{ref}^{{commit}}", "--"],
+            cwd=directory, check=True, capture_output=True, text=True,
+        ).stdout.strip()
+        listing = subprocess.run(
+            ["git", "ls-tree", "-r", "-l", "-z", ref],
+            cwd=directory, check=True, capture_output=True,
+        ).stdout
+        # Every file of a commit carries the commit time as its modification time.
+        mtime = float(commit_time)
+        self._index(
+            (path.split("/"), size, mtime, object_id)
+            for path, object_id, size in parse_ls_tree(listing)
+        )
+        self._lock = threading.Lock()
+        self._process = None
+
+    def read(self, relative_path: str) -> bytes:
+        """Read a file's blob through the shared `git cat-file --batch` process.
+
+        Args:
+            relative_path (str): The file path relative to the project directory.
+
+        Returns:
+            bytes: The blob content.
+
+        Raises:
+            OSError: If the blob cannot be read.
+        """
+        object_id = self._handles[relative_path]
+        # The batch process answers requests in order, so they are serialized.
+        with self._lock:
+            if self._process is None:
+                self._process = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=self.directory, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                )
+            self._process.stdin.write(object_id.encode() + b"\n")
+            self._process.stdin.flush()
+            header = self._process.stdout.readline().split()
+            if len(header) != 3:
+                raise OSError(f"Cannot read {relative_path} at {self.ref}: {b' '.join(header).decode()}")
+            data = self._process.stdout.read(int(header[2]))
+            # Each blob is followed by a newline
+            self._process.stdout.read(1)
+        return data
+
+    def close(self):
+        """Stop the `git cat-file` process."""
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process = None
@@ -0,0 +1,169 @@
+"""Content Filtering for Copcon.
+
+This module restricts a project to the files whose content matches regular expressions,
+e.g. every file that mentions `PaymentGateway`. Files are scanned by a thread pool ahead of
+the report, every scan stops at the first match, and large files are memory-mapped so only
+the pages up to the first match are read. Files that do not match are never tokenized or
+formatted, and are left out of the tree.
+"""
+
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Iterable, List, Optional, Tuple, Union
+from copcon.core.file_classifier import SNIFF_SIZE, FileClassifier
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_record import FileRecord
+from copcon.core.focus import FocusSource
+from copcon.utils.logger import logger
+
+# Files at least this large are memory-mapped instead of read.
+MMAP_THRESHOLD = 1024 * 1024
+
+# Scans queued per worker ahead of the file whose result is awaited.
+LOOKAHEAD_PER_WORKER = 4
+
+# Constructs that match differently on bytes than on text once the text is not ASCII:
+# non-ASCII literals, escapes such as `\w` or `\u00fc`, `.`, negated sets and case folding.
+_TEXT_ONLY = re.compile(r"[^\x00-\x7f]|\\[A-Za-z0-9]|\.|\[\^|\(\?[^:)]*i")
+
+
+def _combine(patterns: List[str], flags: int) -> Optional[re.Pattern]:
+    # A single alternation finds the first match of any pattern in one pass.
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+    except re.error:
+        # e.g. inline global flags, which are only allowed at the start of a pattern
+        return None
+
+
+class ContentGrep:
+    """Matches file contents against one or more regular expressions."""
+
+    def __init__(
+        self,
+        patterns: Iterable[str],
+        match_all: bool = False,
+        classifier: Optional[FileClassifier] = None,
+    ):
+        """
+        Initialize the ContentGrep.
+
+        Args:
+            patterns (Iterable[str]): Regular expressions, searched in the file content.
+                `^` and `$` match at line boundaries.
+            match_all (bool): Whether a file has to match all patterns rather than any.
+            classifier (FileClassifier, optional): Recognizes binary files, which never match.
+
+        Raises:
+            ValueError: If a pattern is not a valid regular expression.
+        """
+        self.patterns = list(patterns)
+        self.match_all = match_all
+        self.classifier = classifier or FileClassifier()
+        try:
+            self._text_patterns = [re.compile(pattern, re.MULTILINE) for pattern in self.patterns]
+        except re.error as e:
+            raise ValueError(f"Invalid pattern {e.pattern!r}: {e}")
+        if not match_all and len(self.patterns) > 1:
+            combined = _combine(self.patterns, re.MULTILINE)
+            if combined is not None:
+                self._text_patterns = [combined]
+        # UTF-8 files are searched as bytes, without decoding them, if that matches the same;
+        # other patterns and encodings are searched in the decoded text
+        self._byte_patterns: Optional[List[re.Pattern]] = None
+        if not any(_TEXT_ONLY.search(pattern) for pattern in self.patterns):
+            self._byte_patterns = [
+                re.compile(pattern.pattern.encode("ascii"), re.MULTILINE) for pattern in self._text_patterns
+            ]
+
+    def _search(self, patterns: List[re.Pattern], data: Union[str, bytes, mmap.mmap]) -> bool:
+        found = (pattern.search(data) is not None for pattern in patterns)
+        return all(found) if self.match_all else any(found)
+
+    def matches(self, data: Union[bytes, mmap.mmap]) -> bool:
+        """Check whether a file's content matches.
+
+        Args:
+            data (bytes | mmap.mmap): The file's content.
+
+        Returns:
+            bool: True if the content matches; binary content never does.
+        """
+        classification = self.classifier.sniff(data[:SNIFF_SIZE])
+        if classification.is_binary:
+            return False
+        if self._byte_patterns is not None and classification.encoding == "utf-8":
+            return self._search(self._byte_patterns, data)
+        return self._search(self._text_patterns, bytes(data).decode(classification.encoding, errors="replace"))
+
+    def matches_file(self, path: Path) -> bool:
+        """Check whether a file on disk matches, memory-mapping it if it is large.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        with path.open("rb") as f:
+            if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+                return self.matches(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.matches(data)
+
+
+def grep_source(
+    reader: FileContentReader,
+    grep: ContentGrep,
+    workers: int = 8,
+    root_name: Optional[str] = None,
+) -> FocusSource:
+    """Restrict a project to the files whose content matches.
+
+    Args:
+        reader (FileContentReader): Walks the project; its filters, source and resource
+            guard apply, so a limit or the deadline stops the search.
+        grep (ContentGrep): The patterns to match.
+        workers (int): Number of threads scanning files.
+        root_name (str, optional): The name shown for the project root.
+
+    Returns:
+        FocusSource: The matching files, in walk order.
+    """
+
+    def scan(record: FileRecord) -> bool:
+        # Scans still queued when the deadline passes are skipped
+        if grep.classifier.classify_name(record.relative_path) or (
+            reader.guard and not reader.guard.check_time()
+        ):
+            return False
+        try:
+            if reader.source is not None:
+                return grep.matches(reader.source.read(record.relative_path))
+            return grep.matches_file(reader.base_directory / record.relative_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {record.relative_path}, which could not be searched: {e}")
+            return False
+
+    matched: List[FileRecord] = []
+    scanned = 0
+
+    def collect(record: FileRecord, future: Future):
+        if future.result():
+            matched.append(record)
+
+    # Results are collected in walk order while later files are already being scanned
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Tuple[FileRecord, Future]] = deque()
+        for record in reader.iter_records():
+            scanned += 1
+            pending.append((record, pool.submit(scan, record)))
+            if len(pending) >= workers * LOOKAHEAD_PER_WORKER:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+    if reader.guard and reader.guard.tripped:
+        logger.warning(f"--grep stopped searching early: {reader.guard.reason}")
+    logger.info(f"--grep matched {len(matched)} of {scanned} files")
+    return FocusSource(reader.base_directory, matched, reader.source, root_name)
@@ -0,0 +1,81 @@
+"""Resource Guards for Copcon.
+
+This module provides hard limits on the number of files, the number of bytes and the
+wall-clock time a run may consume. The walker and reader consult a shared guard and stop
+early once a limit is hit, so an accidental run over a home directory or a whole disk
+produces a partial, clearly marked report within seconds.
+"""
+
+import time
+from typing import Optional
+
+# Exit status used when the report was truncated by a resource guard.
+EXIT_CODE_TRUNCATED = 3
+
+
+class ResourceGuard:
+    """Tracks resource limits for a single run.
+
+    File and byte limits are checked against the running totals of each caller, so the
+    tree and the reader can each include up to the limit. The deadline is shared. Once any
+    limit has been hit the guard counts as tripped, and `reason` describes the first one.
+    """
+
+    def __init__(
+        self,
+        max_files: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the ResourceGuard. The timeout starts counting immediately.
+
+        Args:
+            max_files (int, optional): Maximum number of files to include.
+            max_bytes (int, optional): Maximum total size, in bytes, of included files.
+            timeout (float, optional): Maximum wall-clock seconds for the run.
+        """
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason: Optional[str] = None
+
+    @property
+    def tripped(self) -> bool:
+        """Whether any limit has been exceeded."""
+        return self.reason is not None
+
+    def _trip(self, reason: str) -> bool:
+        if self.reason is None:
+            self.reason = reason
+        return False
+
+    def check_time(self) -> bool:
+        """Check the deadline.
+
+        Returns:
+            bool: True if work may continue, False if the guard is tripped.
+        """
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return self._trip(f"timeout of {self.timeout:g}s reached")
+        return True
+
+    def check(self, file_count: int, byte_count: int = 0) -> bool:
+        """Check running totals against the limits and the deadline.
+
+        Args:
+            file_count (int): Number of files the caller would have included, counting the
+                one it is about to add.
+            byte_count (int): Total bytes the caller would have included.
+
+        Returns:
+            bool: True if the file may be included, False if the guard is tripped.
+        """
+        if not self.check_time():
+            return False
+        if self.max_files is not None and file_count > self.max_files:
+            return self._trip(f"limit of {self.max_files:,} files reached")
+        if self.max_bytes is not None and byte_count > self.max_bytes:
+            return self._trip(f"limit of {self.max_bytes:,} bytes reached")
+        return True
@@ -0,0 +1,415 @@
+"""Content Minification for Copcon.
+
+This module provides an optional transform stage that runs between file reading and
+report formatting. It strips comments, docstrings, blank lines and trailing whitespace
+from source files on a per-language basis to reduce the number of tokens in the report.
+"""
+
+import io
+import re
+import tokenize
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from copcon.core.cache import ContentCache, content_hash
+from copcon.utils.logger import logger
+
+# Bump whenever the output of any minifier changes, so stale cache entries are ignored.
+MINIFIER_VERSION = "2"
+
+PYTHON_EXTENSIONS = {".py", ".pyi", ".pyw"}
+C_LIKE_EXTENSIONS = {
+    ".c", ".h", ".cc", ".cpp", ".cxx", ".hpp", ".hh", ".cs", ".java", ".kt", ".kts",
+    ".scala", ".go", ".rs", ".swift", ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx",
+    ".php", ".dart",
+}
+# C-like languages whose `/` may also start a regular expression literal.
+REGEX_LITERAL_EXTENSIONS = {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"}
+BLOCK_COMMENT_ONLY_EXTENSIONS = {".css", ".scss", ".less"}
+JSON_EXTENSIONS = {".json"}
+YAML_EXTENSIONS = {".yml", ".yaml"}
+
+# A `/` after one of these characters or keywords starts a regular expression, not a division.
+_REGEX_PRECEDING_CHARS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_PRECEDING_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await",
+}
+
+# A line ending in a `|` or `>` block scalar indicator, optionally followed by a comment.
+_YAML_BLOCK_SCALAR = re.compile(r"(?:^|\s)[|>][0-9+-]*(?:\s+#.*)?$")
+
+
+def _strip_blank_and_trailing(text: str, protected_lines: Optional[Set[int]] = None) -> str:
+    """Remove trailing whitespace and blank lines, leaving protected lines untouched.
+
+    Args:
+        text (str): The text to clean up.
+        protected_lines (Set[int], optional): 1-based line numbers that must be kept verbatim,
+            such as lines inside multi-line string literals.
+
+    Returns:
+        str: The cleaned text.
+    """
+    protected_lines = protected_lines or set()
+    output = []
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        if lineno in protected_lines:
+            output.append(line)
+            continue
+        line = line.rstrip()
+        if line:
+            output.append(line)
+    return "\n".join(output)
+
+
+def minify_python(source: str) -> str:
+    """Strip comments, docstrings, blank lines and trailing whitespace from Python code.
+
+    Uses the `tokenize` module so that string contents are never altered. A docstring that
+    is the only statement of its block is replaced by `...` to keep the code valid.
+
+    Args:
+        source (str): The Python source code.
+
+    Returns:
+        str: The minified source, or the original source if it cannot be tokenized.
+    """
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (tokenize.TokenError, SyntaxError, IndentationError) as e:
+        logger.debug(f"Could not tokenize Python source, leaving it unchanged: {e}")
+        return source
+
+    insignificant = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING}
+    significant = [tok for tok in tokens if tok.type not in insignificant]
+
+    # Spans are ((start_row, start_col), (end_row, end_col), replacement)
+    spans: List[Tuple[Tuple[int, int], Tuple[int, int], str]] = []
+    protected_lines: Set[int] = set()
+
+    fstring_start = getattr(tokenize, "FSTRING_START", None)
+    fstring_end = getattr(tokenize, "FSTRING_END", None)
+    open_fstrings: List[int] = []
+    for tok in tokens:
+        if tok.type == tokenize.COMMENT:
+            spans.append((tok.start, tok.end, ""))
+        elif tok.type == tokenize.STRING:
+            protected_lines.update(range(tok.start[0], tok.end[0]))
+        elif fstring_start is not None and tok.type == fstring_start:
+            open_fstrings.append(tok.start[0])
+        elif fstring_end is not None and tok.type == fstring_end and open_fstrings:
+            protected_lines.update(range(open_fstrings.pop(), tok.end[0]))
+
+    # Find statement-level string expressions (docstrings and bare strings).
+    i = 0
+    while i < len(significant):
+        tok = significant[i]
+        previous = significant[i - 1] if i > 0 else None
+        starts_statement = previous is None or previous.type in (
+            tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT
+        )
+        if tok.type == tokenize.STRING and starts_statement:
+            j = i
+            while j + 1 < len(significant) and significant[j + 1].type == tokenize.STRING:
+                j += 1
+            following = significant[j + 1] if j + 1 < len(significant) else None
+            if following is None or following.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+                after = significant[j + 2] if j + 2 < len(significant) else None
+                sole_statement = (
+                    previous is not None
+                    and previous.type == tokenize.INDENT
+                    and (after is None or after.type in (tokenize.DEDENT, tokenize.ENDMARKER))
+                )
+                spans.append((tok.start, significant[j].end, "..." if sole_statement else ""))
+                for string_tok in significant[i:j + 1]:
+                    protected_lines.difference_update(
+                        range(string_tok.start[0], string_tok.end[0])
+                    )
+            i = j + 1
+            continue
+        i += 1
+
+    if not spans:
+        return _strip_blank_and_trailing(source, protected_lines)
+
+    lines = source.splitlines(keepends=True)
+    # Apply spans back to front so earlier coordinates stay valid.
+    for (start_row, start_col), (end_row, end_col), replacement in sorted(spans, reverse=True):
+        head = lines[start_row - 1][:start_col]
+        tail = lines[end_row - 1][end_col:]
+        # Removed lines keep an empty slot so protected line numbers remain valid.
+        lines[start_row - 1:end_row] = [head + replacement + tail] + [""] * (end_row - start_row)
+
+    return _strip_blank_and_trailing("".join(lines), protected_lines)
+
+
+def _regex_literal_end(source: str, start: int) -> int:
+    """Find the end of a regular expression literal starting at `start`, or -1 if unterminated."""
+    in_class = False
+    j = start + 1
+    while j < len(source):
+        ch = source[j]
+        if ch == "\\":
+            j += 1
+        elif ch == "\n":
+            return -1
+        elif ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            return j + 1
+        j += 1
+    return -1
+
+
+def minify_c_like(source: str, line_comments: bool = True, regex_literals: bool = False) -> str:
+    """Strip comments, blank lines and trailing whitespace from C-like source code.
+
+    A small lexer tracks string, character and template literals so that comment markers
+    inside them are preserved.
+
+    Args:
+        source (str): The source code.
+        line_comments (bool): Whether `//` starts a comment (False for CSS).
+        regex_literals (bool): Whether a `/` in expression position starts a regular
+            expression literal, as in JavaScript and TypeScript.
+
+    Returns:
+        str: The minified source.
+    """
+    output: List[str] = []
+    protected_lines: Set[int] = set()
+    i = 0
+    n = len(source)
+    line = 1
+    # The last significant character and the identifier it ends, to tell regexes from divisions
+    previous = ""
+    word = ""
+    while i < n:
+        ch = source[i]
+        nxt = source[i + 1] if i + 1 < n else ""
+        regex_end = -1
+        if (
+            regex_literals
+            and ch == "/"
+            and nxt not in "*/"
+            and (
+                not previous
+                or previous in _REGEX_PRECEDING_CHARS
+                or word in _REGEX_PRECEDING_KEYWORDS
+            )
+        ):
+            regex_end = _regex_literal_end(source, i)
+        if regex_end != -1:
+            output.append(source[i:regex_end])
+            previous, word = "/", ""
+            i = regex_end
+        elif ch == "/" and nxt == "*":
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            newlines = source.count("\n", i, end)
+            # Keep line structure so that code after the comment stays on its own line.
+            output.append("\n" * newlines if newlines else " ")
+            line += newlines
+            i = end
+        elif line_comments and ch == "/" and nxt == "/":
+            end = source.find("\n", i)
+            i = n if end == -1 else end
+        elif ch in "\"'`":
+            j = i + 1
+            while j < n and source[j] != ch:
+                if source[j] == "\\":
+                    j += 1
+                elif source[j] == "\n" and ch != "`":
+                    break
+                j += 1
+            if j < n and source[j] == ch:
+                j += 1
+            j = min(j, n)
+            literal = source[i:j]
+            newlines = literal.count("\n")
+            if newlines:
+                protected_lines.update(range(line, line + newlines))
+            output.append(literal)
+            previous, word = ch, ""
+            line += newlines
+            i = j
+        else:
+            if ch == "\n":
+                line += 1
+            if not ch.isspace():
+                word = word + ch if ch.isalnum() or ch in "_$" else ""
+                previous = ch
+            output.append(ch)
+            i += 1
+    return _strip_blank_and_trailing("".join(output), protected_lines)
+
+
+def minify_json(source: str) -> str:
+    """Remove all insignificant whitespace from JSON.
+
+    Args:
+        source (str): The JSON document.
+
+    Returns:
+        str: The compacted document.
+    """
+    output: List[str] = []
+    i = 0
+    n = len(source)
+    while i < n:
+        ch = source[i]
+        if ch == '"':
+            j = i + 1
+            while j < n and source[j] != '"':
+                if source[j] == "\\":
+                    j += 1
+                j += 1
+            output.append(source[i:j + 1])
+            i = j + 1
+        elif ch in " \t\r\n":
+            i += 1
+        else:
+            output.append(ch)
+            i += 1
+    return "".join(output)
+
+
+def minify_yaml(source: str) -> str:
+    """Strip full-line comments, blank lines and trailing whitespace from YAML.
+
+    Indentation is significant in YAML, so leading whitespace is always preserved. The
+    contents of `|` and `>` block scalars are data, so they are kept verbatim.
+
+    Args:
+        source (str): The YAML document.
+
+    Returns:
+        str: The minified document.
+    """
+    output: List[str] = []
+    protected_lines: Set[int] = set()
+    scalar_indent: Optional[int] = None  # Indentation of the line introducing a block scalar
+    blank_lines: List[str] = []
+    for line in source.splitlines():
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+        if scalar_indent is not None:
+            if not stripped:
+                # Blank lines belong to the scalar only if more of its content follows
+                blank_lines.append(line)
+                continue
+            if indent > scalar_indent:
+                for scalar_line in blank_lines + [line]:
+                    output.append(scalar_line)
+                    protected_lines.add(len(output))
+                blank_lines = []
+                continue
+            scalar_indent = None
+            blank_lines = []
+        if stripped.startswith("#"):
+            continue
+        output.append(line)
+        if _YAML_BLOCK_SCALAR.search(line.rstrip()):
+            scalar_indent = indent
+    return _strip_blank_and_trailing("\n".join(output), protected_lines)
+
+
+def _build_minifier_table() -> Dict[str, Callable[[str], str]]:
+    table: Dict[str, Callable[[str], str]] = {}
+    for ext in PYTHON_EXTENSIONS:
+        table[ext] = minify_python
+    for ext in C_LIKE_EXTENSIONS:
+        table[ext] = minify_c_like
+    for ext in REGEX_LITERAL_EXTENSIONS:
+        table[ext] = lambda source: minify_c_like(source, regex_literals=True)
+    for ext in BLOCK_COMMENT_ONLY_EXTENSIONS:
+        table[ext] = lambda source: minify_c_like(source, line_comments=False)
+    for ext in JSON_EXTENSIONS:
+        table[ext] = minify_json
+    for ext in YAML_EXTENSIONS:
+        table[ext] = minify_yaml
+    return table
+
+
+MINIFIERS = _build_minifier_table()
+
+
+class ContentMinifier:
+    """Applies language-aware minification to file contents.
+
+    Minification is opt-in per extension. Transformed output is cached by content hash
+    so that unchanged files cost nothing on subsequent runs.
+    """
+
+    def __init__(self, extensions: Iterable[str], cache: Optional[ContentCache] = None):
+        """
+        Initialize the ContentMinifier.
+
+        Args:
+            extensions (Iterable[str]): Extensions to minify (e.g. `py` or `.py`), or `all`
+                to enable every supported language.
+            cache (ContentCache, optional): Cache for transformed output. Defaults to the
+                `minify` namespace of the user cache directory.
+
+        Raises:
+            ValueError: If an extension has no minifier.
+        """
+        self.extensions: Set[str] = set()
+        for ext in extensions:
+            ext = ext.strip().lower()
+            if ext == "all":
+                self.extensions.update(MINIFIERS)
+                continue
+            if not ext.startswith("."):
+                ext = f".{ext}"
+            if ext not in MINIFIERS:
+                raise ValueError(
+                    f"No minifier available for '{ext}'. Supported: {', '.join(sorted(MINIFIERS))}"
+                )
+            self.extensions.add(ext)
+        self.cache = cache if cache is not None else ContentCache("minify")
+
+    def is_enabled_for(self, relative_path: str) -> bool:
+        """Check whether a file will be minified.
+
+        Args:
+            relative_path (str): The file path relative to the project root.
+
+        Returns:
+            bool: True if minification is enabled for the file's extension.
+        """
+        return Path(relative_path).suffix.lower() in self.extensions
+
+    def minify(self, relative_path: str, content: str) -> str:
+        """Minify a single file's content if its extension is enabled.
+
+        Args:
+            relative_path (str): The file path relative to the project root.
+            content (str): The file content.
+
+        Returns:
+            str: The minified content, or the original content if not enabled.
+        """
+        if not self.is_enabled_for(relative_path):
+            return content
+        suffix = Path(relative_path).suffix.lower()
+        key = content_hash(f"{MINIFIER_VERSION}{suffix}\0{content}")
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        minified = MINIFIERS[suffix](content)
+        self.cache.set(key, minified)
+        return minified
+
+    def minify_all(self, file_contents: Dict[str, str]) -> Dict[str, str]:
+        """Minify every enabled file in a mapping of file contents.
+
+        Args:
+            file_contents (Dict[str, str]): A mapping of relative paths to contents.
+
+        Returns:
+            Dict[str, str]: A new mapping with enabled files minified.
+        """
+        return {path: self.minify(path, content) for path, content in file_contents.items()}
@@ -0,0 +1,239 @@
+"""Jupyter Notebook Conversion for Copcon.
+
+This module turns `.ipynb` files into a compact, cell-delimited text form, keeping cell
+sources and, optionally, a few lines of each cell's text output. The notebook is scanned
+directly from a memory-mapped file: only the values that are kept are decoded, while
+everything else, including base64-encoded images and other rich outputs, is skipped over
+without ever being turned into Python objects. Converted notebooks are cached by content
+hash.
+"""
+
+import hashlib
+import json
+import mmap
+import re
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+from copcon.core.cache import ContentCache
+from copcon.utils.logger import logger
+
+# Bump when the converted output changes, to invalidate cached conversions.
+NOTEBOOK_VERSION = "1"
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_LITERAL = re.compile(rb"true|false|null|-?[0-9][0-9.eE+\-]*")
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class _Scanner:
+    """A pull scanner over JSON bytes that decodes only the values asked for."""
+
+    def __init__(self, buffer: Buffer):
+        self.buffer = buffer
+        self.pos = 0
+
+    def _skip_whitespace(self):
+        self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+
+    def _peek(self) -> bytes:
+        self._skip_whitespace()
+        return self.buffer[self.pos:self.pos + 1]
+
+    def _expect(self, token: bytes):
+        if self._peek() != token:
+            raise ValueError(f"Expected {token!r} at offset {self.pos}")
+        self.pos += 1
+
+    def _match(self, pattern: "re.Pattern") -> int:
+        match = pattern.match(self.buffer, self.pos)
+        if match is None:
+            raise ValueError(f"Invalid JSON at offset {self.pos}")
+        return match.end()
+
+    def skip(self):
+        """Move past the next value without decoding it."""
+        token = self._peek()
+        if token == b'"':
+            self.pos = self._match(_STRING)
+        elif token == b"{":
+            for _ in self.iter_object():
+                self.skip()
+        elif token == b"[":
+            for _ in self.iter_array():
+                self.skip()
+        else:
+            self.pos = self._match(_LITERAL)
+
+    def read(self):
+        """Decode the next value."""
+        self._skip_whitespace()
+        start = self.pos
+        self.skip()
+        return json.loads(self.buffer[start:self.pos])
+
+    def _iter_container(self, opening: bytes, closing: bytes, keyed: bool) -> Iterator[Optional[str]]:
+        self._expect(opening)
+        if self._peek() == closing:
+            self.pos += 1
+            return
+        while True:
+            key = None
+            if keyed:
+                key = self.read()
+                self._expect(b":")
+            start = self.pos
+            yield key
+            if self.pos == start:
+                # The consumer ignored the value
+                self.skip()
+            token = self._peek()
+            self.pos += 1
+            if token == closing:
+                return
+            if token != b",":
+                raise ValueError(f"Expected ',' or {closing!r} at offset {self.pos - 1}")
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of the next object. The caller reads or skips each value."""
+        return self._iter_container(b"{", b"}", keyed=True)
+
+    def iter_array(self) -> Iterator[None]:
+        """Yield once per element of the next array. The caller reads or skips each element."""
+        return self._iter_container(b"[", b"]", keyed=False)
+
+
+def _text(value: Union[str, List[str]]) -> str:
+    # Notebook text fields are either a string or a list of lines.
+    return value if isinstance(value, str) else "".join(value)
+
+
+def _read_outputs(scanner: _Scanner) -> List[str]:
+    lines: List[str] = []
+    for _ in scanner.iter_array():
+        error = {}
+        for key in scanner.iter_object():
+            if key == "text":
+                lines.extend(_text(scanner.read()).splitlines())
+            elif key == "data":
+                for mime_type in scanner.iter_object():
+                    if mime_type == "text/plain":
+                        lines.extend(_text(scanner.read()).splitlines())
+            elif key in ("ename", "evalue"):
+                error[key] = scanner.read()
+        if error:
+            lines.append(f"{error.get('ename', 'Error')}: {error.get('evalue', '')}")
+    return lines
+
+
+def _format_cell(cell_type: str, source: str, output_lines: List[str], max_output_lines: int) -> str:
+    header = "# %%" if cell_type == "code" else f"# %% [{cell_type}]"
+    text = f"{header}\n{source.rstrip()}"
+    if output_lines:
+        shown = output_lines[:max_output_lines]
+        if len(output_lines) > max_output_lines:
+            shown.append(f"... ({len(output_lines) - max_output_lines} more lines)")
+        text += "\n# Output:\n" + "\n".join(f"# {line}" for line in shown)
+    return text
+
+
+def convert_notebook(buffer: Buffer, max_output_lines: int = 0) -> Optional[str]:
+    """Convert notebook JSON into compact, cell-delimited text.
+
+    Cells are separated by `# %%` markers (`# %% [markdown]` for non-code cells), as in the
+    percent format understood by many editors.
+
+    Args:
+        buffer (bytes | mmap.mmap): The notebook file's bytes.
+        max_output_lines (int): Text output lines to keep per code cell. With 0, outputs
+            are dropped. Non-text outputs such as images are always dropped.
+
+    Returns:
+        Optional[str]: The converted notebook, or None if the data is not a notebook with
+        a `cells` list.
+
+    Raises:
+        ValueError: If the data is not valid JSON.
+    """
+    scanner = _Scanner(buffer)
+    cells: Optional[List[str]] = None
+    for key in scanner.iter_object():
+        if key != "cells":
+            continue
+        cells = []
+        for _ in scanner.iter_array():
+            cell_type, source, output_lines = "code", "", []
+            for cell_key in scanner.iter_object():
+                if cell_key == "cell_type":
+                    cell_type = scanner.read()
+                elif cell_key == "source":
+                    source = _text(scanner.read())
+                elif cell_key == "outputs" and max_output_lines > 0:
+                    output_lines = _read_outputs(scanner)
+            cells.append(_format_cell(cell_type, source, output_lines, max_output_lines))
+    if cells is None:
+        return None
+    return "\n\n".join(cells)
+
+
+class NotebookConverter:
+    """Converts notebook files to compact text, caching results by content hash."""
+
+    def __init__(self, max_output_lines: int = 0, cache: Optional[ContentCache] = None):
+        """
+        Initialize the NotebookConverter.
+
+        Args:
+            max_output_lines (int): Text output lines to keep per code cell (0 for none).
+            cache (ContentCache, optional): Cache for converted notebooks. Defaults to the
+                `notebook` namespace of Copcon's cache directory.
+        """
+        self.max_output_lines = max_output_lines
+        self.cache = cache or ContentCache("notebook")
+
+    def convert(self, file_path: Path) -> Optional[str]:
+        """Convert a notebook file.
+
+        Args:
+            file_path (Path): The `.ipynb` file.
+
+        Returns:
+            Optional[str]: The converted text, or None if the file is not a valid notebook and
+            should be read as plain text instead.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        with file_path.open("rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return None
+        with buffer:
+            return self.convert_buffer(buffer, str(file_path))
+
+    def convert_buffer(self, buffer: Buffer, name: str = "notebook") -> Optional[str]:
+        """Convert notebook bytes that are already in memory, such as an archive member.
+
+        Args:
+            buffer (bytes | mmap.mmap): The notebook's bytes.
+            name (str): The notebook's name, used in log messages.
+
+        Returns:
+            Optional[str]: The converted text, or None if the data is not a valid notebook.
+        """
+        digest = hashlib.blake2b(buffer, digest_size=16).hexdigest()
+        key = f"{digest}{NOTEBOOK_VERSION}{self.max_output_lines:04d}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            text = convert_notebook(buffer, self.max_output_lines)
+        except (ValueError, UnicodeDecodeError) as e:
+            logger.debug(f"Reading {name} as plain text; not a valid notebook: {e}")
+            return None
+        if text is not None:
+            self.cache.set(key, text)
+        return text
@@ -0,0 +1,154 @@
+"""Zero-Copy Passthrough of File Contents for Copcon.
+
+Most files reach the report unchanged: they are valid UTF-8 with `\\n` line endings and are
+neither transformed nor replaced by a placeholder. Their bytes on disk are then exactly the
+report's encoding of their text. Encoding that text again to write it to the output file is
+wasted work, so such contents are copied from the file into the output file by the kernel
+(`copy_file_range`, or `sendfile`) instead. Only the framing is encoded in Python, and the
+text is decoded once, for tokenization.
+"""
+
+import errno
+import os
+from pathlib import Path
+from typing import BinaryIO, Optional
+from copcon.core.cache import content_hash
+
+# Framing is collected up to this many bytes before it is written.
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Errors meaning a copy system call does not support these files; the next one is tried.
+_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK, errno.EBADF}
+
+
+class SourceText(str):
+    """Text decoded unchanged from a UTF-8 file, so the file's bytes are its exact encoding.
+
+    Attributes:
+        path (Path): The file the text was read from.
+        size (int): The file size when it was read.
+        mtime_ns (int): The file modification time when it was read, in nanoseconds.
+        digest (str): The content hash of the text, computed from the file's bytes.
+    """
+
+    path: Path
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+def source_text(data: bytes, path: Path, stat: os.stat_result) -> Optional[SourceText]:
+    """Decode a file's bytes as SourceText, if writing the text reproduces them exactly.
+
+    Args:
+        data (bytes): The complete content of the file, sniffed as BOM-less UTF-8.
+        path (Path): The file.
+        stat (os.stat_result): The file's status, taken after reading it.
+
+    Returns:
+        Optional[SourceText]: The text, or None if the bytes are not valid UTF-8, contain a
+        carriage return (which is normalized away), or the file changed while being read.
+    """
+    if len(data) != stat.st_size or b"\r" in data:
+        return None
+    try:
+        text = SourceText(data, "utf-8")
+    except UnicodeDecodeError:
+        return None
+    text.path = path
+    text.size = stat.st_size
+    text.mtime_ns = stat.st_mtime_ns
+    text.digest = content_hash(data)
+    return text
+
+
+def _copy_range(source_fd: int, target_fd: int, count: int) -> int:
+    """Copy bytes between the current offsets of two files in the kernel.
+
+    Returns:
+        int: The number of bytes copied, which is less than `count` if the source ended
+        early or no copy system call supports the files.
+    """
+    copied = 0
+    for name in ("copy_file_range", "sendfile"):
+        copy = getattr(os, name, None)
+        if copy is None:
+            continue
+        try:
+            while copied < count:
+                if name == "copy_file_range":
+                    n = copy(source_fd, target_fd, count - copied)
+                else:
+                    n = copy(target_fd, source_fd, None, count - copied)
+                if n == 0:
+                    return copied
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+    return copied
+
+
+class PassthroughWriter:
+    """Writes report chunks to a binary file, copying SourceText chunks from their files.
+
+    Other chunks are encoded as UTF-8 and buffered. A SourceText whose file changed since it
+    was read, or cannot be copied, is encoded like any other chunk, so the output always
+    matches the text that was tokenized.
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        """
+        Initialize the PassthroughWriter.
+
+        Args:
+            fileobj (BinaryIO): The output file, opened unbuffered in binary write mode.
+        """
+        self.file = fileobj
+        self.copied_bytes = 0
+        self._buffer = bytearray()
+        # Cleared once no copy system call supports the files, e.g. on macOS
+        self._kernel_copy = True
+
+    def write(self, chunk: str):
+        """Write the next chunk of the report."""
+        if isinstance(chunk, SourceText) and self._kernel_copy:
+            self.flush()
+            if self._copy(chunk):
+                return
+        self._buffer += chunk.encode("utf-8")
+        if len(self._buffer) >= WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write out the buffered chunks."""
+        view = memoryview(self._buffer)
+        while view:
+            view = view[self.file.write(view):]
+        view.release()
+        self._buffer.clear()
+
+    def _copy(self, text: SourceText) -> bool:
+        try:
+            stat = os.stat(text.path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != (text.size, text.mtime_ns):
+            return False
+        target_fd = self.file.fileno()
+        start = os.lseek(target_fd, 0, os.SEEK_CUR)
+        try:
+            with open(text.path, "rb") as source:
+                copied = _copy_range(source.fileno(), target_fd, text.size)
+        except OSError:
+            copied = -1
+        if copied == text.size:
+            self.copied_bytes += copied
+            return True
+        if copied == 0 and text.size:
+            self._kernel_copy = False
+        # Undo a partial copy; the text is written instead
+        os.lseek(target_fd, start, os.SEEK_SET)
+        os.ftruncate(target_fd, start)
+        return False
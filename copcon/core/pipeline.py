@@ -0,0 +1,222 @@
+"""Pipelined Report Generation for Copcon.
+
+This module runs the walk, read, tokenize and write stages of a report concurrently. The
+walker runs in its own thread, reading and tokenizing run in separate thread pools, and
+the caller acts as the writer. Stages are connected by bounded queues, so disk and CPU are
+busy at the same time, output starts before the walk has finished, and memory stays
+bounded by the queue size regardless of project size.
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from functools import partial
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from copcon.core.file_record import FileRecord
+from copcon.core.processor import ContentProcessor
+from copcon.exceptions import FileReadError
+from copcon.utils.logger import logger
+
+_DONE = object()
+
+
+class _WalkError:
+    """Carries an exception raised by the walker thread to the writer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class ReportPipeline:
+    """Streams file contents through overlapping walk, read and tokenize stages.
+
+    Contents are yielded in walk order, exactly as `ContentProcessor.process` would
+    yield them, so the pipeline can feed a ReportFormatter directly.
+    """
+
+    def __init__(
+        self,
+        processor: ContentProcessor,
+        read_workers: int = 4,
+        token_workers: int = 2,
+        queue_size: int = 64,
+        chunk_size: Optional[int] = None,
+    ):
+        """
+        Initialize the ReportPipeline.
+
+        Args:
+            processor (ContentProcessor): Loads, transforms and counts individual records.
+            read_workers (int): Threads loading and transforming file contents.
+            token_workers (int): Threads counting tokens.
+            queue_size (int): Maximum number of walked records waiting to be read, and of
+                records being read or tokenized at any one time.
+            chunk_size (int, optional): Number of records loaded and transformed together.
+                Defaults to the skeleton extractor's parallel threshold when skeletons are
+                extracted, so chunks are parsed in its process pool, and to 1 otherwise. The
+                number of records in flight is raised to two chunks if needed, so one chunk
+                is read while the previous one is written.
+
+        Attributes:
+            records (List[FileRecord]): Every record taken from the walker, in order. Complete
+                once the contents have been fully consumed.
+        """
+        self.processor = processor
+        self.read_workers = read_workers
+        self.token_workers = token_workers
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.records: List[FileRecord] = []
+
+    def _put(self, walked: queue.Queue, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                walked.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _walk(self, records: Iterable[FileRecord], walked: queue.Queue, stop: threading.Event):
+        try:
+            for record in records:
+                if not self._put(walked, record, stop):
+                    return
+        except BaseException as e:
+            self._put(walked, _WalkError(e), stop)
+            return
+        self._put(walked, _DONE, stop)
+
+    def _take(self, walked: queue.Queue, chunk_size: int, block: bool) -> Tuple[List[FileRecord], bool]:
+        """Take up to `chunk_size` walked records, waiting for the first one only if `block` is set.
+
+        Returns the records and whether the walk has finished.
+        """
+        chunk: List[FileRecord] = []
+        while len(chunk) < chunk_size:
+            try:
+                item = walked.get(block=block and not chunk)
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return chunk, True
+            if isinstance(item, _WalkError):
+                raise item.error
+            chunk.append(item)
+        return chunk, False
+
+    def _submit(
+        self, chunk: List[FileRecord], read_pool: ThreadPoolExecutor, token_pool: ThreadPoolExecutor
+    ) -> List[Future]:
+        """Schedule the read stage for a chunk, chaining each record's token stage onto its completion."""
+        results: List[Future] = [Future() for _ in chunk]
+
+        def settle(result: Future, source: Future):
+            # The writer may already have cancelled the result while shutting down.
+            if result.done():
+                return
+            try:
+                if source.cancelled():
+                    result.cancel()
+                elif source.exception() is not None:
+                    result.set_exception(source.exception())
+                else:
+                    result.set_result(source.result())
+            except InvalidStateError:
+                pass
+
+        def read():
+            errors: Dict[str, FileReadError] = {}
+            return self.processor.prepare_batch(chunk, errors), errors
+
+        def on_read(read_future: Future):
+            if read_future.cancelled() or read_future.exception() is not None:
+                for result in results:
+                    settle(result, read_future)
+                return
+            prepared, errors = read_future.result()
+            for record, result in zip(chunk, results):
+                if record.relative_path in errors:
+                    failed: Future = Future()
+                    failed.set_exception(errors[record.relative_path])
+                    settle(result, failed)
+                    continue
+                content, tokens_before = prepared[record.relative_path]
+                try:
+                    token_pool.submit(self.processor.finalize, record, content, tokens_before).add_done_callback(
+                        partial(settle, result)
+                    )
+                except RuntimeError:
+                    # The token pool has been shut down because the writer stopped early.
+                    result.cancel()
+
+        read_pool.submit(read).add_done_callback(on_read)
+        return results
+
+    def iter_contents(self, records: Iterable[FileRecord]) -> Iterator[Tuple[str, str]]:
+        """Yield `(relative_path, content)` pairs in walk order while later files are processed.
+
+        Files that cannot be read are skipped with a warning, and a single FileReadError
+        listing them is raised at the end.
+
+        Args:
+            records (Iterable[FileRecord]): The walk, typically `FileContentReader.iter_records()`.
+                It is consumed in a background thread.
+
+        Yields:
+            Tuple[str, str]: `(relative_path, content)` pairs.
+
+        Raises:
+            FileReadError: If any file could not be read.
+        """
+        self.records.clear()
+        extractor = self.processor.skeleton_extractor
+        chunk_size = self.chunk_size or (extractor.parallel_threshold if extractor else 1)
+        window = max(self.queue_size, 2 * chunk_size)
+        walked: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        walker = threading.Thread(target=self._walk, args=(records, walked, stop), daemon=True)
+        walker.start()
+
+        pending: Deque[Tuple[FileRecord, Future]] = deque()
+        errors: List[FileReadError] = []
+        walk_done = False
+        try:
+            with ThreadPoolExecutor(self.read_workers, thread_name_prefix="copcon-read") as read_pool, \
+                    ThreadPoolExecutor(self.token_workers, thread_name_prefix="copcon-token") as token_pool:
+                try:
+                    while True:
+                        # Keep the window full a chunk at a time; only block on the walker when nothing
+                        # else is pending.
+                        while not walk_done and len(pending) + chunk_size <= window:
+                            chunk, walk_done = self._take(walked, chunk_size, block=not pending)
+                            if not chunk:
+                                break
+                            self.records.extend(chunk)
+                            pending.extend(zip(chunk, self._submit(chunk, read_pool, token_pool)))
+
+                        if not pending:
+                            break
+                        guard = self.processor.guard
+                        if guard and not guard.check_time():
+                            break
+                        record, future = pending.popleft()
+                        try:
+                            content = future.result()
+                        except FileReadError as e:
+                            logger.warning(f"Skipping file {record.relative_path}: {e}")
+                            errors.append(e)
+                            continue
+                        yield record.relative_path, content
+                finally:
+                    stop.set()
+                    for _, future in pending:
+                        future.cancel()
+        finally:
+            # Chunks share the extractor's process pool; it is shut down once the run ends
+            if extractor:
+                extractor.close()
+
+        if errors:
+            raise FileReadError(f"Encountered errors while reading files: {[str(e) for e in errors]}")
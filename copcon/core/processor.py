@@ -0,0 +1,175 @@
+"""Content Processing for Copcon.
+
+This module connects file records to the report formatter. It loads file contents in
+small batches, applies the optional transform stages (skeletons and minification), counts
+tokens per file and releases each file's content once it has been emitted.
+"""
+
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from copcon.core.file_record import FileRecord
+from copcon.core.guards import ResourceGuard
+from copcon.core.minifier import ContentMinifier
+from copcon.core.skeleton import SkeletonExtractor
+from copcon.core.snapshot import ReportSnapshot
+from copcon.exceptions import FileReadError
+from copcon.utils.logger import logger
+
+
+class ContentProcessor:
+    """Loads, transforms and tokenizes file contents batch by batch.
+
+    Only one batch of contents is held in memory at a time, so memory use is bounded by
+    the batch size rather than the total size of the project.
+    """
+
+    def __init__(
+        self,
+        encoder: Any,
+        skeleton_extractor: Optional[SkeletonExtractor] = None,
+        minifier: Optional[ContentMinifier] = None,
+        batch_size: int = 256,
+        guard: Optional[ResourceGuard] = None,
+        snapshot: Optional[ReportSnapshot] = None,
+    ):
+        """
+        Initialize the ContentProcessor.
+
+        Args:
+            encoder (Any): A tokenizer exposing `encode(text)`, such as a tiktoken encoding.
+            skeleton_extractor (SkeletonExtractor, optional): Reduces Python files to skeletons.
+            minifier (ContentMinifier, optional): Minifies enabled file types.
+            batch_size (int): Number of files loaded at once.
+            guard (ResourceGuard, optional): Stops loading further files once its deadline passes.
+            snapshot (ReportSnapshot, optional): Supplies the processed content of files that are
+                unchanged since the previous run, and records every processed file for the next.
+
+        Attributes:
+            minification_tokens (Optional[Tuple[int, int]]): Tokens of minified files before and
+                after minification, available once processing has finished.
+        """
+        self.encoder = encoder
+        self.skeleton_extractor = skeleton_extractor
+        self.minifier = minifier
+        self.batch_size = batch_size
+        self.guard = guard
+        self.snapshot = snapshot
+        self.minification_tokens: Optional[Tuple[int, int]] = (0, 0) if minifier else None
+        self._lock = threading.Lock()
+
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens in a piece of text."""
+        return len(self.encoder.encode(text))
+
+    def prepare_batch(
+        self, records: Sequence[FileRecord], errors: Dict[str, FileReadError]
+    ) -> Dict[str, Tuple[str, Optional[int]]]:
+        """Load and transform a batch of records. Safe to call from multiple threads.
+
+        The batch is skeletonized together, so large batches are parsed in the skeleton
+        extractor's process pool.
+
+        Args:
+            records (Sequence[FileRecord]): The records to load.
+            errors (Dict[str, FileReadError]): Receives the error of each record that cannot
+                be read, keyed by relative path.
+
+        Returns:
+            Dict[str, Tuple[str, Optional[int]]]: For each readable record, the transformed
+            content and the token count before minification if the file was minified (None
+            otherwise).
+        """
+        prepared = {}
+        contents = {}
+        for record in records:
+            reused = self.snapshot.lookup(record) if self.snapshot else None
+            if reused is not None:
+                content, record.token_count, tokens_before = reused
+                prepared[record.relative_path] = (content, tokens_before)
+                continue
+            try:
+                contents[record.relative_path] = record.content
+            except FileReadError as e:
+                errors[record.relative_path] = e
+                continue
+            record.release()
+
+        if self.skeleton_extractor:
+            contents = self.skeleton_extractor.extract_all(contents)
+        for relative_path, content in contents.items():
+            tokens_before = None
+            if self.minifier and self.minifier.is_enabled_for(relative_path):
+                tokens_before = self.count_tokens(content)
+                content = self.minifier.minify(relative_path, content)
+            prepared[relative_path] = (content, tokens_before)
+        return prepared
+
+    def finalize(self, record: FileRecord, content: str, tokens_before: Optional[int] = None) -> str:
+        """Count the tokens of a prepared record. Safe to call from multiple threads.
+
+        Args:
+            record (FileRecord): The record being emitted; its `token_count` is set unless
+                `prepare_batch` already set it.
+            content (str): The content returned by `prepare_batch`.
+            tokens_before (int, optional): The pre-minification token count from `prepare_batch`.
+
+        Returns:
+            str: The content, unchanged.
+        """
+        if record.token_count is None:
+            record.token_count = self.count_tokens(content)
+        if tokens_before is not None:
+            with self._lock:
+                before, after = self.minification_tokens
+                self.minification_tokens = (before + tokens_before, after + record.token_count)
+        if self.snapshot:
+            self.snapshot.store(record, content, tokens_before)
+        return content
+
+    def process(self, records: Sequence[FileRecord]) -> Iterator[Tuple[str, str]]:
+        """Yield the final content of each record, ready to be formatted.
+
+        Sets `token_count` on every emitted record. Files that cannot be read are skipped
+        with a warning, and a single FileReadError listing them is raised at the end.
+
+        Args:
+            records (Sequence[FileRecord]): The records to process, in report order.
+
+        Yields:
+            Tuple[str, str]: `(relative_path, content)` pairs.
+
+        Raises:
+            FileReadError: If any file could not be read.
+        """
+        try:
+            yield from self._process(records)
+        finally:
+            # Batches share the extractor's process pool; it is shut down once the run ends
+            if self.skeleton_extractor:
+                self.skeleton_extractor.close()
+
+    def _process(self, records: Sequence[FileRecord]) -> Iterator[Tuple[str, str]]:
+        errors: List[FileReadError] = []
+        expired = False
+        for start in range(0, len(records), self.batch_size):
+            batch = []
+            for record in records[start:start + self.batch_size]:
+                if self.guard and not self.guard.check_time():
+                    expired = True
+                    break
+                batch.append(record)
+
+            batch_errors: Dict[str, FileReadError] = {}
+            prepared = self.prepare_batch(batch, batch_errors)
+            for record in batch:
+                if record.relative_path in batch_errors:
+                    logger.warning(f"Skipping file {record.relative_path}: {batch_errors[record.relative_path]}")
+                    errors.append(batch_errors[record.relative_path])
+                    continue
+                content, tokens_before = prepared.pop(record.relative_path)
+                yield record.relative_path, self.finalize(record, content, tokens_before)
+            if expired:
+                break
+
+        if errors:
+            raise FileReadError(f"Encountered errors while reading files: {[str(e) for e in errors]}")
@@ -2,27 +2,151 @@
 
 This module provides functionality to format the directory structure and file contents
 into a comprehensive report.
+
+Two dialects are supported. The `standard` dialect frames every file with a `File:` header
+and two separator lines. The `compact` dialect spends fewer tokens on framing: a single
+short delimiter line per file and, optionally, paths relative to the directory all files
+share.
 """
-from typing import Dict
+import os
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Tuple, Union
+from copcon.core.passthrough import PassthroughWriter
+from copcon.core.report_tokens import ReportTokenCounter
 from copcon.utils.logger import logger
-from pathlib import Path
+from pathlib import Path, PurePath
+
+SEPARATOR = "-" * 40
+DIALECTS = ("standard", "compact")
+
+
+def common_directory(paths: Iterable[str]) -> str:
+    """The directory all paths share, as a POSIX path with a trailing slash, or `""`."""
+    common = None
+    for path in paths:
+        parts = PurePath(path).parts[:-1]
+        if common is None:
+            common = parts
+            continue
+        length = 0
+        while length < min(len(common), len(parts)) and common[length] == parts[length]:
+            length += 1
+        common = common[:length]
+        if not common:
+            break
+    return "/".join(common) + "/" if common else ""
+
+
+def framing_tokens(formatter: "ReportFormatter", paths: Iterable[str], encoder: Any) -> int:
+    """Count the tokens a report spends on framing, i.e. everything but the file contents.
+
+    Args:
+        formatter (ReportFormatter): Formatter of the report.
+        paths (Iterable[str]): The relative paths of the files in the report.
+        encoder (Any): A tokenizer exposing `encode(text)`.
+
+    Returns:
+        int: The token count of the header and the per-file framing.
+    """
+    return sum(len(encoder.encode(chunk)) for chunk in formatter.iter_framing(paths))
+
 
 class ReportFormatter:
     """Formats the directory structure and file contents into a structured report."""
 
-    def __init__(self, project_name: str, directory_tree: str, file_contents: Dict[str, str]):
+    def __init__(
+        self,
+        project_name: str,
+        directory_tree: str,
+        file_contents: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+        tree_heading: str = "Directory Structure",
+        dialect: str = "standard",
+        path_prefix: str = "",
+        token_counter: Optional[ReportTokenCounter] = None,
+    ):
         """
         Initialize the ReportFormatter.
 
         Args:
             project_name (str): The name of the project.
             directory_tree (str): The directory tree representation.
-            file_contents (Dict[str, str]): A mapping of file paths to their contents.
+            file_contents (Mapping[str, str] | Iterable[Tuple[str, str]]): A mapping of file paths
+                to their contents, or an iterable of `(path, content)` pairs. An iterable is
+                consumed lazily while the report is produced, and only once.
+            tree_heading (str): The heading above the directory tree, e.g. for a tree delta.
+            dialect (str): The report layout, one of `DIALECTS`.
+            path_prefix (str): With the `compact` dialect, a directory (with a trailing slash)
+                shared by all files. It is stated once and left out of each file's path.
+            token_counter (ReportTokenCounter, optional): Receives every chunk as it is
+                produced, with file contents marked as counted, to account for the framing.
         """
 
         self.project_name = project_name
         self.directory_tree = directory_tree
         self.file_contents = file_contents
+        self.tree_heading = tree_heading
+        self.dialect = dialect
+        self.path_prefix = path_prefix if dialect == "compact" else ""
+        self.token_counter = token_counter
+
+    def header(self) -> str:
+        """The part of the report before the first file: the directory tree."""
+        if self.dialect != "compact":
+            return f"{self.tree_heading}:\n{self.project_name}\n{self.directory_tree}\n\nFile Contents:"
+        files = f"Files (paths relative to {self.path_prefix})" if self.path_prefix else "Files"
+        return f"{self.tree_heading}: {self.project_name}\n{self.directory_tree}\n\n{files}:"
+
+    def file_header(self, relative_path: str) -> str:
+        """The framing in front of a file's content."""
+        if self.dialect != "compact":
+            return f"\n\nFile: {relative_path}\n{SEPARATOR}\n"
+        path = PurePath(relative_path).as_posix()
+        if self.path_prefix and path.startswith(self.path_prefix):
+            path = path[len(self.path_prefix):]
+        return f"\n\n==> {path} <==\n"
+
+    def file_footer(self) -> str:
+        """The framing after a file's content."""
+        return "" if self.dialect == "compact" else f"\n{SEPARATOR}"
+
+    def _account(self, text: str, counted: bool = False):
+        if self.token_counter is not None:
+            self.token_counter.add(text, counted)
+
+    def iter_framing(self, paths: Iterable[str]) -> Iterator[str]:
+        """Produce the framing a report of the given files would contain, without contents.
+
+        Args:
+            paths (Iterable[str]): The relative paths of the files.
+
+        Yields:
+            str: The header, then the framing of each file.
+        """
+        yield self.header()
+        for relative_path in paths:
+            yield self.file_header(relative_path) + self.file_footer()
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Produce the report piece by piece.
+
+        Joining the chunks yields exactly the output of `format()`.
+
+        Yields:
+            str: Consecutive pieces of the report.
+        """
+        header = self.header()
+        self._account(header)
+        yield header
+        footer = self.file_footer()
+        items = self.file_contents.items() if isinstance(self.file_contents, Mapping) else self.file_contents
+        for relative_path, content in items:
+            file_header = self.file_header(relative_path)
+            self._account(file_header)
+            yield file_header
+            self._account(content, counted=True)
+            yield content
+            if footer:
+                self._account(footer)
+                yield footer
 
     def format(self) -> str:
         """Format the report as a string.
@@ -31,20 +155,7 @@ class ReportFormatter:
             str: The formatted report.
         """
 
-        report = [
-            "Directory Structure:",
-            self.project_name,
-            self.directory_tree,
-            "\nFile Contents:"
-        ]
-        for relative_path, content in self.file_contents.items():
-            report.extend([
-                f"\nFile: {relative_path}",
-                "-" * 40,
-                content,
-                "-" * 40
-            ])
-        return "\n".join(report)
+        return "".join(self.iter_chunks())
 
     def write_to_file(self, report: str, output_file: Path):
         """Write the formatted report to a file.
@@ -64,3 +175,55 @@ class ReportFormatter:
         except Exception as e:
             logger.error(f"Error writing to file {output_file}: {e}")
             raise
+
+    def _write_chunks(
+        self,
+        write: Callable[[str], Any],
+        trailer: Union[str, Iterable[str], Callable[[], Union[str, Iterable[str]]]],
+    ):
+        for chunk in self.iter_chunks():
+            write(chunk)
+        if callable(trailer):
+            trailer = trailer()
+        if isinstance(trailer, str):
+            write(trailer)
+        else:
+            for chunk in trailer:
+                write(chunk)
+
+    def stream_to_file(
+        self,
+        output_file: Path,
+        trailer: Union[str, Iterable[str], Callable[[], Union[str, Iterable[str]]]] = "",
+    ):
+        """Write the report to a file chunk by chunk, without building it in memory.
+
+        File contents loaded as SourceText are copied from their files rather than encoded
+        again, except where the platform translates newlines in text files.
+
+        Args:
+            output_file (Path): The path to the output file.
+            trailer (str | Iterable[str] | Callable): Text appended after the report, such as a
+                git diff section, either as a string or as chunks. It may also be a function
+                producing it once the report body has been written.
+
+        Raises:
+            Exception: If there is an error writing to the file.
+        """
+
+        try:
+            if os.linesep == "\n":
+                # Newlines need no translation, so unchanged file contents are copied byte for byte
+                with output_file.open('wb', buffering=0) as f:
+                    writer = PassthroughWriter(f)
+                    self._write_chunks(writer.write, trailer)
+                    writer.flush()
+                if writer.copied_bytes:
+                    logger.debug(f"Copied {writer.copied_bytes:,} bytes of file contents without re-encoding")
+            else:
+                with output_file.open('w', encoding='utf-8') as f:
+                    self._write_chunks(f.write, trailer)
+            logger.info(f"Output written to {output_file}")
+        except Exception as e:
+            logger.error(f"Error writing to file {output_file}: {e}")
+            raise
@@ -0,0 +1,104 @@
+"""Exact Report Token Accounting for Copcon.
+
+The token count of a report is more than the sum of its file contents: the tree, file
+headers and separators cost tokens too. Because a tokenizer may merge characters across the
+point where two parts meet (e.g. the newline ending a header with blank lines starting the
+content), it is also not simply the sum of the parts' counts.
+
+This module counts everything but the separately counted parts exactly, without encoding
+the whole report again. It relies on positions a tokenizer never merges across: before a
+space or tab that follows a non-whitespace character, and before a word character that
+follows a newline. This holds for tiktoken's encodings. Only the text between the last such
+position before a join and the first one after it is encoded again.
+"""
+
+import re
+from typing import Any, List, Optional
+
+# Positions no token spans; see the module docstring.
+_SPLIT = re.compile(r"(?<=\S)(?=[ \t])|(?<=\n)(?=\w)")
+_WORD = re.compile(r"\w")
+
+# Characters searched backwards for the last split position of a part, at first.
+_TAIL_WINDOW = 256
+
+
+def _last_split(text: str, first: int) -> int:
+    """The last split position of a part, searching backwards from its end."""
+    window = _TAIL_WINDOW
+    while True:
+        start = max(first, len(text) - window)
+        last = None
+        for last in _SPLIT.finditer(text, start):
+            pass
+        if last is not None:
+            return last.start()
+        if start == first:
+            return first
+        window *= 4
+
+
+class ReportTokenCounter:
+    """Counts the tokens a report spends beyond its separately counted parts.
+
+    Parts are added in report order. Parts whose tokens are counted elsewhere, such as file
+    contents, are added with `counted=True`. The counter's `tokens` is then the exact
+    difference between the token count of the whole report and the sum of those parts:
+    the framing plus the effect of every join.
+    """
+
+    def __init__(self, encoder: Any):
+        """
+        Initialize the ReportTokenCounter.
+
+        Args:
+            encoder (Any): The tokenizer the parts were counted with, exposing `encode(text)`.
+        """
+        self.encoder = encoder
+        self._adjustment = 0
+        self._pending: List[str] = []  # Text since the last split position
+        self._last_char: Optional[str] = None
+
+    def _count(self, text: str) -> int:
+        return len(self.encoder.encode(text)) if text else 0
+
+    def _splits_at_start(self, text: str) -> bool:
+        if self._last_char is None:
+            return True
+        if self._last_char == "\n":
+            return _WORD.match(text) is not None
+        return not self._last_char.isspace() and text[0] in " \t"
+
+    def add(self, text: str, counted: bool = False):
+        """Add the next part of the report.
+
+        Args:
+            text (str): The part.
+            counted (bool): Whether the part's own token count is accounted for elsewhere.
+        """
+        if not text:
+            return
+        if self._splits_at_start(text):
+            first = 0
+        else:
+            match = _SPLIT.search(text)
+            first = match.start() if match else None
+
+        if first is None:
+            # The part joins the text around it; it is counted as part of that text instead
+            if counted:
+                self._adjustment -= self._count(text)
+            self._pending.append(text)
+        else:
+            last = _last_split(text, first)
+            head, tail = text[:first], text[last:]
+            if not counted:
+                self._adjustment += self._count(text)
+            self._adjustment += self._count("".join(self._pending) + head) - self._count(head) - self._count(tail)
+            self._pending = [tail]
+        self._last_char = text[-1]
+
+    @property
+    def tokens(self) -> int:
+        """The tokens of the report added so far, minus those of its counted parts."""
+        return self._adjustment + self._count("".join(self._pending))
@@ -0,0 +1,133 @@
+"""Line-Range and Symbol Selection for Copcon.
+
+This module lets `.copcontarget` entries select parts of a file instead of the whole file:
+`src/app.py:120-260` selects a range of lines and `src/app.py::Router.dispatch` selects a
+Python class, function or method by its dotted name. Only the selected spans are included
+in the report, and files selected by line ranges alone are read only up to the last
+selected line.
+"""
+
+import ast
+import re
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+_LINE_RANGE = re.compile(r"^(?P<path>.+):(?P<start>[0-9]+)(?:-(?P<end>[0-9]+))?$")
+
+
+class LineRange(NamedTuple):
+    """An inclusive, 1-based range of lines."""
+
+    start: int
+    end: int
+
+
+class Symbol(NamedTuple):
+    """A Python class, function or method, by dotted name (e.g. `Router.dispatch`)."""
+
+    name: str
+
+
+Selector = Union[LineRange, Symbol]
+
+
+def parse_target_entry(entry: str) -> Tuple[str, Optional[Selector]]:
+    """Split a `.copcontarget` entry into its path pattern and an optional selector.
+
+    Args:
+        entry (str): The stripped entry, e.g. `src/app.py:120-260`.
+
+    Returns:
+        Tuple[str, Optional[Selector]]: The path pattern and the selector, if any.
+
+    Raises:
+        ValueError: If a line range is empty or does not start at line 1 or later.
+    """
+    path, separator, name = entry.partition("::")
+    if separator and name:
+        return path, Symbol(name)
+    match = _LINE_RANGE.match(entry)
+    if match is None:
+        return entry, None
+    start = int(match["start"])
+    end = int(match["end"] or start)
+    if start < 1 or end < start:
+        raise ValueError(f"Invalid line range in .copcontarget entry {entry!r}")
+    return match["path"], LineRange(start, end)
+
+
+def selection_key(path: str) -> str:
+    """Normalize a selected path or a relative file path for lookups."""
+    path = path.replace("\\", "/")
+    while path.startswith(("./", "/")):
+        path = path[1:] if path.startswith("/") else path[2:]
+    return path
+
+
+def last_selected_line(selectors: List[Selector]) -> Optional[int]:
+    """The last line a file has to be read up to, or None if it has to be read in full."""
+    if any(isinstance(selector, Symbol) for selector in selectors):
+        return None
+    return max(selector.end for selector in selectors)
+
+
+def symbol_range(source: str, name: str) -> Optional[LineRange]:
+    """Find the lines of a class or function, including its decorators.
+
+    Args:
+        source (str): Python source code.
+        name (str): The dotted name, e.g. `Router.dispatch`.
+
+    Returns:
+        Optional[LineRange]: The symbol's lines, or None if it is not defined.
+    """
+    try:
+        body = ast.parse(source).body
+    except (SyntaxError, ValueError):
+        return None
+    node = None
+    for part in name.split("."):
+        node = next(
+            (
+                child for child in body
+                if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) and child.name == part
+            ),
+            None,
+        )
+        if node is None:
+            return None
+        body = node.body
+    start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+    return LineRange(start, node.end_lineno)
+
+
+def apply_selection(text: str, selectors: List[Selector]) -> str:
+    """Keep only the selected spans of a file.
+
+    Each span is preceded by a header naming the lines it covers, and spans are emitted in
+    the order they were selected.
+
+    Args:
+        text (str): The file's content, with normalized newlines.
+        selectors (List[Selector]): The selected line ranges and symbols.
+
+    Returns:
+        str: The selected spans.
+    """
+    lines = text.split("\n")
+    spans = []
+    for selector in selectors:
+        if isinstance(selector, Symbol):
+            line_range = symbol_range(text, selector.name)
+            if line_range is None:
+                spans.append(f"[Symbol {selector.name} not found]")
+                continue
+            header = f"[{selector.name}: lines {line_range.start}-{line_range.end}]"
+        else:
+            line_range = selector
+            header = f"[Lines {line_range.start}-{min(line_range.end, len(lines))}]"
+        if line_range.start > len(lines):
+            spans.append(f"[Lines {line_range.start}-{line_range.end}: past the end of the file]")
+            continue
+        spans.append(header + "\n" + "\n".join(lines[line_range.start - 1:line_range.end]))
+    return "\n\n".join(spans)
+
@@ -0,0 +1,197 @@
+"""Python Skeleton Extraction for Copcon.
+
+This module reduces Python files to their API surface: imports, class and function
+signatures, decorators and the first line of each docstring, with bodies replaced by `...`.
+"""
+
+import ast
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import pathspec
+from copcon.core.cache import ContentCache, content_hash
+from copcon.utils.logger import logger
+
+# Bump whenever the skeleton output changes, so stale cache entries are ignored.
+SKELETON_VERSION = "1"
+
+SKELETON_EXTENSIONS = {".py", ".pyi"}
+
+
+def _docstring_line(node: ast.AST, indent: str) -> List[str]:
+    docstring = ast.get_docstring(node, clean=True)
+    if not docstring:
+        return []
+    first_line = docstring.strip().splitlines()[0].replace('"""', '\\"\\"\\"')
+    if first_line.endswith(('"', "\\")):
+        first_line += " "
+    return [f'{indent}"""{first_line}"""']
+
+
+def _render_function(node: ast.AST, indent: str) -> List[str]:
+    lines = [f"{indent}@{ast.unparse(decorator)}" for decorator in node.decorator_list]
+    keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    lines.append(f"{indent}{keyword} {node.name}({ast.unparse(node.args)}){returns}:")
+    body = _docstring_line(node, indent + "    ")
+    lines.extend(body or [f"{indent}    ..."])
+    return lines
+
+
+def _render_class(node: ast.ClassDef, indent: str) -> List[str]:
+    lines = [f"{indent}@{ast.unparse(decorator)}" for decorator in node.decorator_list]
+    bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(kw) for kw in node.keywords]
+    signature = f"({', '.join(bases)})" if bases else ""
+    lines.append(f"{indent}class {node.name}{signature}:")
+    body = _docstring_line(node, indent + "    ")
+    body.extend(_render_body(node.body, indent + "    ", imports=False))
+    lines.extend(body or [f"{indent}    ..."])
+    return lines
+
+
+def _render_body(statements: Iterable[ast.stmt], indent: str, imports: bool) -> List[str]:
+    lines: List[str] = []
+    for node in statements:
+        if imports and isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(f"{indent}{ast.unparse(node)}")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            lines.extend(_render_function(node, indent))
+        elif isinstance(node, ast.ClassDef):
+            lines.extend(_render_class(node, indent))
+    return lines
+
+
+def python_skeleton(source: str) -> str:
+    """Reduce Python source code to its skeleton.
+
+    Args:
+        source (str): The Python source code.
+
+    Returns:
+        str: The skeleton, or the original source if it cannot be parsed.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as e:
+        logger.debug(f"Could not parse Python source, leaving it unchanged: {e}")
+        return source
+    lines = _docstring_line(tree, "")
+    lines.extend(_render_body(tree.body, "", imports=True))
+    return "\n".join(lines)
+
+
+class SkeletonExtractor:
+    """Replaces the contents of selected Python files with their skeletons.
+
+    Skeletons are cached by content hash, and parsing of uncached files is spread across
+    a process pool when there are enough of them to outweigh the pool's startup cost. The
+    pool is started once and reused by every `extract_all` call until `close`.
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[List[str]] = None,
+        cache: Optional[ContentCache] = None,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 64,
+    ):
+        """
+        Initialize the SkeletonExtractor.
+
+        Args:
+            patterns (List[str], optional): Gitignore-style patterns selecting the files to
+                skeletonize. If empty or None, every Python file is selected.
+            cache (ContentCache, optional): Cache for skeletons. Defaults to the `skeleton`
+                namespace of the user cache directory.
+            max_workers (int, optional): Maximum number of worker processes.
+            parallel_threshold (int): Minimum number of uncached files before a process pool
+                is used.
+        """
+        self.spec = pathspec.PathSpec.from_lines("gitwildmatch", patterns) if patterns else None
+        self.cache = cache if cache is not None else ContentCache("skeleton")
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def is_enabled_for(self, relative_path: str) -> bool:
+        """Check whether a file will be reduced to its skeleton.
+
+        Args:
+            relative_path (str): The file path relative to the project root.
+
+        Returns:
+            bool: True if the file is a Python file selected by the patterns.
+        """
+        if Path(relative_path).suffix.lower() not in SKELETON_EXTENSIONS:
+            return False
+        return self.spec is None or self.spec.match_file(relative_path)
+
+    def extract(self, relative_path: str, content: str) -> str:
+        """Skeletonize a single file if it is selected.
+
+        Args:
+            relative_path (str): The file path relative to the project root.
+            content (str): The file content.
+
+        Returns:
+            str: The skeleton, or the original content if the file is not selected.
+        """
+        if not self.is_enabled_for(relative_path):
+            return content
+        key = content_hash(f"{SKELETON_VERSION}\0{content}")
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = python_skeleton(content)
+            self.cache.set(key, cached)
+        return cached
+
+    def extract_all(self, file_contents: Dict[str, str]) -> Dict[str, str]:
+        """Skeletonize every selected file in a mapping of file contents.
+
+        Args:
+            file_contents (Dict[str, str]): A mapping of relative paths to contents.
+
+        Returns:
+            Dict[str, str]: A new mapping with selected files replaced by their skeletons.
+        """
+        result = dict(file_contents)
+        pending: Dict[str, List[str]] = {}
+        for relative_path, content in file_contents.items():
+            if not self.is_enabled_for(relative_path):
+                continue
+            key = content_hash(f"{SKELETON_VERSION}\0{content}")
+            cached = self.cache.get(key)
+            if cached is not None:
+                result[relative_path] = cached
+            else:
+                pending.setdefault(key, []).append(relative_path)
+
+        if not pending:
+            return result
+
+        keys = list(pending)
+        sources = [file_contents[pending[key][0]] for key in keys]
+        if len(sources) >= self.parallel_threshold:
+            # The pipeline calls this from several read threads at once
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                executor = self._executor
+            skeletons = list(executor.map(python_skeleton, sources, chunksize=16))
+        else:
+            skeletons = [python_skeleton(source) for source in sources]
+
+        for key, skeleton in zip(keys, skeletons):
+            self.cache.set(key, skeleton)
+            for relative_path in pending[key]:
+                result[relative_path] = skeleton
+        logger.debug(f"Generated {len(keys)} Python skeletons ({len(file_contents)} files total).")
+        return result
+
+    def close(self):
+        """Shut down the process pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,281 @@
+"""Report Snapshots for Copcon.
+
+This module remembers the previous run of a project so that an unchanged project can be
+reported without reading or tokenizing anything. A Merkle-style hash is computed for every
+directory from the names, sizes and modification times of its entries, using metadata
+only. If the root hash matches the stored snapshot, the stored report is reused as is.
+Otherwise, files whose size and modification time are unchanged reuse their processed
+content and token counts, and only changed files are read and tokenized again.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from copcon.core.cache import ContentCache, content_hash
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_record import FileRecord
+from copcon.core.token_stats import TokenStats
+from copcon.core.walker import VisitedSet, scan_directory
+from copcon.utils.logger import logger
+
+# Bump when the snapshot format or the meaning of stored values changes.
+SNAPSHOT_VERSION = "1"
+
+ROOT = "."
+
+
+def directory_hashes(
+    directory: Path,
+    exclude_hidden: bool = True,
+    follow_symlinks: bool = False,
+    file_filter: Optional[FileFilter] = None,
+) -> Dict[str, str]:
+    """Compute a Merkle hash for every directory below `directory` from metadata only.
+
+    A directory's hash covers the name, size and modification time of each file in it and
+    the name and hash of each subdirectory, so any change below a directory changes its
+    hash and the hashes of all its ancestors. Hidden directories are not descended into
+    when `exclude_hidden` is set; their names and modification times are hashed instead.
+    Ignored directories such as `__pycache__` are not descended into either and only their
+    names are hashed, as the report only lists their names; ignored files are skipped.
+
+    Args:
+        directory (Path): The project directory.
+        exclude_hidden (bool): Whether hidden directories are excluded from the report.
+        follow_symlinks (bool): Whether symbolic links are followed, as in the walker.
+        file_filter (FileFilter, optional): The filter of the report.
+
+    Returns:
+        Dict[str, str]: Hashes keyed by relative directory path, with the root as `.`.
+    """
+    visited = VisitedSet() if follow_symlinks else None
+    if visited is not None:
+        visited.first_visit_path(directory)
+    # Directories are listed parents first, then hashed in reverse so children come first.
+    listings: List[Tuple[str, List[str], List[Tuple[str, str]]]] = []
+    pending = [(directory, ROOT)]
+    while pending:
+        path, relative = pending.pop()
+        try:
+            entries = scan_directory(path, follow_symlinks)
+        except OSError:
+            entries = []
+        lines: List[str] = []
+        children: List[Tuple[str, str]] = []
+        for entry in entries:
+            child = entry.name if relative == ROOT else f"{relative}/{entry.name}"
+            if file_filter is not None and file_filter.should_ignore_path(
+                str(entry.path.relative_to(entry.path.anchor)), entry.is_dir
+            ):
+                if entry.is_dir:
+                    lines.append(f"i\0{entry.name}\n")
+                continue
+            try:
+                entry_stat = entry.path.stat()
+            except OSError:
+                continue
+            if not entry.is_dir:
+                lines.append(f"f\0{entry.name}\0{entry_stat.st_size}\0{entry_stat.st_mtime}\n")
+            elif (exclude_hidden and entry.name.startswith(".")) or (
+                visited is not None and not visited.first_visit(entry_stat)
+            ):
+                lines.append(f"l\0{entry.name}\0{entry_stat.st_mtime}\n")
+            else:
+                children.append((entry.name, child))
+                pending.append((entry.path, child))
+        listings.append((relative, lines, children))
+
+    hashes: Dict[str, str] = {}
+    for relative, lines, children in reversed(listings):
+        digest = hashlib.blake2b(digest_size=16)
+        for line in lines:
+            digest.update(line.encode("utf-8", errors="surrogatepass"))
+        for name, child in children:
+            digest.update(f"d\0{name}\0{hashes[child]}\n".encode("utf-8", errors="surrogatepass"))
+        hashes[relative] = digest.hexdigest()
+    return hashes
+
+
+def changed_directories(previous: Dict[str, str], current: Dict[str, str]) -> Set[str]:
+    """Find the directories whose hash changed, comparing top-down from the root.
+
+    Subtrees whose hash is unchanged are not compared further.
+
+    Args:
+        previous (Dict[str, str]): Hashes from the previous snapshot.
+        current (Dict[str, str]): Hashes of the project now.
+
+    Returns:
+        Set[str]: Relative paths of the changed, added or removed directories.
+    """
+    children: Dict[str, List[str]] = {}
+    for relative in set(previous) | set(current):
+        if relative != ROOT:
+            parent = relative.rpartition("/")[0] or ROOT
+            children.setdefault(parent, []).append(relative)
+    changed = set()
+    pending = [ROOT]
+    while pending:
+        relative = pending.pop()
+        if previous.get(relative) == current.get(relative):
+            continue
+        changed.add(relative)
+        pending.extend(children.get(relative, ()))
+    return changed
+
+
+class ReportSnapshot:
+    """The stored result of the previous run for one project and set of options.
+
+    Snapshots are kept in Copcon's cache directory, keyed by the project path and every
+    option that affects the report, so different option sets do not overwrite each other.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        options: Dict[str, Any],
+        exclude_hidden: bool = True,
+        follow_symlinks: bool = False,
+        cache_dir: Optional[Path] = None,
+        file_filter: Optional[FileFilter] = None,
+    ):
+        """
+        Initialize the ReportSnapshot and load the previous snapshot, if any.
+
+        Args:
+            directory (Path): The project directory.
+            options (Dict[str, Any]): JSON-serializable options that affect the report.
+            exclude_hidden (bool): Whether hidden files are excluded from the report.
+            follow_symlinks (bool): Whether symbolic links are followed.
+            cache_dir (Path, optional): Cache root. Defaults to Copcon's cache directory.
+            file_filter (FileFilter, optional): The filter of the report. Changes below
+                ignored directories then do not count as changes of the project.
+        """
+        self.directory = directory
+        self.file_filter = file_filter
+        self.exclude_hidden = exclude_hidden
+        self.follow_symlinks = follow_symlinks
+        fingerprint = json.dumps(
+            {"version": SNAPSHOT_VERSION, "directory": str(directory.resolve()), "options": options},
+            sort_keys=True,
+            default=str,
+        )
+        self.key = content_hash(fingerprint)
+        self._snapshots = ContentCache("snapshots", cache_dir)
+        self._contents = ContentCache("snapshot-contents", cache_dir)
+        self.previous = self._load()
+        self.hashes: Dict[str, str] = {}
+        # Per-file [size, mtime, token_count, tokens_before_minification] of the current run
+        self.files: Dict[str, List[Any]] = {}
+        self._reused: Set[str] = set()
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        stored = self._snapshots.get(self.key)
+        if stored is None:
+            return None
+        try:
+            return json.loads(stored)
+        except ValueError:
+            logger.debug(f"Ignoring unreadable snapshot {self.key}")
+            return None
+
+    def _content_key(self, relative_path: str, size: int, mtime: float) -> str:
+        return content_hash(f"{self.key}\0{relative_path}\0{size}\0{mtime}")
+
+    def unchanged_report(self) -> Optional[Dict[str, Any]]:
+        """Hash the project and return the previous snapshot if nothing has changed.
+
+        Returns:
+            Optional[Dict[str, Any]]: The previous snapshot, including its `report`, or None
+            if there is none or the project has changed.
+        """
+        self.hashes = directory_hashes(
+            self.directory, self.exclude_hidden, self.follow_symlinks, self.file_filter
+        )
+        if self.previous is None:
+            return None
+        changed = changed_directories(self.previous.get("hashes", {}), self.hashes)
+        if changed:
+            logger.info(f"{len(changed)} directories changed since the last snapshot")
+            return None
+        return self.previous
+
+    def lookup(self, record: FileRecord) -> Optional[Tuple[str, int, Optional[int]]]:
+        """Return the processed content of an unchanged file from the previous run.
+
+        Args:
+            record (FileRecord): The record about to be processed.
+
+        Returns:
+            Optional[Tuple[str, int, Optional[int]]]: The content, its token count and its
+            token count before minification, or None if the file must be processed.
+        """
+        if self.previous is None:
+            return None
+        entry = self.previous["files"].get(record.relative_path)
+        if entry is None or entry[0] != record.size or entry[1] != record.mtime:
+            return None
+        content = self._contents.get(self._content_key(record.relative_path, record.size, record.mtime))
+        if content is None:
+            return None
+        self._reused.add(record.relative_path)
+        return content, entry[2], entry[3]
+
+    def store(self, record: FileRecord, content: str, tokens_before: Optional[int] = None):
+        """Remember a processed file for the next run.
+
+        Args:
+            record (FileRecord): The processed record, with its `token_count` set.
+            content (str): The processed content.
+            tokens_before (int, optional): The token count before minification.
+        """
+        self.files[record.relative_path] = [record.size, record.mtime, record.token_count, tokens_before]
+        if record.relative_path not in self._reused:
+            self._contents.set(self._content_key(record.relative_path, record.size, record.mtime), content)
+
+    @property
+    def reused_count(self) -> int:
+        """Number of files whose processed content was reused."""
+        return len(self._reused)
+
+    def save(
+        self,
+        report: str,
+        token_stats: TokenStats,
+        directory_count: int,
+        file_count: int,
+        minification_tokens: Optional[Tuple[int, int]] = None,
+    ):
+        """Store the current run as the snapshot for the next one.
+
+        Processed contents stored for the previous snapshot are deleted unless the file is
+        unchanged, so the cache holds one processed copy of the project.
+
+        Args:
+            report (str): The complete report.
+            token_stats (TokenStats): The token stats of the report.
+            directory_count (int): Number of directories in the tree.
+            file_count (int): Number of files in the tree.
+            minification_tokens (Tuple[int, int], optional): Tokens before and after minification.
+        """
+        # Processed contents the new snapshot no longer refers to would otherwise pile up
+        if self.previous is not None:
+            for relative_path, (size, mtime, *_) in self.previous["files"].items():
+                if self.files.get(relative_path, [None, None])[:2] != [size, mtime]:
+                    self._contents.delete(self._content_key(relative_path, size, mtime))
+        if not self.hashes:
+            self.hashes = directory_hashes(
+                self.directory, self.exclude_hidden, self.follow_symlinks, self.file_filter
+            )
+        self._snapshots.set(self.key, json.dumps({
+            "hashes": self.hashes,
+            "files": self.files,
+            "report": report,
+            "file_tokens": token_stats.file_tokens,
+            "extra_sources": token_stats.extra_sources,
+            "directory_count": directory_count,
+            "file_count": file_count,
+            "minification_tokens": minification_tokens,
+        }))
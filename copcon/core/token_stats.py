@@ -0,0 +1,128 @@
+"""Token Attribution for Copcon.
+
+This module aggregates the per-file token counts gathered while building a report into
+rollups by extension and directory, a list of the most expensive files, and a JSON export
+that external tooling can use to track context cost over time.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from copcon.core.file_record import FileRecord
+from copcon.utils.logger import logger
+
+
+def extension_label(relative_path: str) -> str:
+    """Return the label used to group a file by extension, e.g. `*.py`."""
+    file_name = PurePosixPath(relative_path).name
+    if "." in file_name:
+        idx = file_name.rindex(".")
+        return f"*{file_name[idx:]}"  # use wildcard to indicate all such files
+    return "(no extension)"
+
+
+class TokenStats:
+    """Per-file token counts plus non-file content sources such as a git diff."""
+
+    def __init__(self, file_tokens: Dict[str, int], extra_sources: Optional[Dict[str, int]] = None):
+        """
+        Initialize the TokenStats.
+
+        Args:
+            file_tokens (Dict[str, int]): Token counts keyed by relative file path.
+            extra_sources (Dict[str, int], optional): Token counts of other report sections,
+                keyed by a label such as `git diff`.
+        """
+        self.file_tokens = file_tokens
+        self.extra_sources = dict(extra_sources or {})
+
+    @classmethod
+    def from_records(cls, records: Iterable[FileRecord]) -> "TokenStats":
+        """Build stats from records whose tokens have been counted.
+
+        Args:
+            records (Iterable[FileRecord]): The processed records. Records without a token
+                count (e.g. unreadable files) are skipped.
+
+        Returns:
+            TokenStats: The aggregated stats.
+        """
+        return cls({
+            Path(record.relative_path).as_posix(): record.token_count
+            for record in records
+            if record.token_count is not None
+        })
+
+    def add_source(self, label: str, tokens: int):
+        """Add tokens from a non-file report section."""
+        self.extra_sources[label] = self.extra_sources.get(label, 0) + tokens
+
+    @property
+    def total(self) -> int:
+        """Total tokens across files and extra sources."""
+        return sum(self.file_tokens.values()) + sum(self.extra_sources.values())
+
+    def by_extension(self) -> Dict[str, int]:
+        """Token counts grouped by file extension, plus extra sources."""
+        extension_tokens: Dict[str, int] = {}
+        for relative_path, tokens in self.file_tokens.items():
+            extension = extension_label(relative_path)
+            extension_tokens[extension] = extension_tokens.get(extension, 0) + tokens
+        for label, tokens in self.extra_sources.items():
+            extension_tokens[label] = extension_tokens.get(label, 0) + tokens
+        return extension_tokens
+
+    def by_directory(self, depth: int = 1) -> Dict[str, int]:
+        """Token counts rolled up to directories at a given depth.
+
+        Args:
+            depth (int): Number of leading path components to group by. Files shallower than
+                this are attributed to their own parent directory; root files go to `.`.
+
+        Returns:
+            Dict[str, int]: Token counts keyed by directory path (with a trailing slash).
+        """
+        directory_tokens: Dict[str, int] = {}
+        for relative_path, tokens in self.file_tokens.items():
+            parts = PurePosixPath(relative_path).parts[:-1][:max(depth, 0)]
+            directory = "/".join(parts) + "/" if parts else "."
+            directory_tokens[directory] = directory_tokens.get(directory, 0) + tokens
+        return directory_tokens
+
+    def top_files(self, n: int) -> List[Tuple[str, int]]:
+        """The `n` files with the most tokens, most expensive first."""
+        return sorted(self.file_tokens.items(), key=lambda kv: (-kv[1], kv[0]))[:max(n, 0)]
+
+    def to_dict(self, top_n: int = 5, depth: int = 1) -> Dict[str, Any]:
+        """Serialize the stats into a JSON-compatible dictionary."""
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "total_tokens": self.total,
+            "file_count": len(self.file_tokens),
+            "by_extension": self.by_extension(),
+            "directory_depth": depth,
+            "by_directory": self.by_directory(depth),
+            "top_files": [{"path": path, "tokens": tokens} for path, tokens in self.top_files(top_n)],
+            "extra_sources": self.extra_sources,
+            "files": self.file_tokens,
+        }
+
+    def write_json(self, output_file: Path, top_n: int = 5, depth: int = 1):
+        """Write the stats to a JSON file.
+
+        Args:
+            output_file (Path): Destination of the JSON export.
+            top_n (int): Number of files to list under `top_files`.
+            depth (int): Directory depth of the `by_directory` rollup.
+
+        Raises:
+            Exception: If there is an error writing to the file.
+        """
+        try:
+            with output_file.open("w", encoding="utf-8") as f:
+                json.dump(self.to_dict(top_n=top_n, depth=depth), f, indent=2)
+            logger.info(f"Token stats written to {output_file}")
+        except Exception as e:
+            logger.error(f"Error writing token stats to {output_file}: {e}")
+            raise
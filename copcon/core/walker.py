@@ -0,0 +1,252 @@
+"""Directory Walking for Copcon.
+
+This module lists directories under an explicit symlink policy shared by the tree generator
+and the file reader. By default symbolic links to files are included like regular files and
+symbolic links to directories are skipped, so link cycles cannot occur. When links are
+followed, every directory is identified by its (device, inode) pair, so link cycles are
+never entered and a directory reachable through several links is walked once, keeping the
+walk linear in the number of real files.
+
+On filesystems where every directory listing and `stat` call has high latency, such as
+network or overlay mounts, a `ParallelScanner` lists directories ahead of the walk with a
+pool of threads. The walk itself, and so the order of its results, stays the same.
+"""
+
+import os
+import stat
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+class TreeEntry(NamedTuple):
+    """A directory entry with its type resolved once at scan time."""
+
+    name: str
+    path: Path
+    is_dir: bool
+
+
+def scan_directory(directory: Path, follow_symlinks: bool = False) -> List[TreeEntry]:
+    """List a directory's files and subdirectories in tree order.
+
+    Entry types come from `os.scandir`, which usually knows them without an extra `stat`
+    call. Directories are listed first, then files, each group sorted case-insensitively.
+    Entries that are neither files nor directories (e.g. broken symlinks) are skipped.
+
+    Args:
+        directory (Path): The directory to scan.
+        follow_symlinks (bool): Whether symbolic links to directories are listed as their
+            targets. If False, they are skipped; symbolic links to files are always listed.
+
+    Returns:
+        List[TreeEntry]: The sorted entries.
+
+    Raises:
+        OSError: If the directory cannot be listed.
+    """
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    if not follow_symlinks and entry.is_symlink():
+                        continue
+                    entries.append(TreeEntry(entry.name, Path(entry.path), True))
+                elif entry.is_file():
+                    entries.append(TreeEntry(entry.name, Path(entry.path), False))
+            except OSError:
+                continue
+    entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
+    return entries
+
+
+class VisitedSet:
+    """Remembers the physical files and directories already seen during a walk."""
+
+    def __init__(self):
+        self._seen: Set[Tuple[int, int]] = set()
+
+    def first_visit(self, file_stat: os.stat_result) -> bool:
+        """Record an entry by its (device, inode) pair.
+
+        Args:
+            file_stat (os.stat_result): The entry's stat result, with links followed.
+
+        Returns:
+            bool: True if the entry had not been seen before.
+        """
+        key = (file_stat.st_dev, file_stat.st_ino)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def first_visit_path(self, path: Path) -> bool:
+        """Like `first_visit`, but stats the path first. Unreadable paths count as seen."""
+        try:
+            return self.first_visit(path.stat())
+        except OSError:
+            return False
+
+
+class ParallelScanner:
+    """Lists directories concurrently, ahead of a walk that consumes them in order.
+
+    Scanning a directory queues each of its subdirectories that is not pruned, so idle
+    threads pick up work from anywhere in the tree. Listings are handed out by `scan` in
+    whatever order the walk asks for them; a directory that was not scanned ahead is listed
+    on the spot. Prefetched listings are kept until the walk asks for them.
+    """
+
+    def __init__(
+        self,
+        follow_symlinks: bool = False,
+        workers: int = 8,
+        prune: Optional[Callable[[Path], bool]] = None,
+        stat_files: bool = False,
+    ):
+        """
+        Initialize the ParallelScanner. Call `start` to begin scanning.
+
+        Args:
+            follow_symlinks (bool): Whether symbolic links are listed as their targets, as
+                in `scan_directory`. Each physical directory is scanned at most once.
+            workers (int): Number of scanning threads.
+            prune (Callable[[Path], bool], optional): Called for each subdirectory before it
+                is queued; returning True leaves it and everything below it unscanned.
+            stat_files (bool): Whether to also `stat` the files of each directory ahead of
+                time, for walks that need their sizes.
+        """
+        self.follow_symlinks = follow_symlinks
+        self.prune = prune
+        self.stat_files = stat_files
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="copcon-scan")
+        self._futures: Dict[Path, Future] = {}
+        self._stats: Dict[Path, os.stat_result] = {}
+        self._visited = VisitedSet() if follow_symlinks else None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self, root: Path):
+        """Begin scanning below a directory."""
+        self._submit(root)
+
+    def _submit(self, directory: Path):
+        directory_stat = None
+        if self._visited is not None:
+            try:
+                directory_stat = directory.stat()
+            except OSError:
+                return
+        with self._lock:
+            if self._closed or directory in self._futures:
+                return
+            if directory_stat is not None and not self._visited.first_visit(directory_stat):
+                return
+            self._futures[directory] = self._executor.submit(self._scan, directory)
+
+    def _scan(self, directory: Path) -> Tuple[List[TreeEntry], Dict[Path, os.stat_result]]:
+        entries = scan_directory(directory, self.follow_symlinks)
+        # Subdirectories are queued first so other threads can start on them.
+        for entry in entries:
+            if entry.is_dir and (self.prune is None or not self.prune(entry.path)):
+                self._submit(entry.path)
+        stats = {}
+        if self.stat_files:
+            for entry in entries:
+                if not entry.is_dir:
+                    try:
+                        stats[entry.path] = entry.path.stat()
+                    except OSError:
+                        continue
+        return entries, stats
+
+    def scan(self, directory: Path) -> List[TreeEntry]:
+        """List a directory like `scan_directory`, using the prefetched listing if there is one.
+
+        Args:
+            directory (Path): The directory to list.
+
+        Returns:
+            List[TreeEntry]: The sorted entries.
+
+        Raises:
+            OSError: If the directory cannot be listed.
+        """
+        with self._lock:
+            future = self._futures.pop(directory, None)
+        if future is None:
+            return scan_directory(directory, self.follow_symlinks)
+        entries, stats = future.result()
+        self._stats.update(stats)
+        return entries
+
+    def stat(self, path: Path) -> os.stat_result:
+        """Stat a file listed by `scan`, using the prefetched result if there is one."""
+        file_stat = self._stats.pop(path, None)
+        return file_stat if file_stat is not None else path.stat()
+
+    def close(self):
+        """Stop scanning and discard pending work."""
+        with self._lock:
+            self._closed = True
+            self._futures.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def walk_files(
+    base_directory: Path,
+    follow_symlinks: bool = False,
+    prune: Optional[Callable[[Path], bool]] = None,
+    scanner: Optional[ParallelScanner] = None,
+) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Yield every regular file below a directory, in tree order.
+
+    The walk is iterative. When symbolic links are followed, each physical directory is
+    entered at most once, so link cycles terminate.
+
+    Args:
+        base_directory (Path): The directory to walk.
+        follow_symlinks (bool): Whether to follow symbolic links to files and directories.
+        prune (Callable[[Path], bool], optional): Called for each subdirectory; returning True
+            skips the directory and everything below it.
+        scanner (ParallelScanner, optional): Lists directories and stats files ahead of the
+            walk. It should have been started on `base_directory` with the same pruning.
+
+    Yields:
+        Tuple[Path, os.stat_result]: Each file's path and its stat result.
+    """
+    visited = VisitedSet() if follow_symlinks else None
+    if visited is not None and not visited.first_visit_path(base_directory):
+        return
+    if scanner is not None:
+        scan, stat_file = scanner.scan, scanner.stat
+    else:
+        scan, stat_file = (lambda directory: scan_directory(directory, follow_symlinks)), Path.stat
+    try:
+        stack = [iter(scan(base_directory))]
+    except OSError:
+        return
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        if entry.is_dir:
+            if prune is not None and prune(entry.path):
+                continue
+            if visited is not None and not visited.first_visit_path(entry.path):
+                continue
+            try:
+                stack.append(iter(scan(entry.path)))
+            except OSError:
+                continue
+            continue
+        try:
+            file_stat = stat_file(entry.path)
+        except OSError:
+            continue
+        if stat.S_ISREG(file_stat.st_mode):
+            yield entry.path, file_stat
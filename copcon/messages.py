@@ -5,7 +5,42 @@ This module provides functionality to build user-facing messages,
 particularly the final success message shown at the end of Copcon's run.
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+# Maximum number of generated files listed by name in the success message.
+GENERATED_FILES_LISTED = 10
+
+def _format_token_table(title: str, rows: List[Tuple[str, int]], total_tokens: int) -> str:
+    """
+    Format rows of (label, tokens) as a token distribution table.
+    """
+    sum_tokens = total_tokens or 1
+    width = max([18] + [len(label) + 1 for label, _ in rows])
+    rule = "-" * (width + 25)
+    lines = [
+        f"{title:<{width}}| Tokens  |  Token Distribution",
+        rule,
+    ]
+    for label, token_count in rows:
+        fraction = (token_count / sum_tokens) * 100
+        lines.append(f"{label:<{width}}| {token_count:>6}  | {fraction:5.1f}%")
+    lines.append(rule)
+    lines.append(f"{'Total':<{width}}| {sum_tokens:>6}  | 100.0%")
+    return "\n".join(lines)
+
+def get_attribution_message(
+    top_files: List[Tuple[str, int]],
+    directory_token_map: Dict[str, int],
+    total_tokens: int,
+) -> str:
+    """
+    Generate tables attributing token spend to the most expensive files and directories.
+    """
+    sorted_dirs = sorted(directory_token_map.items(), key=lambda kv: kv[1], reverse=True)
+    return (
+        f"{_format_token_table(f'Top {len(top_files)} Files', top_files, total_tokens)}\n\n"
+        f"{_format_token_table('Directory', sorted_dirs, total_tokens)}\n"
+    )
 
 def get_success_message(
     directory_count: int,
@@ -15,6 +50,14 @@ def get_success_message(
     output_file: Optional[str],
     copconignore_path: Optional[str] = None,
     copcontarget_path: Optional[str] = None,
+    minification_tokens: Optional[Tuple[int, int]] = None,
+    top_files: Optional[List[Tuple[str, int]]] = None,
+    directory_token_map: Optional[Dict[str, int]] = None,
+    truncation_reason: Optional[str] = None,
+    generated_files: Optional[Dict[str, str]] = None,
+    dry_run: bool = False,
+    framing_tokens: Optional[Tuple[int, int]] = None,
+    contents_searched: bool = False,
 ) -> str:
     """
     Generate the final success message for Copcon.
@@ -25,35 +68,68 @@ def get_success_message(
     formatted_total_tokens = f"{total_tokens:,}"
 
     # 2) Build content source distribution table
-    sum_tokens = sum(extension_token_map.values()) or 1
-    lines = [
-        "Content Source    | Tokens  |  Token Distribution",
-        "-------------------------------------------",
-    ]
     sorted_exts = sorted(extension_token_map.items(), key=lambda kv: kv[1], reverse=True)
-    for source, token_count in sorted_exts:
-        fraction = (token_count / sum_tokens) * 100
-        lines.append(f"{source:<18}| {token_count:>6}  | {fraction:5.1f}%")
-    lines.append("-------------------------------------------")
-    lines.append(f"Total             | {sum_tokens:>6}  | 100.0%")
-
-    extension_table = "\n".join(lines)
+    extension_table = _format_token_table("Content Source", sorted_exts, sum(extension_token_map.values()))
 
     # 3) Assemble the success message
+    if dry_run:
+        heading = "🔎 Dry run! Copcon would process:"
+        formatted_total_tokens = f"~{formatted_total_tokens} tokens (estimated)"
+    else:
+        heading = "🎉 Success! Copcon has processed:"
+        formatted_total_tokens = f"{formatted_total_tokens} tokens"
     base_msg = (
-        "🎉 Success! Copcon has processed:\n\n"
+        f"{heading}\n\n"
         f"📁 {formatted_directory_count} directories\n"
         f"📄 {formatted_file_count} files\n"
-        f"🔢 {formatted_total_tokens} tokens\n\n"
+        f"🔢 {formatted_total_tokens}\n\n"
         f"{extension_table}\n\n"
     )
 
+    if truncation_reason:
+        base_msg += f"⚠️  Report truncated ({truncation_reason}); only part of the project is included.\n"
+
+    if top_files is not None and directory_token_map is not None:
+        base_msg += get_attribution_message(top_files, directory_token_map, total_tokens) + "\n"
+
+    if minification_tokens:
+        tokens_before, tokens_after = minification_tokens
+        saved = tokens_before - tokens_after
+        saved_pct = (saved / tokens_before * 100) if tokens_before else 0.0
+        base_msg += (
+            f"✂️  Minification: {tokens_before:,} → {tokens_after:,} tokens "
+            f"(saved {saved:,}, {saved_pct:.1f}%)\n"
+        )
+
+    if framing_tokens:
+        # total_tokens includes the compact framing; the standard report has its own instead
+        standard_framing, compact_framing = framing_tokens
+        saved = standard_framing - compact_framing
+        standard_tokens = total_tokens - compact_framing + standard_framing
+        saved_pct = saved / standard_tokens * 100 if standard_tokens else 0.0
+        base_msg += (
+            f"🪶 Compact dialect: framing {standard_framing:,} → {compact_framing:,} tokens "
+            f"(saved {saved:,}, {saved_pct:.1f}% of the standard report)\n"
+        )
+
+    if generated_files:
+        base_msg += f"🧹 Replaced {len(generated_files):,} generated files with placeholders:\n"
+        listed = sorted(generated_files.items())
+        for path, reason in listed[:GENERATED_FILES_LISTED]:
+            base_msg += f"   - {path} ({reason})\n"
+        if len(listed) > GENERATED_FILES_LISTED:
+            base_msg += f"   ... and {len(listed) - GENERATED_FILES_LISTED:,} more\n"
+
     if copcontarget_path:
         base_msg += f"Using `.copcontarget` from: {copcontarget_path}\n"
     if copconignore_path:
         base_msg += f"Using `.copconignore` from: {copconignore_path}\n"
 
-    if output_file:
+    if dry_run and contents_searched:
+        base_msg += "\nOnly file contents searched by --grep were read; no report was produced.\n"
+    elif dry_run:
+        base_msg += "\nNo files were read and no report was produced.\n"
+    elif output_file:
         base_msg += f"\nThe report has been written to `{output_file}` 🚀\n"
     else:
         base_msg += "\nThe report has been copied to your clipboard 🚀\n"
@@ -2,6 +2,15 @@ import pytest
 from pathlib import Path
 import tempfile
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """
+    Points Copcon's on-disk caches at a per-test temporary directory.
+    """
+    cache_dir = tmp_path_factory.mktemp("copcon_cache")
+    monkeypatch.setenv("COPCON_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
 @pytest.fixture
 def temp_dir():
     """
@@ -42,3 +51,36 @@ def additional_ignore_file(temp_dir):
     ignore_path = temp_dir / "custom_ignore"
     ignore_path.write_text(ignore_content.strip())
     return ignore_path
+
+class WhitespaceEncoder:
+    """
+    A stand-in tokenizer that counts whitespace-separated words.
+    """
+
+    def encode(self, text):
+        return text.split()
+
+@pytest.fixture
+def whitespace_encoder():
+    """
+    Provides a tokenizer whose counts are easy to predict and that needs no tiktoken download.
+    """
+    return WhitespaceEncoder()
+
+@pytest.fixture
+def make_project(tmp_path):
+    """
+    Provides a factory writing a project from a mapping of relative paths to text or bytes.
+    The project is created in `tmp_path / "project"` unless another root is given.
+    """
+    def make(files, root=None):
+        root = root or tmp_path / "project"
+        for relative_path, content in files.items():
+            path = root / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(content, bytes):
+                path.write_bytes(content)
+            else:
+                path.write_text(content)
+        return root
+    return make
@@ -0,0 +1,43 @@
+import io
+import copcon
+from copcon.api import ContextResult
+
+FILES = {
+    "src/app.py": "print('hello world')  # greet\n",
+    "README.md": "Project readme text",
+    "debug.log": "ignored by the internal .copconignore",
+}
+
+def test_build_context_is_lazy(make_project, whitespace_encoder):
+    project = make_project(FILES)
+    context = copcon.build_context(project, encoder=whitespace_encoder)
+
+    assert isinstance(context, ContextResult)
+    assert context._tree is None and context._processed is None, "Nothing is computed up front."
+    assert sorted(record.relative_path for record in context.iter_records()) == ["README.md", "src/app.py"]
+    assert "app.py" in context.tree
+
+def test_write_to_streams_the_cli_report_format(make_project, whitespace_encoder):
+    project = make_project(FILES)
+    context = copcon.build_context(project, minify=["py"], encoder=whitespace_encoder)
+
+    buffer = io.StringIO()
+    context.write_to(buffer)
+    report = buffer.getvalue()
+
+    assert report.startswith("Directory Structure:\nproject\n")
+    assert "File: src/app.py\n" in report
+    assert "print('hello world')" in report and "# greet" not in report
+    assert "debug.log\n----" not in report
+
+    stats = context.token_stats
+    assert stats.file_tokens == {"README.md": 3, "src/app.py": 2}
+    assert stats.total == len(report.split()), "The total covers the framing of the report too."
+
+def test_compact_dialect(make_project, whitespace_encoder):
+    project = make_project(FILES)
+    report = "".join(copcon.build_context(project, dialect="compact", encoder=whitespace_encoder).iter_chunks())
+
+    assert report.startswith("Directory Structure: project\nsrc/\n  app.py\nREADME.md\n\nFiles:")
+    assert "\n\n==> src/app.py <==\nprint('hello world')" in report
+    assert "----" not in report
@@ -0,0 +1,118 @@
+import io
+import json
+import tarfile
+import zipfile
+import pytest
+from pathlib import PurePosixPath
+from typer.testing import CliRunner
+from copcon.cli import app
+from copcon.core.archive import ArchiveSource, is_archive
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_tree import FileTreeGenerator
+from copcon.core.notebook import NotebookConverter
+
+MEMBERS = {
+    "src/app.py": b"print('hello')\r\n",
+    "src/util/helpers.py": b"def helper():\n    return 1\n",
+    "README.md": b"# Project\n",
+    "debug.log": b"ignored by the internal .copconignore",
+    ".env": b"SECRET=1",
+    "logo.png": b"\x89PNG\r\n\x1a\n\x00\x00",
+    "analysis.ipynb": json.dumps(
+        {"cells": [{"cell_type": "code", "source": "x = 1", "outputs": []}], "nbformat": 4}
+    ).encode(),
+}
+
+def make_zip(path, prefix=""):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(prefix + name, data)
+    return path
+
+def make_tar(path, prefix=""):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(prefix + name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+@pytest.fixture(params=["zip", "tar.gz"])
+def archive_path(request, tmp_path):
+    if request.param == "zip":
+        return make_zip(tmp_path / "project.zip", prefix="project-1.0/")
+    return make_tar(tmp_path / "project.tar.gz", prefix="project-1.0/")
+
+def test_is_archive(tmp_path):
+    assert is_archive(make_zip(tmp_path / "a.zip"))
+    assert is_archive(make_tar(tmp_path / "a.tgz"))
+    assert not is_archive(tmp_path), "Directories are not archives."
+
+def test_single_top_level_directory_becomes_the_root(archive_path):
+    source = ArchiveSource(archive_path)
+
+    assert source.root_name == "project-1.0"
+    assert sorted(member.path for member in source.iter_files()) == sorted(MEMBERS)
+    assert [entry.name for entry in source.scan_directory(PurePosixPath("src"))] == ["util", "app.py"]
+    assert source.size("README.md") == len(MEMBERS["README.md"])
+
+def test_archive_without_common_root_is_named_after_the_file(tmp_path):
+    assert ArchiveSource(make_zip(tmp_path / "project.zip")).root_name == "project"
+
+def test_tree_lists_archive_members(archive_path):
+    source = ArchiveSource(archive_path)
+    tree = FileTreeGenerator(archive_path, -1, FileFilter(), source=source).generate()
+
+    assert tree == "\n".join([
+        "├── src/",
+        "│   ├── util/",
+        "│   │   └── helpers.py",
+        "│   └── app.py",
+        "├── .env",
+        "├── analysis.ipynb",
+        "├── logo.png",
+        "└── README.md",
+    ])
+
+def test_reader_reads_members_without_extracting(archive_path):
+    source = ArchiveSource(archive_path)
+    reader = FileContentReader(
+        archive_path, FileFilter(), exclude_hidden=True, notebook_converter=NotebookConverter(), source=source
+    )
+
+    contents = reader.read_all()
+
+    assert sorted(contents) == ["README.md", "analysis.ipynb", "logo.png", "src/app.py", "src/util/helpers.py"]
+    assert contents["src/app.py"] == "print('hello')\n"
+    assert contents["logo.png"].startswith("[Binary file]")
+    assert contents["analysis.ipynb"] == "# %%\nx = 1"
+    assert list(archive_path.parent.iterdir()) == [archive_path], "Nothing is written to disk."
+
+def test_cli_reports_from_archive(tmp_path):
+    archive_path = make_tar(tmp_path / "project.tar.gz", prefix="project-1.0/")
+    output_file = tmp_path / "report.txt"
+
+    result = CliRunner().invoke(app, [str(archive_path), "--output-file", str(output_file)])
+
+    assert result.exit_code == 0, result.output
+    report = output_file.read_text(encoding="utf-8")
+    assert report.startswith("Directory Structure:\nproject-1.0\n")
+    assert "File: src/util/helpers.py\n" in report
+
+def test_build_context_closes_the_archive_on_failure(monkeypatch, archive_path):
+    import copcon.api
+    closed = []
+    monkeypatch.setattr(ArchiveSource, "close", lambda self: closed.append(self))
+
+    with pytest.raises(ValueError):
+        copcon.api.build_context(archive_path, minify=["unknown"])
+    assert closed == [], "Options are validated before the archive is opened."
+
+    def failing_tree(*args, **kwargs):
+        raise RuntimeError("tree")
+
+    monkeypatch.setattr(copcon.api, "FileTreeGenerator", failing_tree)
+    with pytest.raises(RuntimeError):
+        copcon.api.build_context(archive_path)
+    assert len(closed) == 1
@@ -0,0 +1,53 @@
+import os
+from copcon.core.change_tracker import ChangeTracker, format_tree_delta
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+
+def current_records(project):
+    reader = FileContentReader(project, FileFilter(), exclude_hidden=True)
+    records = list(reader.iter_records())
+    for record in records:
+        record.content  # loading sets the content hash
+        record.release()
+    return records
+
+def test_first_run_has_no_previous_state(tmp_path):
+    assert ChangeTracker(tmp_path / "project", cache_dir=tmp_path / "cache").previous is None
+
+def test_changes_since_last_run(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    cache_dir = tmp_path / "cache"
+    for name in ("kept.py", "touched.py", "edited.py", "removed.py"):
+        (project / name).write_text(f"# {name}")
+    ChangeTracker(project, cache_dir).save(current_records(project))
+
+    os.utime(project / "touched.py", (1_000_000, 1_000_000))
+    (project / "edited.py").write_text("# edited.py, now longer")
+    (project / "removed.py").unlink()
+    (project / "added.py").write_text("# added.py")
+
+    tracker = ChangeTracker(project, cache_dir)
+    reader = FileContentReader(project, FileFilter(), exclude_hidden=True)
+    change_set = tracker.changes(reader.iter_records())
+
+    assert [record.relative_path for record in change_set.added] == ["added.py"]
+    assert [record.relative_path for record in change_set.modified] == ["edited.py"]
+    assert change_set.deleted == ["removed.py"]
+    assert format_tree_delta(change_set) == "+ added.py\n~ edited.py\n- removed.py"
+
+def test_unchanged_files_are_not_read(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.py").write_text("a = 1")
+    ChangeTracker(project, tmp_path / "cache").save(current_records(project))
+
+    reader = FileContentReader(project, FileFilter(), exclude_hidden=True)
+    records = list(reader.iter_records())
+    for record in records:
+        record._loader = None  # any read would fail
+
+    change_set = ChangeTracker(project, tmp_path / "cache").changes(records)
+
+    assert change_set == ([], [], [])
+    assert records[0].content_hash is not None, "The stored hash carries over to the next save."
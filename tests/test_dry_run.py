@@ -0,0 +1,69 @@
+from typer.testing import CliRunner
+from copcon.cli import app
+from copcon.core.dry_run import TokenCountCache, estimate_tokens, format_plan
+from copcon.core.file_classifier import FileClassifier
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.messages import get_success_message
+
+FILES = {
+    "src/app.py": "print('hello world')\n" * 10,
+    "logo.png": b"\x89PNG" + b"\x00" * 4000,
+}
+
+def walk(root):
+    return list(FileContentReader(root, FileFilter(), exclude_hidden=True).iter_records())
+
+def test_estimates_from_sizes_without_reading(tmp_path, monkeypatch, make_project):
+    root = make_project(FILES)
+    records = walk(root)
+
+    def no_reads(record):
+        raise AssertionError("A dry run reads no file.")
+
+    monkeypatch.setattr("copcon.core.file_record.FileRecord.content", property(no_reads))
+
+    estimates = estimate_tokens(records, FileClassifier(), TokenCountCache(root, tmp_path / "cache"))
+
+    assert estimates == {"logo.png": 7, "src/app.py": 52}
+    assert format_plan(records, estimates).splitlines() == [
+        "   3.9 KB        ~7 tokens  logo.png",
+        "    210 B       ~52 tokens  src/",
+        "    210 B       ~52 tokens  src/app.py",
+    ]
+
+def test_cached_counts_are_used_for_unchanged_files(tmp_path, make_project):
+    root = make_project(FILES)
+    records = walk(root)
+    records[0].token_count = 7
+    TokenCountCache(root, tmp_path / "cache").save(records[:1])
+
+    estimates = estimate_tokens(walk(root), FileClassifier(), TokenCountCache(root, tmp_path / "cache"))
+
+    assert estimates[records[0].relative_path] == 7
+
+def test_counts_are_kept_per_content_options(tmp_path, make_project):
+    root = make_project(FILES)
+    records = walk(root)
+    records[0].token_count = 7
+    TokenCountCache(root, tmp_path / "cache", options={"minify": ["py"]}).save(records[:1])
+
+    assert TokenCountCache(root, tmp_path / "cache", options={"minify": ["py"]}).get(records[0]) == 7
+    assert TokenCountCache(root, tmp_path / "cache").get(records[0]) is None
+
+def test_dry_run_summary_message():
+    message = get_success_message(2, 3, 1234, {"*.py": 1234}, None, dry_run=True)
+    assert message.startswith("🔎 Dry run! Copcon would process:")
+    assert "🔢 ~1,234 tokens (estimated)" in message
+    assert "No files were read and no report was produced." in message
+    assert "clipboard" not in message
+
+def test_cli_dry_run_writes_nothing(tmp_path, make_project):
+    root = make_project(FILES)
+    output_file = tmp_path / "report.txt"
+
+    result = CliRunner().invoke(app, [str(root), "--dry-run", "--output-file", str(output_file)])
+
+    assert result.exit_code == 0, result.output
+    assert "src/app.py" in result.output and "Dry run!" in result.output
+    assert not output_file.exists()
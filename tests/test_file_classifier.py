@@ -0,0 +1,32 @@
+import codecs
+from copcon.core.file_classifier import FileClassifier, detect_text_encoding
+
+def test_classify_name_uses_extension_tables():
+    classifier = FileClassifier()
+    assert classifier.classify_name("src/app.py") is False
+    assert classifier.classify_name("assets/logo.PNG") is True
+    assert classifier.classify_name("Makefile") is False
+    assert classifier.classify_name(".gitignore") is False
+    assert classifier.classify_name("data.unknownext") is None
+
+def test_user_extensions_extend_and_override_tables():
+    classifier = FileClassifier(text_extensions=["unknownext", ".svg"], binary_extensions=[".txt"])
+    assert classifier.classify_name("data.unknownext") is False
+    assert classifier.classify_name("notes.txt") is True
+
+def test_sniff_detects_binary_and_text():
+    classifier = FileClassifier()
+    assert classifier.sniff(b"\x7fELF\x02\x01\x01\x00\x00\x00").is_binary
+    assert classifier.sniff(b"plain text").encoding == "utf-8"
+
+def test_sniff_recognizes_utf16_instead_of_binary():
+    classifier = FileClassifier()
+    with_bom = classifier.sniff("hello".encode("utf-16"))
+    assert not with_bom.is_binary and with_bom.encoding == "utf-16"
+    without_bom = classifier.sniff("hello world".encode("utf-16-be"))
+    assert not without_bom.is_binary and without_bom.encoding == "utf-16-be"
+
+def test_detect_text_encoding_boms():
+    assert detect_text_encoding(codecs.BOM_UTF8 + b"x") == "utf-8-sig"
+    assert detect_text_encoding(codecs.BOM_UTF32_LE + b"x\0\0\0") == "utf-32"
+    assert detect_text_encoding(b"no bom") is None
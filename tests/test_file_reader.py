@@ -86,3 +86,23 @@ def test_file_content_reader_error_handling(temp_dir):
     
     # Restore permissions for cleanup
     restricted_file.chmod(0o644)
+
+def test_file_content_reader_decodes_utf16_text(temp_dir):
+    file_filter = FileFilter(user_ignore_path=None)
+
+    # Unknown extension with a BOM, and a known text extension without one.
+    (temp_dir / "notes.custom").write_bytes("héllo\r\nworld".encode("utf-16"))
+    (temp_dir / "readme.txt").write_bytes("plain utf-16".encode("utf-16-le"))
+
+    reader = FileContentReader(base_directory=temp_dir, file_filter=file_filter, exclude_hidden=True)
+    contents = reader.read_all()
+
+    assert contents["notes.custom"] == "héllo\nworld"
+    assert contents["readme.txt"] == "plain utf-16"
+
+def test_file_content_reader_sniffs_unknown_binary(temp_dir):
+    file_filter = FileFilter(user_ignore_path=None)
+    (temp_dir / "blob.unknownext").write_bytes(b"\x01\x02\x00\x00\xff\xfe\x00\x10" * 4)
+
+    reader = FileContentReader(base_directory=temp_dir, file_filter=file_filter, exclude_hidden=True)
+    assert reader.read_all()["blob.unknownext"] == "[Binary file] Size: 32 bytes"
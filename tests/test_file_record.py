@@ -0,0 +1,43 @@
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_record import FileRecord
+
+def test_file_record_loads_content_on_demand():
+    calls = []
+
+    def loader(record):
+        calls.append(record.relative_path)
+        return "print('hi')"
+
+    record = FileRecord("a.py", size=11, mtime=0.0, loader=loader)
+    assert not record.is_loaded
+    assert calls == []
+
+    assert record.content == "print('hi')"
+    assert record.content == "print('hi')"
+    assert calls == ["a.py"], "Content should be loaded once and kept until released."
+    assert record.content_hash is not None
+
+    record.release()
+    assert not record.is_loaded
+    assert record.content == "print('hi')"
+    assert calls == ["a.py", "a.py"]
+
+def test_file_record_uses_slots():
+    record = FileRecord("a.py", size=0, mtime=0.0, loader=lambda r: "")
+    assert not hasattr(record, "__dict__")
+
+def test_reader_iter_records_does_not_read_content(temp_dir):
+    (temp_dir / "a.py").write_text("print('a')")
+    (temp_dir / "image.png").write_bytes(b"\x89PNG\x00\x00")
+
+    reader = FileContentReader(temp_dir, FileFilter(), exclude_hidden=True)
+    records = {record.relative_path: record for record in reader.iter_records()}
+
+    assert set(records) == {"a.py", "image.png"}
+    assert all(not record.is_loaded for record in records.values())
+    assert records["a.py"].size == len("print('a')")
+    assert records["image.png"].is_binary is True, "Known binary extensions are classified without I/O."
+
+    assert records["image.png"].content == "[Binary file] Size: 6 bytes"
+    assert records["image.png"].is_binary is True
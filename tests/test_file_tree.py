@@ -159,4 +159,75 @@ def test_ignored_directory_tree_display(tmp_path: Path):
     # In this structure: root, src, node_modules -> 3 directories.
     assert generator.directory_count == 3, f"Expected 3 directories, got {generator.directory_count}"
     # Files in src only:
-    assert generator.file_count == 2, f"Expected 2 files, got {generator.file_count}"
\ No newline at end of file
+    assert generator.file_count == 2, f"Expected 2 files, got {generator.file_count}"
+
+def test_deeply_nested_tree_does_not_hit_recursion_limit(tmp_path: Path):
+    """
+    Test that tree generation is iterative and handles nesting deeper than the recursion limit.
+    """
+    import sys
+
+    levels = sys.getrecursionlimit() + 50
+    current = tmp_path
+    for _ in range(levels):
+        current = current / "d"
+        current.mkdir()
+
+    try:
+        generator = FileTreeGenerator(tmp_path, depth=-1, file_filter=FileFilter())
+        tree = generator.generate()
+
+        assert generator.directory_count == levels + 1
+        assert len(tree.splitlines()) == levels
+    finally:
+        # shutil.rmtree is itself recursive, so remove the chain bottom-up.
+        while current != tmp_path:
+            current.rmdir()
+            current = current.parent
+
+
+def test_large_directory_is_collapsed(tmp_path: Path):
+    """
+    Test that directories with more entries than the threshold are summarized on one line.
+    """
+    big = tmp_path / "big"
+    big.mkdir()
+    for i in range(5):
+        (big / f"file{i}.txt").write_text("x" * 400)
+    (tmp_path / "main.py").write_text("print('main')")
+
+    generator = FileTreeGenerator(tmp_path, depth=-1, file_filter=FileFilter(), collapse_threshold=3)
+    tree = generator.generate()
+
+    assert tree == "\n".join([
+        "├── big/ (5 files, 2.0 KB, ~500 tokens)",
+        "└── main.py",
+    ])
+    assert generator.file_count == 6
+    assert generator.directory_count == 2
+
+def test_large_root_is_collapsed(tmp_path: Path):
+    """
+    Test that the threshold applies to the project root as well.
+    """
+    for i in range(5):
+        (tmp_path / f"file{i}.txt").write_text("x" * 400)
+
+    generator = FileTreeGenerator(tmp_path, depth=-1, file_filter=FileFilter(), collapse_threshold=3)
+
+    assert generator.generate() == "./ (5 files, 2.0 KB, ~500 tokens)"
+    assert generator.file_count == 5
+    assert generator.directory_count == 1
+
+def test_indent_style_drops_connectors(tmp_path: Path):
+    """
+    Test that the indent style renders the same entries as the box style, indented only.
+    """
+    (tmp_path / "src" / "app").mkdir(parents=True)
+    (tmp_path / "src" / "app" / "main.py").write_text("print('main')")
+    (tmp_path / "README.md").write_text("# readme")
+
+    generator = FileTreeGenerator(tmp_path, depth=-1, file_filter=FileFilter(), style="indent")
+
+    assert generator.generate() == "src/\n  app/\n    main.py\nREADME.md"
+    assert generator.render("box") == "├── src/\n│   └── app/\n│       └── main.py\n└── README.md"
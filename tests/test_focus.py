@@ -0,0 +1,80 @@
+from pathlib import Path
+from typer.testing import CliRunner
+from copcon.cli import app
+from copcon.core.cache import ContentCache
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.focus import ImportGraph, module_names, parse_imports, resolve_import
+
+FILES = {
+    "src/shop/__init__.py": "",
+    "src/shop/cart.py": "from .pricing import total\nfrom shop import models\n",
+    "src/shop/pricing.py": "import decimal\nfrom . import models\n\ndef total():\n    from .utils import rounding\n",
+    "src/shop/models.py": "class Item:\n    pass\n",
+    "src/shop/utils/__init__.py": "",
+    "src/shop/utils/rounding.py": "ROUND = 2\n",
+    "src/shop/unrelated.py": "import os\n",
+    "scripts/run.py": "from shop.cart import checkout\n",
+}
+
+def make_graph(root: Path, cache_dir: Path) -> ImportGraph:
+    records = FileContentReader(root, FileFilter(), exclude_hidden=True).iter_records()
+    return ImportGraph(records, ContentCache("imports", cache_dir))
+
+def test_module_names_follow_packages():
+    modules = module_names(FILES)
+    assert modules["shop"] == "src/shop/__init__.py"
+    assert modules["shop.utils.rounding"] == "src/shop/utils/rounding.py"
+    assert modules["run"] == "scripts/run.py"
+
+def test_resolve_relative_and_from_imports():
+    assert parse_imports("from ..utils import rounding as r") == [(2, "utils", ["rounding"])]
+    assert resolve_import((2, "utils", ["rounding"]), "shop.sub.mod", False) == [
+        "shop", "shop.utils", "shop.utils.rounding"
+    ]
+    assert resolve_import((1, "", ["models"]), "shop", True) == ["shop", "shop.models"]
+
+def test_closure_follows_imports_transitively(tmp_path, make_project):
+    root = make_project(FILES)
+    graph = make_graph(root, tmp_path / "cache")
+
+    assert graph.closure(["src/shop/cart.py"]) == [
+        "src/shop/cart.py",
+        "src/shop/__init__.py",
+        "src/shop/pricing.py",
+        "src/shop/models.py",
+        "src/shop/utils/__init__.py",
+        "src/shop/utils/rounding.py",
+    ]
+    assert graph.closure(["src/shop/cart.py"], max_depth=1) == [
+        "src/shop/cart.py", "src/shop/__init__.py", "src/shop/pricing.py", "src/shop/models.py"
+    ]
+
+def test_cached_imports_skip_parsing(tmp_path, monkeypatch, make_project):
+    root = make_project(FILES)
+    expected = make_graph(root, tmp_path / "cache").closure(["scripts/run.py"])
+
+    def fail(source):
+        raise AssertionError("Unchanged files are not parsed again.")
+
+    monkeypatch.setattr("copcon.core.focus.parse_imports", fail)
+    assert make_graph(root, tmp_path / "cache").closure(["scripts/run.py"]) == expected
+
+def test_cli_focus_limits_the_report(tmp_path, make_project):
+    root = make_project(FILES)
+    output_file = tmp_path / "report.txt"
+
+    result = CliRunner().invoke(
+        app, [str(root), "--focus", "src/shop/pricing.py", "--focus-depth", "1", "--output-file", str(output_file)]
+    )
+
+    assert result.exit_code == 0, result.output
+    report = output_file.read_text(encoding="utf-8")
+    assert "File: src/shop/pricing.py\n" in report
+    assert "File: src/shop/utils/rounding.py\n" in report
+    assert "unrelated.py" not in report and "cart.py" not in report and "run.py" not in report
+
+def test_cli_focus_rejects_unknown_module(make_project):
+    root = make_project(FILES)
+    result = CliRunner().invoke(app, [str(root), "--focus", "src/shop/missing.py"])
+    assert result.exit_code == 1
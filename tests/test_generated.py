@@ -0,0 +1,46 @@
+import base64
+import os
+import pytest
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.generated import GeneratedFileDetector
+
+detector = GeneratedFileDetector()
+
+@pytest.mark.parametrize("relative_path, head, reason", [
+    ("pnpm-lock.yaml", "lockfileVersion: 6\n", "lock file"),
+    ("static/app.min.js", "var a=1;", "minified"),
+    ("api/service_pb2.py", "x = 1\n", "generated code"),
+    ("gen.go", "// Code generated by stringer. DO NOT EDIT.\npackage x\n", "generated code"),
+    ("api.ts", "/**\n * @generated\n */\nexport {};\n", "generated code"),
+    ("bundle.js", "function(){return 1};" * 100, "minified"),
+    ("icon.svg", '<svg><image href="data:image/png;base64,' + base64.b64encode(os.urandom(3000)).decode(), "embedded base64 data"),
+])
+def test_detects_generated_files(relative_path, head, reason):
+    assert detector.detect(relative_path, head) == reason
+
+def test_regular_source_is_not_flagged():
+    head = "".join(f"def function_{i}(value):\n    return value * {i}\n\n" for i in range(100))
+    assert detector.detect("src/module.py", head) is None
+
+@pytest.mark.parametrize("relative_path, head", [
+    ("requests.jsonl", '{"title": "' + "x" * 2000 + '"}\n'),
+    ("notes.txt", "one very long line " * 100),
+    ("vendor.py", "# Please do not edit the vendored copy below.\nimport os\n"),
+    ("main.go", "package main\n\n// Code generated by hand. DO NOT EDIT.\n"),
+])
+def test_long_lines_and_loose_wording_are_not_flagged(relative_path, head):
+    assert detector.detect(relative_path, head) is None
+
+def test_reader_replaces_generated_files_with_placeholder(tmp_path):
+    (tmp_path / "app.min.js").write_text("var a=1;" * 2000)
+    (tmp_path / "main.py").write_text("print('hello')\n")
+    reader = FileContentReader(
+        tmp_path, FileFilter(), exclude_hidden=True, generated_detector=GeneratedFileDetector()
+    )
+
+    contents = reader.read_all()
+
+    assert contents["app.min.js"] == "[Generated file: minified] Size: 16000 bytes"
+    assert contents["main.py"] == "print('hello')\n"
+    assert reader.generated_files == {"app.min.js": "minified"}
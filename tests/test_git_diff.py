@@ -1,18 +1,47 @@
+import io
+import shutil
 import subprocess
+import sys
 from pathlib import Path
 import pytest
 from typer.testing import CliRunner
 from copcon.cli import app
+from copcon.core.file_filter import FileFilter
+from copcon.core.git_diff import GitDiff, diff_path, parse_name_status
 
 runner = CliRunner()
 
+FAKE_DIFF = (
+    "diff --git a/dummy.txt b/dummy.txt\n"
+    "--- a/dummy.txt\n"
+    "+++ b/dummy.txt\n"
+    "@@ -1 +1 @@\n"
+    "-Dummy content\n"
+    "+fake diff output\n"
+)
+
 def fake_git_diff_success(*args, **kwargs):
     """
-    Simulate a successful 'git diff HEAD' command.
-    Returns a CompletedProcess with fake stdout.
+    Simulate a successful 'git diff HEAD --name-status' command.
+    Returns a CompletedProcess listing a single modified file.
     """
     from subprocess import CompletedProcess
-    return CompletedProcess(args, 0, stdout="fake diff output", stderr="")
+    return CompletedProcess(args, 0, stdout="M\0dummy.txt\0", stderr="")
+
+class FakePopen:
+    """Simulate a streaming 'git diff HEAD' process."""
+
+    def __init__(self, command, **kwargs):
+        self.command = command
+        self.stdout = io.StringIO(FAKE_DIFF)
+        self.stderr = io.StringIO("")
+        self.returncode = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
 
 def fake_git_diff_failure(*args, **kwargs):
     """
@@ -35,9 +64,10 @@ def project_dir(tmp_path: Path) -> Path:
 def test_cli_git_diff_success(project_dir: Path, monkeypatch):
     """
     Test that when the --git-diff flag is enabled and git diff runs successfully,
-    the report includes the git diff output and the success message contains the git diff token row.
+    the report includes the git diff output and the success message attributes it per file.
     """
     monkeypatch.setattr(subprocess, "run", fake_git_diff_success)
+    monkeypatch.setattr(subprocess, "Popen", FakePopen)
     output_file = project_dir / "report.txt"
     result = runner.invoke(app, [str(project_dir), "--output-file", str(output_file), "--git-diff"])
     assert result.exit_code == 0, f"CLI exited with error: {result.output}"
@@ -45,11 +75,10 @@ def test_cli_git_diff_success(project_dir: Path, monkeypatch):
     report_content = output_file.read_text(encoding="utf-8")
     # Check that the report includes the Git Diff section and the fake output
     assert "Git Diff:" in report_content
-    assert "fake diff output" in report_content
+    assert "+fake diff output" in report_content
 
-    # Also check that the success message (printed to console) contains a row for "git diff"
-    # (Note: This string check is case-insensitive.)
-    assert "git diff" in result.output.lower()
+    # The success message attributes the diff tokens to the changed file
+    assert "git diff: dummy.txt" in result.output.lower()
 
 def test_cli_git_diff_failure(project_dir: Path, monkeypatch):
     """
@@ -67,3 +96,51 @@ def test_cli_git_diff_failure(project_dir: Path, monkeypatch):
 
     # Also, check that the success message includes a row for "git diff"
     assert "git diff" in result.output.lower()
+
+def test_parse_name_status_and_diff_path():
+    assert parse_name_status("M\0a.py\0R087\0old.py\0new.py\0D\0gone.py\0") == [
+        ("a.py",), ("old.py", "new.py"), ("gone.py",)
+    ]
+    assert diff_path(FAKE_DIFF) == "dummy.txt"
+    deleted = "diff --git a/gone.py b/gone.py\ndeleted file mode 100644\n--- a/gone.py\n+++ /dev/null\n"
+    assert diff_path(deleted) == "gone.py"
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_git_diff_is_filtered_and_split_per_file(tmp_path: Path):
+    def git(*args):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=tmp_path, check=True, capture_output=True,
+        )
+
+    git("init", "-q")
+    (tmp_path / "app.py").write_text("x = 1\n")
+    (tmp_path / "debug.log").write_text("started\n")
+    (tmp_path / "old_name.py").write_text("".join(f"line {i}\n" for i in range(20)))
+    git("add", "-A")
+    git("commit", "-q", "-m", "initial")
+    (tmp_path / "app.py").write_text("x = 2\n")
+    (tmp_path / "debug.log").write_text("finished\n")
+    git("mv", "old_name.py", "new_name.py")
+
+    file_diffs = list(GitDiff(tmp_path, FileFilter(), exclude_hidden=True, context_lines=0).iter_file_diffs())
+
+    assert [file_diff.path for file_diff in file_diffs] == ["app.py", "new_name.py"]
+    assert "+x = 2" in file_diffs[0].text
+    assert "rename from old_name.py" in file_diffs[1].text
+
+def test_git_diff_survives_large_stderr(tmp_path: Path, monkeypatch):
+    # More warnings than a pipe buffer holds, written before the diff itself
+    script = (
+        "import sys; sys.stderr.write('warning\\n' * 200000); "
+        f"sys.stdout.write({FAKE_DIFF!r}); sys.exit(1)"
+    )
+    monkeypatch.setattr(GitDiff, "_base_command", lambda self: [sys.executable, "-c", script])
+
+    diffs = []
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        for text in GitDiff(tmp_path, FileFilter(), exclude_hidden=True)._stream(["dummy.txt"]):
+            diffs.append(text)
+
+    assert diffs == [FAKE_DIFF]
+    assert error.value.stderr.startswith("warning\n")
@@ -0,0 +1,87 @@
+import shutil
+import subprocess
+import pytest
+import copcon
+from pathlib import Path
+from typer.testing import CliRunner
+from copcon.cli import app
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.git_ref import GitRefSource, parse_ls_tree
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    def git(*args):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+            cwd=tmp_path, check=True, capture_output=True,
+        )
+
+    git("init", "-q")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("VERSION = 1\n")
+    (tmp_path / "debug.log").write_text("ignored by the internal .copconignore\n")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+    git("add", "-A")
+    git("commit", "-q", "-m", "initial")
+    git("tag", "v1")
+    (tmp_path / "src" / "app.py").write_text("VERSION = 2\n")
+    (tmp_path / "src" / "new.py").write_text("added later\n")
+    git("add", "-A")
+    git("commit", "-q", "-m", "second")
+    (tmp_path / "src" / "app.py").write_text("VERSION = 3  # uncommitted\n")
+    return tmp_path
+
+def test_parse_ls_tree_skips_links_and_submodules():
+    output = (
+        b"100644 blob aaaa     12\tsrc/app.py\0"
+        b"120000 blob bbbb      6\tlink\0"
+        b"160000 commit cccc       -\tvendor/lib\0"
+    )
+    assert parse_ls_tree(output) == [("src/app.py", "aaaa", 12)]
+
+def test_reads_files_at_ref_without_touching_the_working_tree(repo: Path):
+    source = GitRefSource(repo, "v1")
+    reader = FileContentReader(repo, FileFilter(), exclude_hidden=True, source=source)
+
+    contents = reader.read_all()
+    source.close()
+
+    assert sorted(contents) == ["logo.png", "src/app.py"]
+    assert contents["src/app.py"] == "VERSION = 1\n"
+    assert contents["logo.png"].startswith("[Binary file]")
+    assert (repo / "src" / "app.py").read_text() == "VERSION = 3  # uncommitted\n"
+
+def test_cli_reports_a_ref(repo: Path, tmp_path_factory):
+    output_file = tmp_path_factory.mktemp("out") / "report.txt"
+
+    result = CliRunner().invoke(app, [str(repo), "--ref", "HEAD", "--output-file", str(output_file)])
+
+    assert result.exit_code == 0, result.output
+    report = output_file.read_text(encoding="utf-8")
+    assert report.startswith(f"Directory Structure:\n{repo.name}@HEAD\n")
+    assert "VERSION = 2" in report and "added later" in report
+    assert "uncommitted" not in report
+
+def test_cli_rejects_unknown_ref(repo: Path):
+    result = CliRunner().invoke(app, [str(repo), "--ref", "does-not-exist"])
+    assert result.exit_code == 1
+
+def test_cli_closes_the_ref_on_errors(repo: Path, monkeypatch):
+    closed = []
+    close = GitRefSource.close
+    monkeypatch.setattr(GitRefSource, "close", lambda self: closed.append(close(self)))
+
+    result = CliRunner().invoke(app, [str(repo), "--ref", "HEAD", "--focus", "src/missing.py"])
+
+    assert result.exit_code == 1
+    assert closed, "The cat-file process is stopped when the run fails."
+
+def test_api_context_closes_the_ref(repo, whitespace_encoder):
+    with copcon.build_context(repo, ref="v1", encoder=whitespace_encoder) as context:
+        report = "".join(context.iter_chunks())
+        assert context.source._process is not None
+    assert "VERSION = 1" in report
+    assert context.source._process is None
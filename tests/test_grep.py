@@ -0,0 +1,82 @@
+from pathlib import Path
+import pytest
+from typer.testing import CliRunner
+from copcon.api import build_context
+from copcon.cli import app
+from copcon.core import grep as grep_module
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.grep import ContentGrep, grep_source
+from copcon.core.guards import ResourceGuard
+
+FILES = {
+    "src/pay.py": "from gateway import PaymentGateway\n\ndef refund():\n    pass\n",
+    "src/use.py": "refund = 1\n",
+    "src/other.py": "print('hello')\n",
+    "notes/refund.md": "# Refunds\nUse PaymentGateway.refund().\n",
+}
+
+def matched(root: Path, grep: ContentGrep):
+    reader = FileContentReader(root, FileFilter(), exclude_hidden=True)
+    return [member.path for member in grep_source(reader, grep, workers=2).iter_files()]
+
+def test_any_and_all_patterns(make_project):
+    root = make_project(FILES)
+    assert matched(root, ContentGrep(["PaymentGateway", "^refund"])) == [
+        "notes/refund.md", "src/pay.py", "src/use.py"
+    ]
+    assert matched(root, ContentGrep(["PaymentGateway", r"def refund"], match_all=True)) == ["src/pay.py"]
+    assert matched(root, ContentGrep(["(?i)refunds"])) == ["notes/refund.md"]
+
+def test_binary_and_utf16_content():
+    grep = ContentGrep(["needle"])
+    assert not grep.matches(b"\x00\x01needle\x00")
+    assert grep.matches("a needle\n".encode("utf-16"))
+
+def test_utf8_matches_like_decoded_text():
+    for pattern, text in [("(?i)über", "Über"), ("^x.y$", "xüy"), (r"\bcafé\b", "un café noir")]:
+        grep = ContentGrep([pattern])
+        assert grep.matches(text.encode("utf-8")) and grep.matches(text.encode("utf-16"))
+
+def test_large_files_are_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(grep_module, "MMAP_THRESHOLD", 16)
+    (tmp_path / "big.txt").write_text("filler line\n" * 1000 + "needle\n")
+    assert ContentGrep(["^needle$"]).matches_file(tmp_path / "big.txt")
+    assert not ContentGrep(["haystack"]).matches_file(tmp_path / "big.txt")
+
+def test_search_stops_at_the_byte_limit(make_project):
+    root = make_project(FILES)
+    guard = ResourceGuard(max_bytes=60)
+    reader = FileContentReader(root, FileFilter(), exclude_hidden=True, guard=guard)
+    members = [member.path for member in grep_source(reader, ContentGrep(["refund"])).iter_files()]
+
+    assert members == ["notes/refund.md"]
+    assert guard.tripped
+
+def test_dry_run_says_files_were_searched(make_project):
+    root = make_project(FILES)
+    result = CliRunner().invoke(app, [str(root), "--grep", "refund", "--dry-run"])
+    assert result.exit_code == 0, result.output
+    assert "src/other.py" not in result.output
+    assert "Only file contents searched by --grep were read" in result.output
+
+def test_invalid_pattern():
+    with pytest.raises(ValueError, match="Invalid pattern"):
+        ContentGrep(["("])
+
+def test_cli_leaves_out_files_without_matches(tmp_path, make_project):
+    root = make_project(FILES)
+    output_file = tmp_path / "out.txt"
+    result = CliRunner().invoke(app, [str(root), "--grep", "PaymentGateway", "--output-file", str(output_file)])
+    assert result.exit_code == 0, result.output
+    report = output_file.read_text()
+    assert "File: src/pay.py" in report and "File: notes/refund.md" in report
+    assert "use.py" not in report and "other.py" not in report
+
+    result = CliRunner().invoke(app, [str(root), "--grep", "("])
+    assert result.exit_code == 2
+
+def test_api_grep(make_project):
+    root = make_project(FILES)
+    result = build_context(root, grep=["refund", "PaymentGateway"], grep_all=True)
+    assert [record.relative_path for record in result.iter_records()] == ["notes/refund.md", "src/pay.py"]
@@ -0,0 +1,67 @@
+import time
+from pathlib import Path
+from typer.testing import CliRunner
+from copcon.cli import app
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_tree import FileTreeGenerator
+from copcon.core.guards import EXIT_CODE_TRUNCATED, ResourceGuard
+
+def make_files(directory: Path, count: int, size: int = 10):
+    for i in range(count):
+        (directory / f"file{i:02d}.txt").write_text("x" * size)
+
+def test_guard_limits():
+    guard = ResourceGuard(max_files=2, max_bytes=100)
+    assert guard.check(1, 50)
+    assert guard.check(2, 100)
+    assert not guard.tripped
+    assert not guard.check(3, 100)
+    assert guard.reason == "limit of 2 files reached"
+    assert not guard.check(1, 101)
+    assert guard.reason == "limit of 2 files reached", "The first limit hit is reported."
+
+def test_guard_deadline():
+    guard = ResourceGuard(timeout=0.01)
+    assert guard.check_time()
+    time.sleep(0.02)
+    assert not guard.check_time()
+    assert not guard.check(1)
+    assert "timeout" in guard.reason
+
+def test_reader_stops_at_max_files(tmp_path):
+    make_files(tmp_path, 10)
+    guard = ResourceGuard(max_files=3)
+    reader = FileContentReader(tmp_path, FileFilter(), exclude_hidden=True, guard=guard)
+    assert len(list(reader.iter_records())) == 3
+    assert guard.tripped
+
+def test_reader_stops_at_max_bytes(tmp_path):
+    make_files(tmp_path, 10, size=10)
+    guard = ResourceGuard(max_bytes=25)
+    reader = FileContentReader(tmp_path, FileFilter(), exclude_hidden=True, guard=guard)
+    assert len(list(reader.iter_records())) == 2
+
+def test_tree_is_marked_as_truncated(tmp_path):
+    make_files(tmp_path, 5)
+    guard = ResourceGuard(max_files=2)
+    generator = FileTreeGenerator(tmp_path, depth=-1, file_filter=FileFilter(), guard=guard)
+    tree = generator.generate()
+    assert tree.splitlines() == [
+        "├── file00.txt",
+        "├── file01.txt",
+        "... (truncated: limit of 2 files reached)",
+    ]
+    assert generator.file_count == 2
+
+def test_cli_partial_report_exit_code(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    make_files(project, 5)
+    output_file = tmp_path / "report.txt"
+
+    result = CliRunner().invoke(app, [str(project), "--output-file", str(output_file), "--max-files", "2"])
+
+    assert result.exit_code == EXIT_CODE_TRUNCATED
+    assert "Report truncated" in result.output
+    assert output_file.read_text(encoding="utf-8").endswith("[Report truncated: limit of 2 files reached]")
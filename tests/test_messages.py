@@ -126,3 +126,55 @@ def test_get_success_message_with_git_diff_entry():
     assert "Content Source" in message
     # Check that there is a row for "git diff"
     assert "git diff" in message
+
+def test_get_success_message_with_minification_savings():
+    """
+    Test that token savings from minification are reported.
+    """
+    message = get_success_message(
+        directory_count=1,
+        file_count=2,
+        total_tokens=600,
+        extension_token_map={"*.py": 600},
+        output_file=None,
+        minification_tokens=(1000, 600),
+    )
+    assert "Minification: 1,000 → 600 tokens" in message
+    assert "saved 400, 40.0%" in message
+
+def test_get_success_message_with_token_attribution():
+    """
+    Test that top files and directory rollups are listed when provided.
+    """
+    message = get_success_message(
+        directory_count=2,
+        file_count=2,
+        total_tokens=500,
+        extension_token_map={"*.py": 500},
+        output_file=None,
+        top_files=[("src/generated/very_long_module_name.py", 400)],
+        directory_token_map={"src/": 450, ".": 50},
+    )
+    assert "Top 1 Files" in message
+    assert "src/generated/very_long_module_name.py |    400  |  80.0%" in message
+    assert "src/" in message
+
+def test_get_success_message_lists_generated_files():
+    """
+    Test that files replaced by a generated-file placeholder are listed with the reason.
+    """
+    message = get_success_message(
+        directory_count=1,
+        file_count=2,
+        total_tokens=20,
+        extension_token_map={"*.js": 20},
+        output_file=None,
+        generated_files={"dist/app.min.js": "minified", "yarn.lock": "lock file"},
+    )
+    assert "Replaced 2 generated files with placeholders" in message
+    assert "- dist/app.min.js (minified)" in message
+    assert "- yarn.lock (lock file)" in message
+
+def test_success_message_reports_framing_savings():
+    message = get_success_message(1, 2, 900, {"*.py": 900}, None, framing_tokens=(150, 50))
+    assert "🪶 Compact dialect: framing 150 → 50 tokens (saved 100, 10.0% of the standard report)" in message
@@ -0,0 +1,98 @@
+import pytest
+from copcon.core.cache import ContentCache
+from copcon.core.minifier import (
+    MINIFIERS,
+    ContentMinifier,
+    minify_c_like,
+    minify_json,
+    minify_python,
+    minify_yaml,
+)
+
+def test_minify_python_strips_comments_docstrings_and_blank_lines():
+    source = '\n'.join([
+        '"""Module docstring."""',
+        'import os  # trailing comment',
+        '',
+        '',
+        'class A:',
+        '    """Class docstring."""',
+        '',
+        '    def f(self):',
+        '        """Only statement in body."""',
+        '',
+        '    def g(self):',
+        '        # explain',
+        '        return 1   ',
+    ])
+    expected = '\n'.join([
+        'import os',
+        'class A:',
+        '    def f(self):',
+        '        ...',
+        '    def g(self):',
+        '        return 1',
+    ])
+    assert minify_python(source) == expected
+
+def test_minify_python_preserves_string_contents():
+    source = 'x = """keep\n\n   # not a comment   \n"""\n'
+    assert minify_python(source) == 'x = """keep\n\n   # not a comment   \n"""'
+
+def test_minify_python_returns_invalid_source_unchanged():
+    source = 'def broken(:\n    """unterminated'
+    assert minify_python(source) == source
+
+def test_minify_c_like_keeps_comment_markers_inside_strings():
+    source = 'int a = 1; // comment\n/* block\n   comment */\nchar *s = "// not a comment";\n\n'
+    assert minify_c_like(source) == 'int a = 1;\nchar *s = "// not a comment";'
+
+def test_minify_js_keeps_comment_markers_inside_regex_literals():
+    source = (
+        'p.replace(/\\/*$/, "");\n'
+        'function keep() { return 42; }\n'
+        '/* real comment */\n'
+        'const r = /\\/\\//; // comment\n'
+        'const d = a / b; // division\n'
+    )
+    assert MINIFIERS[".js"](source) == (
+        'p.replace(/\\/*$/, "");\n'
+        'function keep() { return 42; }\n'
+        'const r = /\\/\\//;\n'
+        'const d = a / b;'
+    )
+
+def test_minify_css_does_not_treat_double_slash_as_comment():
+    source = 'a { background: url(http://example.com/x.png); } /* note */\n'
+    assert minify_c_like(source, line_comments=False) == 'a { background: url(http://example.com/x.png); }'
+
+def test_minify_json_removes_whitespace_outside_strings():
+    assert minify_json('{\n  "a b": [1, 2],\n  "c": "x y"\n}\n') == '{"a b":[1,2],"c":"x y"}'
+
+def test_minify_yaml_keeps_indentation():
+    source = '# comment\nkey: value   \n\nlist:\n  - item\n'
+    assert minify_yaml(source) == 'key: value\nlist:\n  - item'
+
+def test_minify_yaml_keeps_block_scalars_verbatim():
+    source = 'script: |\n  echo one\n\n  # keep this shell comment\n  echo two\n\n# drop\nnext: >-\n  folded\n'
+    assert minify_yaml(source) == 'script: |\n  echo one\n\n  # keep this shell comment\n  echo two\nnext: >-\n  folded'
+
+def test_content_minifier_only_applies_to_enabled_extensions(tmp_path):
+    minifier = ContentMinifier(["py"], cache=ContentCache("minify", tmp_path))
+    contents = {"a.py": "x = 1  # c\n", "b.js": "x = 1; // c\n"}
+    result = minifier.minify_all(contents)
+    assert result == {"a.py": "x = 1", "b.js": "x = 1; // c\n"}
+
+def test_content_minifier_uses_cache(tmp_path, monkeypatch):
+    cache = ContentCache("minify", tmp_path)
+    ContentMinifier(["py"], cache=cache).minify("a.py", "x = 1  # c\n")
+    assert any(cache.directory.rglob("*")), "Minified output should be written to the cache."
+
+    # Identical content must be served from the cache without minifying again.
+    from copcon.core import minifier as minifier_module
+    monkeypatch.setitem(minifier_module.MINIFIERS, ".py", lambda source: pytest.fail("Cache was not used."))
+    assert ContentMinifier(["py"], cache=cache).minify("b.py", "x = 1  # c\n") == "x = 1"
+
+def test_content_minifier_rejects_unknown_extension():
+    with pytest.raises(ValueError):
+        ContentMinifier([".unknown"])
@@ -0,0 +1,61 @@
+import json
+import pytest
+from copcon.core.cache import ContentCache
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.notebook import NotebookConverter, convert_notebook
+
+IMAGE_PAYLOAD = "iVBORw0KGgo" + "A" * 10_000
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "markdown", "metadata": {}, "source": ["# Analysis\n", "Loads the \"data\"."]},
+        {
+            "cell_type": "code",
+            "execution_count": 1,
+            "metadata": {},
+            "source": "df = load()\ndf.plot()",
+            "outputs": [
+                {"output_type": "stream", "name": "stdout", "text": ["row 1\n", "row 2\n", "row 3\n"]},
+                {
+                    "output_type": "display_data",
+                    "data": {"image/png": IMAGE_PAYLOAD, "text/plain": ["<Figure size 640x480>"]},
+                    "metadata": {},
+                },
+                {"output_type": "error", "ename": "KeyError", "evalue": "'x'", "traceback": ["..."]},
+            ],
+        },
+    ],
+    "metadata": {"kernelspec": {"name": "python3"}},
+    "nbformat": 4,
+    "nbformat_minor": 5,
+}
+
+def test_convert_keeps_sources_only_by_default():
+    text = convert_notebook(json.dumps(NOTEBOOK, indent=1).encode())
+    assert text == '# %% [markdown]\n# Analysis\nLoads the "data".\n\n# %%\ndf = load()\ndf.plot()'
+
+def test_convert_truncates_text_outputs_and_drops_images():
+    text = convert_notebook(json.dumps(NOTEBOOK).encode(), max_output_lines=2)
+    assert text.endswith("# Output:\n# row 1\n# row 2\n# ... (3 more lines)")
+    assert IMAGE_PAYLOAD not in text
+
+    text = convert_notebook(json.dumps(NOTEBOOK).encode(), max_output_lines=10)
+    assert "# <Figure size 640x480>\n# KeyError: 'x'" in text
+
+@pytest.mark.parametrize("data", [b"{not json", b'{"nbformat": 4}'])
+def test_invalid_notebooks_fall_back_to_plain_text(tmp_path, data):
+    (tmp_path / "broken.ipynb").write_bytes(data)
+    reader = FileContentReader(
+        tmp_path, FileFilter(), exclude_hidden=True, notebook_converter=NotebookConverter()
+    )
+    assert reader.read_all() == {"broken.ipynb": data.decode()}
+
+def test_converted_notebooks_are_cached(tmp_path):
+    notebook = tmp_path / "analysis.ipynb"
+    notebook.write_text(json.dumps(NOTEBOOK))
+    cache = ContentCache("notebook", tmp_path / "cache")
+
+    first = NotebookConverter(cache=cache).convert(notebook)
+    assert any(cache.directory.rglob("*")), "The conversion should be written to the cache."
+    assert NotebookConverter(cache=cache).convert(notebook) == first
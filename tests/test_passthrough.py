@@ -0,0 +1,77 @@
+import os
+import pytest
+from copcon.core.cache import content_hash
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.passthrough import PassthroughWriter, SourceText, source_text
+from copcon.core.report import ReportFormatter
+
+def load(path):
+    data = path.read_bytes()
+    return source_text(data, path, os.stat(path))
+
+def test_only_exact_utf8_is_passed_through(tmp_path):
+    (tmp_path / "lf.py").write_bytes("print('é')\n".encode("utf-8"))
+    (tmp_path / "crlf.py").write_bytes(b"print(1)\r\n")
+    (tmp_path / "latin1.txt").write_bytes("café\n".encode("latin-1"))
+
+    text = load(tmp_path / "lf.py")
+    assert isinstance(text, SourceText) and text == "print('é')\n"
+    assert text.digest == content_hash("print('é')\n")
+    assert load(tmp_path / "crlf.py") is None
+    assert load(tmp_path / "latin1.txt") is None
+
+def test_reader_loads_source_text_only_when_enabled(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    (tmp_path / "b.py").write_bytes(b"y = 2\r\n")
+
+    contents = FileContentReader(tmp_path, FileFilter(), exclude_hidden=True, passthrough=True).read_all()
+    assert isinstance(contents["a.py"], SourceText)
+    assert contents["b.py"] == "y = 2\n" and not isinstance(contents["b.py"], SourceText)
+
+    contents = FileContentReader(tmp_path, FileFilter(), exclude_hidden=True).read_all()
+    assert not isinstance(contents["a.py"], SourceText)
+
+def test_report_file_is_identical_with_passthrough(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.py").write_text("print('a')\n" * 1000)
+    (project / "b.txt").write_bytes(b"windows\r\nline endings\r\n")
+    contents = FileContentReader(project, FileFilter(), exclude_hidden=True, passthrough=True).read_all()
+
+    formatter = ReportFormatter("project", "tree", contents)
+    output_file = tmp_path / "report.txt"
+    formatter.stream_to_file(output_file, trailer="\n\nGit Diff:\nx")
+
+    assert output_file.read_bytes() == (formatter.format() + "\n\nGit Diff:\nx").encode("utf-8")
+
+@pytest.mark.skipif(not hasattr(os, "copy_file_range"), reason="copy_file_range is only available on Linux")
+def test_unchanged_file_is_copied(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("value = 1\n" * 100)
+    text = load(path)
+
+    with (tmp_path / "out.txt").open("wb", buffering=0) as f:
+        writer = PassthroughWriter(f)
+        writer.write("File: a.py\n")
+        writer.write(text)
+        writer.write("---")
+        writer.flush()
+
+    assert (tmp_path / "out.txt").read_text() == "File: a.py\n" + "value = 1\n" * 100 + "---"
+    assert writer.copied_bytes == len(text)
+
+def test_changed_file_is_written_as_read(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("old = 1\n")
+    text = load(path)
+    path.write_text("new = 22\n")
+
+    with (tmp_path / "out.txt").open("wb", buffering=0) as f:
+        writer = PassthroughWriter(f)
+        writer.write("File: a.py\n")
+        writer.write(text)
+        writer.flush()
+
+    assert (tmp_path / "out.txt").read_text() == "File: a.py\nold = 1\n"
+    assert writer.copied_bytes == 0
@@ -0,0 +1,74 @@
+import threading
+import time
+import pytest
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_record import FileRecord
+from copcon.core.pipeline import ReportPipeline
+from copcon.core.processor import ContentProcessor
+from copcon.core.report import ReportFormatter
+from copcon.core.skeleton import SkeletonExtractor
+from copcon.exceptions import FileReadError
+
+def test_pipeline_matches_serial_processing(temp_dir, whitespace_encoder):
+    for i in range(50):
+        (temp_dir / f"file{i:02d}.py").write_text(f"value = {i}\n" * (i + 1))
+    reader = FileContentReader(temp_dir, FileFilter(), exclude_hidden=True)
+
+    serial_records = list(reader.iter_records())
+    serial = list(ContentProcessor(whitespace_encoder).process(serial_records))
+
+    pipeline = ReportPipeline(ContentProcessor(whitespace_encoder), read_workers=3, token_workers=2, queue_size=4)
+    pipelined = list(pipeline.iter_contents(reader.iter_records()))
+
+    assert pipelined == serial
+    assert [r.token_count for r in pipeline.records] == [r.token_count for r in serial_records]
+
+def test_pipeline_emits_output_before_walk_finishes(whitespace_encoder):
+    walk_finished = threading.Event()
+
+    def slow_walk():
+        for i in range(5):
+            yield FileRecord(f"f{i}.txt", 1, 0.0, loader=lambda record: "x")
+            time.sleep(0.05)
+        walk_finished.set()
+
+    pipeline = ReportPipeline(ContentProcessor(whitespace_encoder))
+    contents = pipeline.iter_contents(slow_walk())
+    assert next(contents) == ("f0.txt", "x")
+    assert not walk_finished.is_set(), "The first file should be emitted while the walk is still running."
+    assert [path for path, _ in contents] == ["f1.txt", "f2.txt", "f3.txt", "f4.txt"]
+
+def test_pipeline_reports_read_errors_after_emitting_other_files(whitespace_encoder):
+    def failing_loader(record):
+        raise FileReadError("boom")
+
+    records = [FileRecord("bad.txt", 1, 0.0, failing_loader), FileRecord("good.txt", 1, 0.0, lambda r: "ok")]
+    pipeline = ReportPipeline(ContentProcessor(whitespace_encoder))
+    formatter = ReportFormatter("p", "", pipeline.iter_contents(iter(records)))
+
+    chunks = []
+    with pytest.raises(FileReadError):
+        for chunk in formatter.iter_chunks():
+            chunks.append(chunk)
+    assert "ok" in chunks
+
+def test_pipeline_skeletonizes_files_in_chunks(temp_dir, whitespace_encoder, monkeypatch):
+    for i in range(20):
+        (temp_dir / f"module{i:02d}.py").write_text(f"def function_{i}():\n    return {i}\n")
+    reader = FileContentReader(temp_dir, FileFilter(), exclude_hidden=True)
+    serial = list(ContentProcessor(whitespace_encoder, SkeletonExtractor()).process(list(reader.iter_records())))
+
+    batch_sizes = []
+    extract_all = SkeletonExtractor.extract_all
+    monkeypatch.setattr(
+        SkeletonExtractor,
+        "extract_all",
+        lambda self, contents: batch_sizes.append(len(contents)) or extract_all(self, contents),
+    )
+    processor = ContentProcessor(whitespace_encoder, SkeletonExtractor())
+    pipeline = ReportPipeline(processor, queue_size=4, chunk_size=5)
+
+    assert list(pipeline.iter_contents(reader.iter_records())) == serial
+    assert sum(batch_sizes) == 20
+    assert max(batch_sizes) > 1, "Skeletons should be extracted a chunk at a time."
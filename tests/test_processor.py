@@ -0,0 +1,41 @@
+import pytest
+from copcon.core.cache import ContentCache
+from copcon.core.file_record import FileRecord
+from copcon.core.minifier import ContentMinifier
+from copcon.core.processor import ContentProcessor
+from copcon.exceptions import FileReadError
+
+def make_record(relative_path, content):
+    return FileRecord(relative_path, size=len(content), mtime=0.0, loader=lambda record: content)
+
+def test_processor_counts_tokens_and_releases_content(whitespace_encoder):
+    records = [make_record("a.py", "x = 1"), make_record("b.txt", "one two")]
+    processor = ContentProcessor(whitespace_encoder, batch_size=1)
+
+    emitted = list(processor.process(records))
+
+    assert emitted == [("a.py", "x = 1"), ("b.txt", "one two")]
+    assert [record.token_count for record in records] == [3, 2]
+    assert not any(record.is_loaded for record in records)
+
+def test_processor_reports_minification_savings(tmp_path, whitespace_encoder):
+    records = [make_record("a.py", "x = 1  # comment here\n")]
+    minifier = ContentMinifier(["py"], cache=ContentCache("minify", tmp_path))
+    processor = ContentProcessor(whitespace_encoder, minifier=minifier)
+
+    assert list(processor.process(records)) == [("a.py", "x = 1")]
+    assert processor.minification_tokens == (6, 3)
+    assert records[0].token_count == 3
+
+def test_processor_raises_after_emitting_readable_files(whitespace_encoder):
+    def failing_loader(record):
+        raise FileReadError("boom")
+
+    records = [FileRecord("bad.py", 0, 0.0, failing_loader), make_record("good.py", "ok")]
+    processor = ContentProcessor(whitespace_encoder)
+
+    emitted = []
+    with pytest.raises(FileReadError):
+        for item in processor.process(records):
+            emitted.append(item)
+    assert emitted == [("good.py", "ok")]
@@ -1,4 +1,6 @@
-from copcon.core.report import ReportFormatter
+from typer.testing import CliRunner
+from copcon.cli import app
+from copcon.core.report import ReportFormatter, common_directory
 
 def test_report_formatter_basic():
     project_name = "test_project"
@@ -97,3 +99,46 @@ def test_report_formatter_write_to_file(temp_dir):
         content = f.read()
     
     assert content == report, "Content written to file does not match the formatted report."
+
+def test_report_formatter_streams_lazy_contents(temp_dir):
+    def contents():
+        yield "a.py", "print('a')"
+        yield "b.py", "print('b')"
+
+    expected = ReportFormatter("p", "tree", {"a.py": "print('a')", "b.py": "print('b')"}).format()
+
+    output_file = temp_dir / "output.txt"
+    ReportFormatter("p", "tree", contents()).stream_to_file(output_file, trailer="\n\nGit Diff:\nx")
+
+    assert output_file.read_text(encoding="utf-8") == expected + "\n\nGit Diff:\nx"
+
+def test_compact_dialect_uses_a_single_delimiter_per_file():
+    formatter = ReportFormatter(
+        "p",
+        "src/\n  app/\n    a.py",
+        {"src/app/a.py": "print('a')", "src/app/b.py": "print('b')"},
+        dialect="compact",
+        path_prefix=common_directory(["src/app/a.py", "src/app/b.py"]),
+    )
+
+    assert formatter.format() == (
+        "Directory Structure: p\nsrc/\n  app/\n    a.py\n\nFiles (paths relative to src/app/):"
+        "\n\n==> a.py <==\nprint('a')"
+        "\n\n==> b.py <==\nprint('b')"
+    )
+
+def test_common_directory():
+    assert common_directory(["src/app/a.py", "src/app/sub/b.py"]) == "src/app/"
+    assert common_directory(["src/a.py", "README.md"]) == ""
+    assert common_directory([]) == ""
+
+def test_cli_compact_dialect_can_keep_full_paths(tmp_path, make_project):
+    project = make_project({"src/app/a.py": "print('a')\n", "src/app/b.py": "print('b')\n"})
+    output_file = tmp_path / "report.txt"
+
+    for flags, header in [([], "==> a.py <=="), (["--no-path-prefix"], "==> src/app/a.py <==")]:
+        result = CliRunner().invoke(
+            app, [str(project), "--dialect", "compact", "--output-file", str(output_file), *flags]
+        )
+        assert result.exit_code == 0, result.output
+        assert header in output_file.read_text(encoding="utf-8")
@@ -0,0 +1,62 @@
+import pytest
+import tiktoken
+from copcon.core.report import ReportFormatter
+from copcon.core.report_tokens import ReportTokenCounter
+
+# cl100k_base's pre-tokenization pattern, with a small merge table so no download is needed
+CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+"""
+    r"""|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+MERGES = [b"\n\n", b"  ", b"    ", b"--", b"----", b"--------", b"-\n", b"\n\n\n", b")\n", b"im", b"imp", b"==", b"==>"]
+
+
+@pytest.fixture
+def encoder():
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in MERGES:
+        ranks[merge] = len(ranks)
+    return tiktoken.Encoding("test", pat_str=CL100K_PATTERN, mergeable_ranks=ranks, special_tokens={})
+
+
+CONTENTS = {
+    "a.py": "import os\n\ndef main():\n    return os.getcwd()\n",
+    "blank_lines.txt": "\n\n\nstarts and ends with blank lines\n\n\n",
+    "one_line.min.js": "var a=1;" * 50,
+    "indented.py": "    x = 1\n        y = 2   ",
+    "empty.txt": "",
+    "dashes.md": "----\n---",
+}
+
+
+@pytest.mark.parametrize("dialect", ["standard", "compact"])
+def test_counts_match_a_full_encode(encoder, dialect):
+    counter = ReportTokenCounter(encoder)
+    formatter = ReportFormatter("p", "├── a.py\n└── b/", CONTENTS, dialect=dialect, token_counter=counter)
+
+    report = formatter.format()
+    counter.add("\n\n[Report truncated: file limit]")
+    report += "\n\n[Report truncated: file limit]"
+
+    content_tokens = sum(len(encoder.encode(content)) for content in CONTENTS.values())
+    assert content_tokens + counter.tokens == len(encoder.encode(report))
+
+
+def test_only_text_around_joins_is_encoded_again(encoder):
+    encoded = []
+
+    class RecordingEncoder:
+        def encode(self, text):
+            encoded.append(text)
+            return encoder.encode(text)
+
+    header = "\n\nFile: big.py\n" + "-" * 40 + "\n"
+    content = "def f(x):\n    return x\n" * 2000
+    footer = "\n" + "-" * 40
+    counter = ReportTokenCounter(RecordingEncoder())
+    counter.add(header)
+    counter.add(content, counted=True)
+    counter.add(footer)
+
+    assert counter.tokens + len(encoder.encode(content)) == len(encoder.encode(header + content + footer))
+    assert max(len(text) for text in encoded) < 100, "The content is not encoded again."
@@ -0,0 +1,76 @@
+import pytest
+from copcon.core import file_reader
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.selection import LineRange, Symbol, apply_selection, parse_target_entry, symbol_range
+from copcon.exceptions import FileReadError
+
+SOURCE = '''import os
+
+
+class Router:
+    """Routes requests."""
+
+    @staticmethod
+    def dispatch(request):
+        return request.path
+
+    def other(self):
+        pass
+'''
+
+@pytest.mark.parametrize("entry, expected", [
+    ("src/app.py:120-260", ("src/app.py", LineRange(120, 260))),
+    ("src/app.py:7", ("src/app.py", LineRange(7, 7))),
+    ("src/app.py::Router.dispatch", ("src/app.py", Symbol("Router.dispatch"))),
+    ("*.py", ("*.py", None)),
+])
+def test_parse_target_entry(entry, expected):
+    assert parse_target_entry(entry) == expected
+
+def test_invalid_line_range_is_rejected(tmp_path):
+    target = tmp_path / ".copcontarget"
+    target.write_text("src/app.py:20-10\n")
+    with pytest.raises(FileReadError):
+        FileFilter(user_target_path=target)
+
+def test_symbol_range_includes_decorators():
+    assert symbol_range(SOURCE, "Router.dispatch") == LineRange(7, 9)
+    assert symbol_range(SOURCE, "Router.missing") is None
+
+def test_apply_selection_emits_only_the_spans():
+    text = apply_selection(SOURCE, [LineRange(1, 1), Symbol("Router.dispatch"), Symbol("nope")])
+    assert text == (
+        "[Lines 1-1]\nimport os\n\n"
+        "[Router.dispatch: lines 7-9]\n    @staticmethod\n    def dispatch(request):\n        return request.path\n\n"
+        "[Symbol nope not found]"
+    )
+
+def test_reader_reads_only_up_to_the_selected_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_reader, "READ_CHUNK_SIZE", 16)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "big.txt").write_text("".join(f"line {i}\n" for i in range(1, 10_001)))
+    (tmp_path / "src" / "app.py").write_text(SOURCE)
+    target = tmp_path / ".copcontarget"
+    target.write_text("src/big.txt:2-3\nsrc/app.py::Router.other\n")
+    reader = FileContentReader(tmp_path, FileFilter(user_target_path=target), exclude_hidden=True)
+
+    reads = []
+    original = reader._read_lines
+
+    def read_lines(f, head, line_count):
+        data = original(f, head, line_count)
+        reads.append(len(data))
+        return data
+
+    monkeypatch.setattr(reader, "_read_lines", read_lines)
+    contents = reader.read_all()
+
+    assert contents["src/big.txt"] == "[Lines 2-3]\nline 2\nline 3"
+    assert reads and reads[0] < 10_000, "Only the start of the file is read."
+    assert contents["src/app.py"] == "[Router.other: lines 11-12]\n    def other(self):\n        pass"
+
+def test_whole_file_entry_wins_over_selection(tmp_path):
+    target = tmp_path / ".copcontarget"
+    target.write_text("app.py:1-2\napp.py\n")
+    assert FileFilter(user_target_path=target).selections == {}
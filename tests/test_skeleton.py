@@ -0,0 +1,100 @@
+from concurrent.futures import ProcessPoolExecutor
+from copcon.core.cache import ContentCache
+from copcon.core.file_record import FileRecord
+from copcon.core.processor import ContentProcessor
+from copcon.core.skeleton import SkeletonExtractor, python_skeleton
+
+SOURCE = '''"""Module summary.
+
+More details that should be dropped.
+"""
+import os
+from typing import List
+
+CONSTANT = 1
+
+
+@dataclass(frozen=True)
+class Point(Base, metaclass=Meta):
+    """A point.
+
+    Long description.
+    """
+
+    def norm(self, scale: float = 1.0) -> float:
+        """Return the norm."""
+        return (self.x ** 2 + self.y ** 2) ** 0.5 * scale
+
+    @property
+    def empty(self):
+        return None
+
+
+async def fetch(url: str, *args, timeout=None, **kwargs) -> List[str]:
+    result = await get(url)
+    return result
+'''
+
+def test_python_skeleton_keeps_api_surface_only():
+    expected = "\n".join([
+        '"""Module summary."""',
+        "import os",
+        "from typing import List",
+        "@dataclass(frozen=True)",
+        "class Point(Base, metaclass=Meta):",
+        '    """A point."""',
+        "    def norm(self, scale: float=1.0) -> float:",
+        '        """Return the norm."""',
+        "    @property",
+        "    def empty(self):",
+        "        ...",
+        "async def fetch(url: str, *args, timeout=None, **kwargs) -> List[str]:",
+        "    ...",
+    ])
+    assert python_skeleton(SOURCE) == expected
+
+def test_python_skeleton_returns_invalid_source_unchanged():
+    source = "def broken(:\n"
+    assert python_skeleton(source) == source
+
+def test_skeleton_extractor_respects_patterns(tmp_path):
+    extractor = SkeletonExtractor(["src/**/*.py"], cache=ContentCache("skeleton", tmp_path))
+    contents = {
+        "src/pkg/mod.py": "def f():\n    return 1\n",
+        "tests/test_mod.py": "def test_f():\n    assert f() == 1\n",
+        "src/data.json": "{}",
+    }
+    result = extractor.extract_all(contents)
+    assert result["src/pkg/mod.py"] == "def f():\n    ..."
+    assert result["tests/test_mod.py"] == contents["tests/test_mod.py"]
+    assert result["src/data.json"] == "{}"
+
+def test_skeleton_extractor_parallel_matches_serial(tmp_path):
+    contents = {f"mod{i}.py": f"def f{i}(x):\n    return x + {i}\n" for i in range(8)}
+    serial = SkeletonExtractor(cache=ContentCache("serial", tmp_path)).extract_all(contents)
+    extractor = SkeletonExtractor(cache=ContentCache("parallel", tmp_path), max_workers=2, parallel_threshold=2)
+    parallel = extractor.extract_all(contents)
+    extractor.close()
+    assert serial == parallel
+    assert parallel["mod3.py"] == "def f3(x):\n    ..."
+
+def test_batches_share_one_process_pool(tmp_path, monkeypatch, whitespace_encoder):
+    started = []
+
+    class CountingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            started.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr("copcon.core.skeleton.ProcessPoolExecutor", CountingPool)
+    extractor = SkeletonExtractor(cache=ContentCache("skeleton", tmp_path), max_workers=2, parallel_threshold=2)
+    records = [
+        FileRecord(f"mod{i}.py", 0, 0.0, lambda record: f"def {record.relative_path[:-3]}():\n    return 1\n")
+        for i in range(8)
+    ]
+
+    contents = dict(ContentProcessor(whitespace_encoder, skeleton_extractor=extractor, batch_size=4).process(records))
+
+    assert contents["mod5.py"] == "def mod5():\n    ..."
+    assert len(started) == 1
+    assert extractor._executor is None, "The pool is shut down when processing ends."
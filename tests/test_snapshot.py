@@ -0,0 +1,70 @@
+import os
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.processor import ContentProcessor
+from copcon.core.snapshot import ReportSnapshot, changed_directories, directory_hashes
+from copcon.core.token_stats import TokenStats
+
+FILES = {
+    "src/app.py": "print('app')",
+    "docs_extra/notes.txt": "some notes",
+    "README.md": "# Readme",
+}
+
+def run(project, cache_dir, encoder):
+    snapshot = ReportSnapshot(project, options={}, cache_dir=cache_dir)
+    previous = snapshot.unchanged_report()
+    reader = FileContentReader(project, FileFilter(), exclude_hidden=True)
+    records = list(reader.iter_records())
+    processor = ContentProcessor(encoder, snapshot=snapshot)
+    contents = dict(processor.process(records))
+    snapshot.save("report", TokenStats.from_records(records), 3, 3)
+    return snapshot, previous, contents
+
+def test_directory_hashes_change_up_to_the_root(make_project):
+    project = make_project(FILES)
+    before = directory_hashes(project)
+    (project / "src" / "app.py").write_text("print('changed app')")
+    after = directory_hashes(project)
+
+    assert before["docs_extra"] == after["docs_extra"]
+    assert before["src"] != after["src"]
+    assert changed_directories(before, after) == {".", "src"}
+
+def test_ignored_directories_are_not_descended_into(make_project):
+    project = make_project(FILES)
+    (project / "src" / "__pycache__").mkdir()
+    before = directory_hashes(project, file_filter=FileFilter())
+    (project / "src" / "__pycache__" / "app.cpython-311.pyc").write_bytes(b"\0")
+    after = directory_hashes(project, file_filter=FileFilter())
+
+    assert "src/__pycache__" not in after
+    assert changed_directories(before, after) == set()
+
+def test_unchanged_project_reuses_report(tmp_path, make_project, whitespace_encoder):
+    project = make_project(FILES)
+    cache_dir = tmp_path / "cache"
+
+    _, previous, _ = run(project, cache_dir, whitespace_encoder)
+    assert previous is None, "The first run has nothing to reuse."
+
+    _, previous, _ = run(project, cache_dir, whitespace_encoder)
+    assert previous is not None
+    assert previous["report"] == "report"
+
+def test_only_changed_files_are_reprocessed(tmp_path, make_project, whitespace_encoder):
+    project = make_project(FILES)
+    cache_dir = tmp_path / "cache"
+    run(project, cache_dir, whitespace_encoder)
+
+    app = project / "src" / "app.py"
+    app.write_text("print('a changed app')")
+    os.utime(app, (1_000_000, 1_000_000))
+    snapshot, previous, contents = run(project, cache_dir, whitespace_encoder)
+
+    assert previous is None
+    assert snapshot.reused_count == 2
+    assert contents["src/app.py"] == "print('a changed app')"
+    stored = [path for path in (cache_dir / "snapshot-contents").rglob("*") if path.is_file()]
+    assert len(stored) == 3, "The previous version of the changed file is removed."
+    assert contents["README.md"] == "# Readme"
@@ -0,0 +1,49 @@
+import json
+from copcon.core.file_record import FileRecord
+from copcon.core.token_stats import TokenStats, extension_label
+
+FILE_TOKENS = {
+    "README": 5,
+    "setup.py": 20,
+    "src/app/main.py": 100,
+    "src/app/models.py": 50,
+    "src/generated/api_pb2.py": 400,
+    "tests/test_main.py": 25,
+}
+
+def test_extension_label():
+    assert extension_label("src/app/main.py") == "*.py"
+    assert extension_label("archive.tar.gz") == "*.gz"
+    assert extension_label("Makefile") == "(no extension)"
+
+def test_by_extension_includes_extra_sources():
+    stats = TokenStats({"a.py": 10, "b.py": 5, "c.md": 3})
+    stats.add_source("git diff", 7)
+    assert stats.by_extension() == {"*.py": 15, "*.md": 3, "git diff": 7}
+    assert stats.total == 25
+
+def test_by_directory_rolls_up_to_depth():
+    stats = TokenStats(FILE_TOKENS)
+    assert stats.by_directory(1) == {".": 25, "src/": 550, "tests/": 25}
+    assert stats.by_directory(2) == {".": 25, "src/app/": 150, "src/generated/": 400, "tests/": 25}
+
+def test_top_files():
+    stats = TokenStats(FILE_TOKENS)
+    assert stats.top_files(2) == [("src/generated/api_pb2.py", 400), ("src/app/main.py", 100)]
+
+def test_from_records_skips_uncounted_records():
+    counted = FileRecord("a.py", 1, 0.0, loader=lambda r: "")
+    counted.token_count = 3
+    uncounted = FileRecord("b.py", 1, 0.0, loader=lambda r: "")
+    assert TokenStats.from_records([counted, uncounted]).file_tokens == {"a.py": 3}
+
+def test_write_json(tmp_path):
+    output_file = tmp_path / "stats.json"
+    TokenStats(FILE_TOKENS, {"git diff": 10}).write_json(output_file, top_n=1, depth=2)
+
+    data = json.loads(output_file.read_text(encoding="utf-8"))
+    assert data["total_tokens"] == 610
+    assert data["top_files"] == [{"path": "src/generated/api_pb2.py", "tokens": 400}]
+    assert data["by_directory"]["src/app/"] == 150
+    assert data["files"] == FILE_TOKENS
+    assert data["extra_sources"] == {"git diff": 10}
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+from copcon.core.file_filter import FileFilter
+from copcon.core.file_reader import FileContentReader
+from copcon.core.file_tree import FileTreeGenerator
+from copcon.core import walker
+from copcon.core.walker import ParallelScanner, walk_files
+
+def make_linked_project(root: Path) -> Path:
+    """Create a project with a symlinked file, a symlinked directory and a link cycle."""
+    project = root / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "main.py").write_text("print('main')")
+    (project / "notes").mkdir()
+    (project / "notes" / "guide.md").write_text("# Guide")
+    os.symlink(project / "src" / "main.py", project / "main_link.py")
+    os.symlink(project / "notes", project / "notes_link")
+    os.symlink(project, project / "src" / "loop")
+    return project
+
+def test_directory_symlinks_are_skipped_by_default(tmp_path):
+    project = make_linked_project(tmp_path)
+    files = [path.relative_to(project).as_posix() for path, _ in walk_files(project)]
+    assert files == ["notes/guide.md", "src/main.py", "main_link.py"]
+
+def test_tree_and_reader_agree_on_file_symlinks_by_default(tmp_path):
+    project = make_linked_project(tmp_path)
+    tree = FileTreeGenerator(project, depth=-1, file_filter=FileFilter()).generate()
+    contents = FileContentReader(project, FileFilter(), exclude_hidden=True).read_all()
+    assert "main_link.py" in tree and contents["main_link.py"] == "print('main')"
+    assert "notes_link" not in tree and "loop" not in tree
+
+def test_followed_symlinks_do_not_loop(tmp_path):
+    project = make_linked_project(tmp_path)
+    files = [path.relative_to(project).as_posix() for path, _ in walk_files(project, follow_symlinks=True)]
+    assert files == ["notes/guide.md", "src/main.py", "main_link.py"], "Each directory is walked once."
+
+def test_reader_includes_each_physical_file_once(tmp_path):
+    project = make_linked_project(tmp_path)
+    reader = FileContentReader(project, FileFilter(), exclude_hidden=True, follow_symlinks=True)
+    contents = reader.read_all()
+    assert sorted(contents) == ["notes/guide.md", "src/main.py"]
+
+def test_tree_marks_revisited_directories(tmp_path):
+    project = make_linked_project(tmp_path)
+    tree = FileTreeGenerator(project, depth=-1, file_filter=FileFilter(), follow_symlinks=True).generate()
+    assert "notes_link/ (already listed)" in tree
+    assert "loop/ (already listed)" in tree
+    assert tree.count("guide.md") == 1
+
+def test_tree_counts_each_physical_file_once(tmp_path):
+    project = tmp_path / "project"
+    (project / "a").mkdir(parents=True)
+    (project / "a" / "f.py").write_text("print('f')")
+    os.symlink(project / "a" / "f.py", project / "g.py")
+
+    generator = FileTreeGenerator(project, depth=-1, file_filter=FileFilter(), follow_symlinks=True)
+    tree = generator.generate()
+    contents = FileContentReader(project, FileFilter(), exclude_hidden=True, follow_symlinks=True).read_all()
+
+    assert "g.py (already listed)" in tree
+    assert generator.file_count == len(contents) == 1
+
+def make_wide_project(root: Path) -> Path:
+    project = root / "wide"
+    for i in range(6):
+        for j in range(3):
+            directory = project / f"pkg{i}" / f"sub{j}"
+            directory.mkdir(parents=True)
+            (directory / "module.py").write_text(f"x = {i}{j}")
+    (project / "node_modules" / "dep").mkdir(parents=True)
+    (project / "node_modules" / "dep" / "index.js").write_text("")
+    return project
+
+def test_parallel_walk_matches_sequential_walk(tmp_path):
+    project = make_wide_project(tmp_path)
+    scanner = ParallelScanner(workers=4, stat_files=True)
+    scanner.start(project)
+    parallel = [(path, file_stat.st_size) for path, file_stat in walk_files(project, scanner=scanner)]
+    scanner.close()
+
+    assert parallel == [(path, file_stat.st_size) for path, file_stat in walk_files(project)]
+
+def test_parallel_tree_is_identical_and_skips_pruned_directories(tmp_path, monkeypatch):
+    project = make_wide_project(tmp_path)
+    sequential = FileTreeGenerator(project, depth=-1, file_filter=FileFilter()).generate()
+
+    scanned = []
+    original = walker.scan_directory
+
+    def recording_scan(directory, follow_symlinks=False):
+        scanned.append(directory.name)
+        return original(directory, follow_symlinks)
+
+    monkeypatch.setattr(walker, "scan_directory", recording_scan)
+    parallel = FileTreeGenerator(project, depth=-1, file_filter=FileFilter(), walk_workers=4).generate()
+
+    assert parallel == sequential
+    assert "node_modules/ (contents not displayed)" in parallel
+    assert "node_modules" not in scanned, "Ignored directories are pruned before being queued."
+
+def test_reader_with_walk_workers(tmp_path):
+    project = make_wide_project(tmp_path)
+    sequential = [r.relative_path for r in FileContentReader(project, FileFilter(), exclude_hidden=True).iter_records()]
+    reader = FileContentReader(project, FileFilter(), exclude_hidden=True, walk_workers=4)
+    assert [record.relative_path for record in reader.iter_records()] == sequential